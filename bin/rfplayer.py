@@ -56,6 +56,8 @@ except ImportError as exc :
     print err
     logging.error(err)
 
+NO_DEVICES = []     # Shared result of getDmgDevices when no domogik device
+
 class RFPlayer(Plugin):
     """ Implement RFPLayer command messages
         and launch background  manager to listening rfplayer(s) events by callback
@@ -70,6 +72,10 @@ class RFPlayer(Plugin):
             return
         self.managerRFP = None
         self._ctrlsHBeat = None
+        # Index of domogik devices by device parameter and by id, updated in place when devices change.
+        self._devicesIndex = {}
+        self._idIndex = {}
+        self._indexedDevices = None
         # Get some config value
         try:
             self.pathData = self.get_data_files_directory()
@@ -79,13 +85,13 @@ class RFPlayer(Plugin):
 
         # Initialize plugin Manager
         try:
-            self.managerRFP = RFPManager(self, self.send_sensor)
+            self.managerRFP = RFPManager(self, self.send_sensor, self.send_sensors)
         except Exception as e:
             raise
             self.log.error('Error on creating RFPManager : {0}'.format(e))
             self.force_leave()
             return
-        self.register_cb_update_devices(self.managerRFP.refreshDevices)
+        self.register_cb_update_devices(self.updateDevices)
         self.add_mq_sub('device.update')
         self.add_mq_sub('device.new')
         self.log.info('****** Init RFPlayer plugin manager completed ******')
@@ -149,24 +155,41 @@ class RFPlayer(Plugin):
             self.log.debug(u"Reply to MQ: {0}".format(reply_msg.get()))
             self.reply(reply_msg.get())
 
+    def updateDevices(self, devices):
+        """ Callback on domogik devices update (device.update, device.new), index is rebuild before manager refresh."""
+        self.indexDevices(devices)
+        self.managerRFP.refreshDevices(devices)
+
+    def indexDevices(self, devices=None):
+        """ Build index of domogik devices by device parameter value and by id, dicts are updated in place.
+            @param devices : domogik devices list. Default: self.devices
+        """
+        devices = self.devices if devices is None else devices
+        self._devicesIndex.clear()
+        self._idIndex.clear()
+        for dmgDevice in devices :
+            self._idIndex[dmgDevice['id']] = dmgDevice
+            if 'device' in dmgDevice['parameters']:
+                self._devicesIndex.setdefault(dmgDevice['parameters']['device']['value'], []).append(dmgDevice)
+        self._indexedDevices = (devices, len(devices))
+        self.log.debug(u"Domogik devices indexed : {0} devices, {1} device ids".format(len(self._idIndex), len(self._devicesIndex)))
+
+    def _checkIndex(self):
+        """ Rebuild index if devices list was replaced or changed (ex : get_device_list)"""
+        if self._indexedDevices is None or self._indexedDevices[0] is not self.devices or self._indexedDevices[1] != len(self.devices) :
+            self.indexDevices()
+
     def dmgDeviceFromId(self, id):
         """ Return domogik device correponding to db id"""
-        for device in self.devices :
-            if device['id'] == int(id) :
-                return device
-        return None
+        self._checkIndex()
+        return self._idIndex.get(int(id))
 
     def getDmgDevices(self, deviceId):
-        """ Search if domogik device exist for id and return it/them, else return []"""
-        devices = []
-        print(u"Search for dmg device : {0}".format(deviceId))
-        for dmgDevice in self.devices :
-            if 'device' in dmgDevice['parameters']:
-                print(dmgDevice)
-                if dmgDevice['parameters']['device']['value'] == deviceId :
-                    print(u"Device ok")
-                    devices.append(dmgDevice)
-        return devices
+        """ Search if domogik device exist for id and return it/them, else return [].
+            Returned list is shared by index, it must not be modified.
+        """
+        self._checkIndex()
+        return self._devicesIndex.get(deviceId, NO_DEVICES)
 
     def send_sensor(self, device, sensor_id, dt_type, value):
         """Send pub message over MQ"""
@@ -176,6 +199,13 @@ class RFPlayer(Plugin):
 #        if self.managerRFP is not None and self.managerRFP.monitorNodes is not None :
 #            self.managerRFP.monitorNodes.mq_report(device, {u"sensorId": sensor_id, u"dt_type": dt_type, u"value": value})
 
+    def send_sensors(self, values):
+        """Send several sensors values in one pub message over MQ
+            @param values : dict {sensor_id: value}
+        """
+        self.log.info(u"Sending MQ sensors values : {0}".format(values))
+        self._pub.send_event('client.sensor', values)
+
     def publishMsg(self, category, content):
         self._pub.send_event(category, content)
         self.log.debug(u"Publishing over MQ <{0}>, data : {1}".format(category, content))
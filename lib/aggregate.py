@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Aggregation of high rate sensors values (power, rain rate) in time windows : min, max, avg, last or integral
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+import time
+from threading import Lock
+
+FUNCTIONS = ('min', 'max', 'avg', 'last', 'integral')
+# Integral of rate samples has unit of an amount, it's published on a dedicated sensor : {rate data_type: amount data_type}
+RATE_DATA_TYPES = {'DT_Power': 'DT_ActiveEnergy', 'DT_mMeterHour': 'DT_mMeter'}     # W -> Wh, mm/h -> mm
+FLUSH_INTERVAL = 60     # Max time (s) between end of a window without new sample and its publishing
+
+def parseAggregates(config):
+    """ Parse aggregation configuration by sensor id or data_type, ex : 'DT_Power:avg:300,1234:integral:3600:1235'
+        @param config : rules key:function:window(s) separated by ',', function is one of FUNCTIONS.
+                        Integral rule is key:integral:window(s):target, key is id of a rate sensor (W, mm/h)
+                        and target id of the amount sensor (Wh, mm) receiving integral.
+        @return : {data_type or sensor id (int): (function, window (s), target sensor id (int) or None)}
+    """
+    rules = {}
+    for item in u"{0}".format(config if config is not None else "").split(',') :
+        parts = [p.strip() for p in item.split(':')]
+        if len(parts) not in (3, 4) or parts[1] not in FUNCTIONS : continue
+        if (parts[1] == 'integral') != (len(parts) == 4) : continue
+        if len(parts) == 4 and not (parts[0].isdigit() and parts[3].isdigit()) : continue
+        try :
+            window = float(parts[2])
+        except ValueError :
+            continue
+        if window > 0 :
+            rules[int(parts[0]) if parts[0].isdigit() else parts[0]] = (parts[1], window, int(parts[3]) if len(parts) == 4 else None)
+    return rules
+
+class Accumulator(object):
+    """ Running statistics of a sensor in current window, fixed size whatever the samples count."""
+
+    __slots__ = ('start', 'count', 'total', 'min', 'max', 'last', 'lastTime', 'integral', 'flushed')
+
+    def __init__(self, start, value, timestamp, integral=0.0):
+        self.start = start
+        self.count = 1
+        self.total = value
+        self.min = value
+        self.max = value
+        self.last = value
+        self.lastTime = timestamp
+        self.integral = integral
+        self.flushed = False
+
+    def add(self, value, timestamp):
+        """ Add a sample in window, previous value is held until this one for integral."""
+        self.integral += self.last * (timestamp - self.lastTime)
+        self.count += 1
+        self.total += value
+        if value < self.min : self.min = value
+        if value > self.max : self.max = value
+        self.last = value
+        self.lastTime = timestamp
+
+    def result(self, function, end):
+        """ Return window value of function, integral is closed at end of window (value unit x hour, ex : Wh from W)."""
+        if function == 'avg' : return round(float(self.total) / self.count, 2)
+        if function == 'integral' : return round((self.integral + self.last * (end - self.lastTime)) / 3600.0, 2)
+        return getattr(self, function)
+
+class SensorAggregator(object):
+    """ Replace the samples of a sensor by one value by time window : min, max, avg or last. Windows are aligned
+          on time (ex : 300s -> hh:00, hh:05...), value of a window is published when first sample of a next window
+          is received, or by flush() if no sample comes. Sensors without rule are not aggregated.
+          An integral rule keeps publishing samples of the rate sensor (W, mm/h) and publishes integral of each
+          window (Wh, mm) on its target sensor, a sample value is held until next one.
+    """
+
+    def __init__(self, rules={}, findSensor=None):
+        """ Init aggregator
+            @param rules : (function, window (s), target sensor id) by sensor id or data_type, see parseAggregates.
+            @param findSensor : callback(sensor id) returning (domogik device, sensor) or None, to find integral target sensors.
+        """
+        self.rules = dict(rules)
+        self._findSensor = findSensor
+        self._sensorsRules = {}     # sensor id -> (function, window, (device, sensor) of integral target) or None if not aggregated
+        self._windows = {}          # sensor id -> Accumulator of current window
+        self._sensors = {}          # sensor id -> (device, sensor) for flush
+        self._lock = Lock()
+        self.samples = 0
+        self.published = 0
+        self.flushed = 0
+        self.rejected = set()       # Ids of sensors with an integral rule not matching a rate sensor and its amount sensor
+
+    @property
+    def flushInterval(self):
+        """ Time (s) between two flush() calls"""
+        return min([FLUSH_INTERVAL] + [rule[1] for rule in self.rules.values()])
+
+    def _rule(self, sensor):
+        """ Return (function, window, integral target) of a sensor, None if sensor is not aggregated."""
+        rule = self.rules.get(sensor['id'], self.rules.get(sensor['data_type']))
+        if rule is None : return None
+        function, window, targetId = rule
+        if function != 'integral' : return (function, window, None)
+        target = self._findSensor(targetId) if self._findSensor is not None else None
+        if target is None or target[1]['data_type'] != RATE_DATA_TYPES.get(sensor['data_type']) :
+            self.rejected.add(sensor['id'])
+            return None
+        return (function, window, target)
+
+    def aggregate(self, sensor, value, timestamp=None, device=None):
+        """ Add a sensor value in its window.
+            @param sensor : the domogik sensor dict (id, data_type).
+            @param value : sensor value.
+            @param timestamp : time of value. Default: now
+            @param device : domogik device of sensor, returned with values to publish.
+            @return : list of (device, sensor, value) to publish : sample if sensor not aggregated or integrated,
+                      value of a window just ended.
+        """
+        sId = sensor['id']
+        with self._lock:
+            if sId not in self._sensorsRules :
+                self._sensorsRules[sId] = self._rule(sensor)
+            rule = self._sensorsRules[sId]
+            if rule is None or type(value) not in (int, long, float) : return [(device, sensor, value)]
+            function, window, target = rule
+            values = [(device, sensor, value)] if target is not None else []
+            now = timestamp if timestamp is not None else time.time()
+            start = now - now % window
+            self.samples += 1
+            self._sensors[sId] = (device, sensor)
+            acc = self._windows.get(sId)
+            if acc is None :
+                self._windows[sId] = Accumulator(start, value, now)
+                return values
+            if acc.flushed and start <= acc.start :
+                # Late sample of a published window, counted at start of next window
+                start = now = acc.start + window
+            if start <= acc.start :
+                acc.add(value, now)
+                return values
+            # New window, previous value is held up to current sample if it is not older than a window.
+            self._windows[sId] = Accumulator(start, value, now,
+                                             acc.last * (now - start) if now - acc.lastTime <= window else 0.0)
+            if acc.flushed : return values
+            self.published += 1
+            values.append((target or (device, sensor)) + (self._result(acc, function, window, now),))
+            return values
+
+    def _result(self, acc, function, window, now):
+        """ Return value of an ended window, last value is held up to end of window if it is not older than a window at now."""
+        end = acc.start + window
+        return acc.result(function, end if now - acc.lastTime <= window else acc.lastTime)
+
+    def flush(self, timestamp=None):
+        """ Close windows ended without new sample, to publish them without waiting next sample.
+            @param timestamp : current time. Default: now
+            @return : list of (device, sensor, value) of windows ended.
+        """
+        now = timestamp if timestamp is not None else time.time()
+        values = []
+        with self._lock:
+            for sId, acc in self._windows.items() :
+                device, sensor = self._sensors[sId]
+                if sId not in self._sensorsRules : self._sensorsRules[sId] = self._rule(sensor)
+                rule = self._sensorsRules[sId]
+                if acc.flushed or rule is None or now < acc.start + rule[1] : continue
+                acc.flushed = True
+                self.published += 1
+                self.flushed += 1
+                # Window is closed at its end, sensor could send a sample later.
+                values.append((rule[2] or (device, sensor)) + (self._result(acc, rule[0], rule[1], acc.start + rule[1]),))
+        return values
+
+    def clear(self):
+        """ Forget sensors rules, to compute them again after devices update. Current windows are kept."""
+        with self._lock:
+            self._sensorsRules.clear()
+            self.rejected.clear()
+
+    def getStats(self):
+        """ Return aggregation counters"""
+        with self._lock:
+            return {'samples': self.samples, 'published': self.published, 'flushed': self.flushed,
+                    'sensors': len(self._windows), 'rejected': sorted(self.rejected),
+                    'rules': dict((u"{0}".format(k), u"{0}:{1}{2}".format(f, int(w), u":{0}".format(t) if t is not None else u""))
+                              for k, (f, w, t) in self.rules.items())}
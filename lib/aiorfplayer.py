@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- asyncio transport and API for RFP1000 (trollius), serial fd handled by loop.add_reader/add_writer
+
+    client = AsyncRFP1000(manager, '/dev/rfplayer')
+    yield From(client.connect())
+    yield From(client.send('ON A1 X10'))
+    status = yield From(client.request('STATUS JSON'))
+    frame = yield From(client.frames().get())
+
+  python 3 : await client.connect(), async for frame in client.frames()
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+try :
+    import asyncio
+except ImportError :
+    import trollius as asyncio
+import os
+import time
+import errno
+import traceback
+from collections import deque
+from domogik_packages.plugin_rfplayer.lib.serial_rfplayer import SerialRFPlayer, RFPRequest
+from domogik_packages.plugin_rfplayer.lib.framing import toBytes
+from domogik_packages.plugin_rfplayer.lib.rfp1000 import SerialRFP1000
+
+try :
+    StopAsyncIteration = StopAsyncIteration
+except NameError :
+    class StopAsyncIteration(Exception):
+        """ End of async iteration (python < 3.5)"""
+        pass
+
+class AsyncRFPRequest(RFPRequest):
+    """ Request pending for a response, released by a future of the event loop"""
+
+    def __init__(self, ackFor, timeOut, loop):
+        RFPRequest.__init__(self, ackFor, timeOut)
+        self.future = asyncio.Future(loop=loop)
+        self.timer = None
+
+    def setResponse(self, response):
+        """ Release request future with response data, TimeoutError if request expired."""
+        RFPRequest.setResponse(self, response)
+        if self.timer is not None : self.timer.cancel()
+        if not self.future.done() :
+            if response is None :
+                self.future.set_exception(asyncio.TimeoutError())
+            else :
+                self.future.set_result(response)
+
+class FrameStream(object):
+    """ Async iterator of decoded RF frames, bounded, oldest frames are dropped if consumer is too slow.
+          python 3 : async for frame in stream, trollius : frame = yield From(stream.get())
+    """
+
+    def __init__(self, client, maxsize=100):
+        self._client = client
+        self._frames = deque()
+        self._waiters = deque()     # Futures of get() waiting a frame
+        self._closed = False
+        self.maxsize = maxsize
+        self.dropped = 0
+
+    def put(self, frame):
+        """ Add a frame, called by client in loop thread"""
+        while self._waiters :
+            waiter = self._waiters.popleft()
+            if not waiter.done() :
+                waiter.set_result(frame)
+                return
+        if len(self._frames) >= self.maxsize :
+            self._frames.popleft()
+            self.dropped += 1
+        self._frames.append(frame)
+
+    def close(self):
+        """ End iteration, consumer get remaining frames before StopAsyncIteration"""
+        if not self._closed :
+            self._closed = True
+            while self._waiters :
+                waiter = self._waiters.popleft()
+                if not waiter.done() : waiter.set_exception(StopAsyncIteration())
+            self._client._streams.discard(self)
+
+    def get(self):
+        """ Return a future of next frame, raise StopAsyncIteration at end."""
+        future = asyncio.Future(loop=self._client.loop)
+        if self._frames :
+            future.set_result(self._frames.popleft())
+        elif self._closed :
+            future.set_exception(StopAsyncIteration())
+        else :
+            self._waiters.append(future)
+        return future
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return self.get()
+
+class AsyncRFP1000(SerialRFP1000):
+    """ RFP1000 driven by an asyncio event loop, without threads.
+          Header, frame decoding and status handling are the ones of SerialRFPlayer and SerialRFP1000.
+          Commands are queued in write queue (band scheduler, hold-off and superseding) and written by loop.
+          Methods must be called from loop thread, except send_to_RFP.
+    """
+
+    def __init__(self, manager, rfp_device, loop=None, **params):
+        """ Init An RFP1000 device handled by asyncio.
+            @param manager : RFPManager instance or object with same log and publishRFPlayerMsg
+            @param rfp_device : rfplayer device (ex : /dev/rfplayer)
+            @param loop : optional asyncio loop. Default: asyncio.get_event_loop()
+            @param params : optional parameters of SerialRFP1000
+        """
+        SerialRFP1000.__init__(self, manager, rfp_device, self._publish_frames, **params)
+        self.loop = loop if loop is not None else asyncio.get_event_loop()
+        self._streams = set()
+        self._outBuffer = bytearray()
+        self._bytesQueued = 0
+        self._bytesWritten = 0
+        self._writeWaiters = []     # [(offset of end of data, future)]
+        self._writeTimer = None     # Wake writer when a RF band is free
+        self._futures = set()       # Futures of commands and requests not done, cancelled at close
+        self._fd = None
+
+    def connect(self):
+        """ Open serial com without blocking loop, HELLO handshake is done by an executor thread.
+            @return : future of open() result, True if RFP1000 is connected.
+        """
+        return self._track(self.loop.run_in_executor(None, self.open))
+
+    def open(self):
+        """ Open serial com and register serial fd in loop. HELLO handshake is blocking, use connect() from loop thread.
+              Can be called by reconnection thread, fd is registered by loop thread.
+        """
+        if SerialRFPlayer.open(self) :
+            self.rfPlayer.timeout = 0
+            self._fd = self.rfPlayer.fileno()
+            self._eventLoop = self
+            self.loop.call_soon_threadsafe(self._register_fd, self._fd)
+            return True
+        return False
+
+    def _register_fd(self, fd):
+        """ Start reading serial fd and writing commands queued, if port is still open on this fd."""
+        if fd == self._fd :
+            self.loop.add_reader(fd, self._on_readable)
+            self._process_write_queue()
+
+    def close(self):
+        """ Close serial com, pending requests and writes are cancelled, frames streams are ended."""
+        SerialRFP1000.close(self)
+        with self._requestsLock:
+            requests = list(self._pendingRequests.values())
+            self._pendingRequests.clear()
+        for request in requests :
+            if hasattr(request, 'future') and not request.future.done() : request.future.cancel()
+        for future in list(self._futures) :
+            if not future.done() : future.cancel()
+        self._futures.clear()
+        for offset, future in self._writeWaiters :
+            if not future.done() : future.cancel()
+        self._writeWaiters = []
+        if self._writeTimer is not None : self._writeTimer.cancel()
+        self._writeTimer = None
+        del self._outBuffer[:]
+        for stream in list(self._streams) : stream.close()
+
+    # Event loop interface used by SerialRFPlayer (send_to_RFP and close)
+    def wakeup(self):
+        """ Write commands queued by send_to_RFP, thread safe."""
+        self.loop.call_soon_threadsafe(self._process_write_queue)
+
+    def removeClient(self, client):
+        """ Unregister serial fd from loop before closing, data not written are lost with port."""
+        if self._fd is not None :
+            self.loop.remove_reader(self._fd)
+            self.loop.remove_writer(self._fd)
+            self._fd = None
+        self._eventLoop = None
+        del self._outBuffer[:]
+        self._bytesQueued = self._bytesWritten
+        for offset, future in self._writeWaiters :
+            if not future.done() : future.set_exception(IOError(u"{0} {1} connection lost".format(self.RFP_type, self.RFP_device)))
+        self._writeWaiters = []
+
+    def _process_write_queue(self):
+        """ Write commands ready, call back when next RF band is free."""
+        SerialRFP1000._process_write_queue(self)
+        if self._writeTimer is not None :
+            self._writeTimer.cancel()
+            self._writeTimer = None
+        ready = self.write_RFP.nextReady() if hasattr(self.write_RFP, 'nextReady') else None
+        if ready is not None and self._fd is not None :
+            self._writeTimer = self.loop.call_later(max(0, ready - time.time()), self._process_write_queue)
+
+    def _on_readable(self):
+        """ Serial data available : read, decode and dispatch all frames."""
+        self._read_RFP_data()
+        self._process_received_queue()
+
+    def _write_RFP_data(self, data):
+        """ Buffer a packet data, written when serial fd is writable.
+            @param data : the ASCII data to send.
+            @return : True if data buffered.
+        """
+        if self._fd is None and not self.isOpen : return False
+        packet = toBytes(data) + b'\r'
+        self._outBuffer += packet
+        self._bytesQueued += len(packet)
+        self._on_writable()
+        if self._outBuffer and self._fd is not None :
+            self.loop.add_writer(self._fd, self._on_writable)
+        return True
+
+    def _on_writable(self):
+        """ Write buffered data as much as serial accept."""
+        if self._fd is None : return
+        try :
+            while self._outBuffer :
+                n = os.write(self._fd, bytes(self._outBuffer))
+                del self._outBuffer[:n]
+                self._bytesWritten += n
+        except OSError as e :
+            if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK) :
+                self.log.error(u"Error while writing on {0} device {1} (disconnected ?) : {2}".format(self.RFP_type, self.RFP_device, traceback.format_exc()))
+                self.connection_lost()
+                return
+        if not self._outBuffer :
+            self.loop.remove_writer(self._fd)
+        while self._writeWaiters and self._writeWaiters[0][0] <= self._bytesWritten :
+            future = self._writeWaiters.pop(0)[1]
+            if not future.done() : future.set_result(True)
+
+    def _publish_frames(self, client, msg):
+        """ Give RF frames to all frames streams"""
+        frames = msg if type(msg) == list else [msg]
+        for frame in frames :
+            if type(frame) == dict and 'frame' in frame :
+                for stream in self._streams : stream.put(frame)
+
+    def _track(self, future):
+        """ Keep a future until done, to cancel it at close."""
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def _send_RFP_record(self, data):
+        """ Write a command record from write queue, futures of record are done when data is written.
+              Request timeout start when request is sent, like for threads writer.
+        """
+        queued = self._bytesQueued
+        result = SerialRFP1000._send_RFP_record(self, data)
+        if not result and self._reconnecting : return result    # Record put back, futures done when written after reconnection
+        request = data['request']
+        if isinstance(request, AsyncRFPRequest) and request.timer is None and not request.future.done() :
+            request.timer = self.loop.call_later(request.timeOut, self._expire_request, request)
+        for future in data.get('futures', []) :
+            if future.done() : continue
+            if self._fd is None or self._bytesQueued == queued :    # Not written (port lost or command expired)
+                future.set_exception(IOError(u"{0} {1} command not sent : {2}".format(self.RFP_type, self.RFP_device, data['data'])))
+            elif self._bytesWritten >= self._bytesQueued :
+                future.set_result(True)
+            else :
+                self._writeWaiters.append((self._bytesQueued, future))
+        return result
+
+    def send(self, command):
+        """ Send a command without response.
+            @param command : the command in ASCII (ex : 'ON A1 X10')
+            @return : future done when command is written on serial port,
+                      a command superseded by a newer one of same kind is done when the newer one is written.
+        """
+        future = self._track(asyncio.Future(loop=self.loop))
+        if not self.isOpen :
+            future.set_exception(IOError(u"{0} {1} is not open".format(self.RFP_type, self.RFP_device)))
+            return future
+        self._queue_RFP_record({'data': "{0}{1}{2} {3}".format(self.SYNC_ID, self.SDQ_ASCII, self.Q_CMD, command),
+                                'response': False, 'ackFor': {}, 'request': None, 'queued': time.time(), 'futures': [future]})
+        return future
+
+    def request(self, command, timeOut=5):
+        """ Send a command and wait its response, without thread.
+            @param command : the command in ASCII (ex : 'STATUS JSON')
+            @param timeOut : time to wait the response after sending. Default 5s
+            @return : future of decoded response, asyncio.TimeoutError if no response.
+        """
+        with self._requestsLock:
+            self._reqNum += 1
+            reqNum = self._reqNum
+        request = AsyncRFPRequest({'command': command, 'reqNum': reqNum, 'callback': None}, timeOut, self.loop)
+        self._track(request.future)
+        if not self.isOpen :
+            request.future.set_exception(IOError(u"{0} {1} is not open".format(self.RFP_type, self.RFP_device)))
+            return request.future
+        self._queue_RFP_record({'data': "{0}{1}{2}{3} {4}".format(self.SYNC_ID, self.SDQ_ASCII, self.Q_CMD, reqNum, command),
+                                'response': True, 'ackFor': request.ackFor, 'request': request, 'queued': time.time()})
+        return request.future
+
+    def _expire_request(self, request):
+        with self._requestsLock:
+            if self._pendingRequests.get(request.reqNum) is request :
+                del self._pendingRequests[request.reqNum]
+        request.timer = None
+        request.setResponse(None)
+
+    def requestStatus(self, timeOut=5):
+        """ Request STATUS of RFP1000
+            @return : future of status formated by formatStatus()
+        """
+        future = asyncio.Future(loop=self.loop)
+        def done(f):
+            if future.done() : return
+            if f.cancelled() : future.cancel()
+            elif f.exception() is not None : future.set_exception(f.exception())
+            else :
+                # radioStatus complement of same read is already handled when this callback is called.
+                self.setStatus(f.result(), 'STATUS JSON')
+                future.set_result(self.formatStatus())
+        self.request('STATUS JSON', timeOut).add_done_callback(done)
+        return future
+
+    def frames(self, maxsize=100):
+        """ Return a new stream of decoded RF frames received from now, read by stream.get().
+            @param maxsize : max frames waiting in iterator. Default 100
+        """
+        stream = FrameStream(self, maxsize)
+        self._streams.add(stream)
+        return stream
+
+    def getInfos(self):
+        """Return All informations formated to UI"""
+        retval = SerialRFP1000.getInfos(self)
+        retval['ioEngine'] = "asyncio"
+        retval['pendingWrites'] = len(self._outBuffer)
+        return retval
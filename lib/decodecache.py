@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- LRU cache of sensors values computed from a decoded RF frame, for periodic sensors sending same payload
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+import sys
+from collections import OrderedDict
+from threading import Lock
+
+from domogik_packages.plugin_rfplayer.lib.dedup import freeze
+
+def payloadKey(frame):
+    """ Return normalized payload of a decoded RF frame : protocol, infoType, rfQuality (rf_quality sensor) and infos.
+          Reception fields rfLevel and floorNoise are ignored. None if frame is not a RF frame.
+    """
+    try :
+        header = frame['header']
+        return (header['protocol'], header['infoType'], header.get('rfQuality'), freeze(frame['infos']))
+    except (KeyError, TypeError) :
+        return None
+
+def sizeOf(value):
+    """ Return approximate memory size (bytes) of a key or results, domogik devices are shared so not counted."""
+    size = sys.getsizeof(value)
+    if type(value) in (tuple, list) :
+        for v in value :
+            if type(v) != dict : size += sizeOf(v)
+    return size
+
+class DecodeCache(object):
+    """ Map a normalized RF payload to sensors values already computed by InfoType, for all domogik devices.
+          Results are [(domogik device, sensor, value)], value is None if sensor is not according to infoType.
+          Cache must be cleared when domogik devices list change.
+    """
+
+    def __init__(self, maxsize=256):
+        """ Init cache
+            @param maxsize : max payloads in cache, least recently used is evicted. Default: 256
+        """
+        self._maxsize = maxsize
+        self._cache = OrderedDict()    # key -> (results, size), least recently used first
+        self._lock = Lock()
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, key):
+        """ Return results of a payload key, None if not in cache."""
+        with self._lock:
+            entry = self._cache.pop(key, None)
+            if entry is None :
+                self.misses += 1
+                return None
+            self._cache[key] = entry   # Move at end, most recently used
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, results):
+        """ Add results of a payload key, evict least recently used payloads if full."""
+        size = sizeOf(key) + sizeOf(results)
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None : self.memory -= old[1]
+            self._cache[key] = (results, size)
+            self.memory += size
+            while len(self._cache) > self._maxsize :
+                oldKey, oldEntry = self._cache.popitem(last=False)
+                self.memory -= oldEntry[1]
+                self.evicted += 1
+
+    def clear(self):
+        """ Remove all payloads, called when domogik devices change."""
+        with self._lock:
+            self._cache.clear()
+            self.memory = 0
+
+    def getStats(self):
+        """ Return cache counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hitRate': round(100.0 * self.hits / total, 1) if total else 0,
+                    'size': len(self._cache), 'maxsize': self._maxsize, 'evicted': self.evicted, 'memory': self.memory}
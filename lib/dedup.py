@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Suppression of repeated RF frames (remotes and sensors repeat each frame 3 to 5 times) in a time window by protocol
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+
+DEFAULT_WINDOW = 'default'
+# Header fields of frame content, reception fields rfLevel, floorNoise and rfQuality are ignored
+CONTENT_FIELDS = ('protocol', 'infoType', 'frameType', 'cluster', 'dataFlag', 'frequency')
+
+def freeze(value):
+    """ Return a hashable copy of decoded data (dict, list)"""
+    if type(value) == dict :
+        return tuple(sorted((k, freeze(v) if type(v) in (dict, list) else v) for k, v in value.items()))
+    if type(value) == list :
+        return tuple(freeze(v) if type(v) in (dict, list) else v for v in value)
+    return value
+
+def parseWindows(config, default=0.5):
+    """ Parse windows configuration in ms, ex : '500,X10:700,OREGON:0'
+        @param config : default window then windows by protocol name, in ms
+        @param default : default window (s) if not in config.
+        @return : {'default': window (s), protocol name: window (s)}
+    """
+    windows = {DEFAULT_WINDOW: default}
+    for item in u"{0}".format(config if config is not None else "").split(',') :
+        item = item.strip()
+        if not item : continue
+        try :
+            if ':' in item :
+                protocol, window = item.split(':', 1)
+                windows[protocol.strip().upper()] = int(window) / 1000.0
+            else :
+                windows[DEFAULT_WINDOW] = int(item) / 1000.0
+        except ValueError :
+            pass
+    return windows
+
+class FrameDedup(object):
+    """ Suppress a RF frame identical to one received for same device within a time window.
+          Key is (protocol, infoType, header fields, infos with device id and payload), without reception fields
+          rfLevel, floorNoise, rfQuality.
+          Window is sliding, repeats of a burst extend it. Cache is bounded and time ordered, oldest keys are evicted first.
+    """
+
+    def __init__(self, windows={DEFAULT_WINDOW: 0.5}, maxsize=1024):
+        """ Init deduplicator
+            @param windows : window (s) by protocol name (ex : 'X10') and 'default', 0 disable suppression.
+            @param maxsize : max keys in cache. Default: 1024
+        """
+        self.windows = dict(windows)
+        self._default = self.windows.get(DEFAULT_WINDOW, 0)
+        self._maxWindow = max(self.windows.values()) if self.windows else 0
+        self._maxsize = maxsize
+        self._cache = OrderedDict()    # key -> time of last reception, in reception order
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def frameKey(self, frame):
+        """ Return dedup key and window of a decoded RF frame, (None, 0) if frame can't be deduplicated."""
+        try :
+            header = frame['frame']['header']
+            infos = frame['frame']['infos']
+        except (KeyError, TypeError) :
+            return None, 0
+        window = self.windows.get(header.get('protocolMeaning', ''), self._default)
+        if not window : return None, 0
+        return (tuple(header.get(k) for k in CONTENT_FIELDS), freeze(infos)), window
+
+    def isDuplicate(self, frame, timestamp=None):
+        """ Check if a frame is a repeat of a frame received within window, and record it.
+            @param frame : decoded RF frame {'frame': {'header': {}, 'infos': {}}}
+            @param timestamp : time of reception. Default: now
+            @return : True if frame must be suppressed
+        """
+        key, window = self.frameKey(frame)
+        if key is None : return False
+        now = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            last = self._cache.pop(key, None)
+            self._cache[key] = now     # Move at end, cache stay in time order
+            if last is not None and now - last <= window :
+                self.hits += 1
+                return True
+            self.misses += 1
+            # Drop old keys, oldest first
+            while self._cache :
+                oldKey = next(iter(self._cache))
+                oldTime = self._cache[oldKey]
+                if len(self._cache) > self._maxsize :
+                    self.evicted += 1
+                elif now - oldTime <= self._maxWindow :
+                    break
+                del self._cache[oldKey]
+            return False
+
+    def getStats(self):
+        """ Return dedup counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'maxsize': self._maxsize,
+                    'evicted': self.evicted, 'windows': dict((k, int(v * 1000)) for k, v in self.windows.items())}
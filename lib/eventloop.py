@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Event loop driving all RFPlayer clients from one thread (epoll, else poll)
+- Waker, an Event waiting in kernel (python 2 Event.wait(timeout) poll each 50ms)
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+import os
+import fcntl
+import select
+import heapq
+import time
+import traceback
+from threading import Thread, Lock
+
+if hasattr(select, 'epoll') :
+    EV_READ = select.EPOLLIN | select.EPOLLPRI
+    EV_ERROR = select.EPOLLERR | select.EPOLLHUP
+else :
+    EV_READ = select.POLLIN | select.POLLPRI
+    EV_ERROR = select.POLLERR | select.POLLHUP | select.POLLNVAL
+
+def setNonBlocking(fd):
+    """ Set O_NONBLOCK flag on a file descriptor"""
+    flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+    fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+class Waker(object):
+    """ Event like object based on a pipe, wait(timeout) sleep in select without periodic wakeup."""
+
+    def __init__(self):
+        self._read, self._write = os.pipe()
+        setNonBlocking(self._read)
+        setNonBlocking(self._write)
+        self._flag = False
+
+    def isSet(self):
+        return self._flag
+
+    is_set = isSet
+
+    def set(self):
+        """ Set flag and wake all waiters"""
+        if not self._flag :
+            self._flag = True
+            try :
+                os.write(self._write, b'w')
+            except OSError :
+                pass
+
+    def clear(self):
+        """ Reset flag"""
+        self._flag = False
+        try :
+            while os.read(self._read, 4096) : pass
+        except OSError :
+            pass
+
+    def wait(self, timeout=None):
+        """ Wait until flag set or timeout, return flag"""
+        if not self._flag :
+            try :
+                select.select([self._read], [], [], timeout)
+            except select.error :
+                pass  # EINTR
+        return self._flag
+
+class RFPEventLoop(object):
+    """ Drive all RFPlayer clients from one thread.
+          Serial ports are registered in an epoll (or poll) object, reading, writing commands,
+          handling received frames, requests deadlines and timers are events of the loop.
+          Other threads wake the loop by a pipe.
+    """
+
+    MAX_WAIT = None     # Max time (s) waiting for an event, None : no timeout, manager wake loop at plugin stop
+
+    def __init__(self, manager):
+        """ Init event loop
+            @param manager : RFPManager instance
+        """
+        self._manager = manager
+        self._clients = {}      # fd -> client
+        self._changes = []      # Clients to register/unregister by loop thread
+        self._timers = []       # heap of [deadline, seq, callback, interval]
+        self._seq = 0
+        self._lock = Lock()
+        self._thread = None
+        self._poller = select.epoll() if hasattr(select, 'epoll') else select.poll()
+        self._wakeRead, self._wakeWrite = os.pipe()
+        setNonBlocking(self._wakeRead)
+        setNonBlocking(self._wakeWrite)
+        self._poller.register(self._wakeRead, EV_READ)
+        self.wakeups = 0
+        self.events = 0
+
+    log = property(lambda self: self._manager.log)
+    stop = property(lambda self: self._manager._plugin.get_stop())
+
+    @property
+    def isRunning(self):
+        """ True if loop thread is running"""
+        return self._thread is not None and self._thread.isAlive()
+
+    def start(self):
+        """ Start loop thread"""
+        self._thread = Thread(None, self.run, "RFPEventLoop", (), {})
+        self._manager._plugin.register_thread(self._thread)
+        self._thread.start()
+
+    def wakeup(self):
+        """ Wake the loop from another thread"""
+        try :
+            os.write(self._wakeWrite, b'w')
+        except OSError :
+            pass  # Pipe full, loop is already woken.
+
+    def addClient(self, client):
+        """ Register a client opened, its serial port is handled by loop."""
+        with self._lock:
+            self._changes.append((True, client))
+        client._eventLoop = self
+        self.wakeup()
+
+    def removeClient(self, client):
+        """ Unregister a client, must be call before closing serial port."""
+        with self._lock:
+            self._changes.append((False, client))
+        client._eventLoop = None
+        self.wakeup()
+
+    def callLater(self, delay, callback, interval=None):
+        """ Call a function in loop thread after a delay.
+            @param delay : delay in seconds
+            @param callback : function without parameter
+            @param interval : optional interval (s) to repeat the call. Default: None, one call.
+            @return : timer, can be cancel by cancelTimer
+        """
+        with self._lock:
+            self._seq += 1
+            timer = [time.time() + delay, self._seq, callback, interval]
+            heapq.heappush(self._timers, timer)
+        self.wakeup()
+        return timer
+
+    def cancelTimer(self, timer):
+        """ Cancel a timer returned by callLater"""
+        timer[2] = None
+
+    def schedulePing(self, client, interval):
+        """ Ping a client each interval seconds without waiting PONG in loop."""
+        def ping():
+            if client._send_ping() :
+                self.callLater(client.PING_TIMEOUT, client._ping_result)
+            else :
+                client._ping_result()
+        return self.callLater(interval, ping, interval)
+
+    def _applyChanges(self):
+        with self._lock:
+            changes = self._changes
+            self._changes = []
+        for add, client in changes :
+            try :
+                if add :
+                    fd = client.rfPlayer.fileno()
+                    self._poller.register(fd, EV_READ)
+                    self._clients[fd] = client
+                else :
+                    for fd, cl in self._clients.items() :
+                        if cl is client :
+                            del self._clients[fd]
+                            try :
+                                self._poller.unregister(fd)
+                            except :
+                                pass  # fd already closed
+            except :
+                self.log.warning(u"Event loop fail to {0} client {1} : {2}".format("add" if add else "remove", client.RFP_device, traceback.format_exc()))
+
+    def _nextTimeout(self):
+        """ Return time to wait (s) for next timer or request deadline"""
+        wait = self.MAX_WAIT
+        now = time.time()
+        with self._lock:
+            if self._timers : wait = self._timers[0][0] - now if wait is None else min(wait, self._timers[0][0] - now)
+        for client in self._clients.values() :
+            deadline = client.nextDeadline()
+            if deadline is not None : wait = deadline - now if wait is None else min(wait, deadline - now)
+        return None if wait is None else max(0, wait)
+
+    def _runTimers(self):
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._timers and self._timers[0][0] <= now :
+                timer = heapq.heappop(self._timers)
+                if timer[2] is not None :
+                    due.append(timer)
+                    if timer[3] :
+                        timer[0] = now + timer[3]
+                        heapq.heappush(self._timers, timer)
+        for timer in due :
+            try :
+                timer[2]()
+            except :
+                self.log.warning(u"Event loop timer error : {0}".format(traceback.format_exc()))
+
+    def _poll(self, timeout):
+        if hasattr(select, 'epoll') :
+            return self._poller.poll(-1 if timeout is None else timeout)
+        return self._poller.poll(None if timeout is None else timeout * 1000)
+
+    def run(self):
+        """ Loop until plugin stop"""
+        self.log.info(u"***** Start RFPlayer event loop *****")
+        while not self.stop.isSet():
+            self._applyChanges()
+            try :
+                events = self._poll(self._nextTimeout())
+            except IOError :
+                continue  # EINTR
+            self.wakeups += 1
+            for fd, event in events :
+                self.events += 1
+                if fd == self._wakeRead :
+                    try :
+                        while os.read(self._wakeRead, 4096) : pass
+                    except OSError :
+                        pass
+                    continue
+                client = self._clients.get(fd)
+                if client is None : continue
+                if event & EV_ERROR and not event & EV_READ :
+                    self.log.error(u"Event loop, error on {0} (disconnected ?)".format(client.RFP_device))
+                    client.connection_lost()
+                else :
+                    client._read_RFP_data()
+            for client in self._clients.values() :
+                try :
+                    client._process_write_queue()
+                    client._process_received_queue()
+                    if client._pendingRequests : client._expire_RFP_requests()
+                except :
+                    self.log.warning(u"Event loop error on {0} : {1}".format(client.RFP_device, traceback.format_exc()))
+            self._runTimers()
+        self.log.info(u"***** RFPlayer event loop stopped *****")
+
+    def getStats(self):
+        """ Return loop counters"""
+        return {'clients': len(self._clients), 'timers': len(self._timers), 'wakeups': self.wakeups, 'events': self.events}
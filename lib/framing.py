@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Framing layer of RFPlayer serial data
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+LF = 10
+
+def toText(data):
+    """ Return serial data as str, python 2 and 3 (bytes are decoded as latin-1)"""
+    return data if type(data) is str else data.decode('latin-1')
+
+def toBytes(data):
+    """ Return str data as bytes to write on serial port, python 2 and 3"""
+    return data if type(data) is bytes else data.encode('latin-1')
+
+class FrameReader(object):
+    """ Read serial data by blocks in a reusable buffer and split it in frames.
+          RFPlayer frames end with '\\r', new line characters around a frame are removed.
+          Frames are returned as memoryview slices of the buffer, they stay valid until next read.
+    """
+
+    def __init__(self, size=4096, maxSize=65536):
+        """ Init frame reader
+            @param size : initial buffer size in bytes. Default: 4096
+            @param maxSize : max size of a frame, data without end of frame over this size is dropped. Default: 65536
+        """
+        self._maxSize = maxSize
+        self._allocate(size)
+        self.bytesRead = 0
+        self.framesRead = 0
+        self.dropped = 0
+
+    def _allocate(self, size):
+        """ Create a new buffer, frames of previous buffer stay valid."""
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._start = 0     # Begin of incomplete frame
+        self._end = 0       # End of buffered data
+
+    def reset(self):
+        """ Drop all buffered data"""
+        self._start = 0
+        self._end = 0
+
+    def feed(self, data):
+        """ Add data at end of buffer
+            @param data : str/bytes data read on serial port
+        """
+        size = len(data)
+        pending = self._end - self._start
+        if pending + size > self._maxSize :
+            # No end of frame in a too big data, drop it.
+            self.dropped += 1
+            self._start = self._end = pending = 0
+            if size > self._maxSize : return
+        if self._end + size > len(self._buffer) :
+            if pending + size > len(self._buffer) :
+                old = self._buffer[self._start:self._end]
+                self._allocate(max(len(self._buffer) * 2, pending + size))
+                self._buffer[0:pending] = old
+            elif pending :
+                self._buffer[0:pending] = self._buffer[self._start:self._end]
+            self._start = 0
+            self._end = pending
+        self._buffer[self._end:self._end + size] = data
+        self._end += size
+        self.bytesRead += size
+
+    def frames(self):
+        """ Return list of complete frames in buffer as memoryview slices."""
+        frames = []
+        buffer = self._buffer
+        start = self._start
+        end = self._end
+        while start < end :
+            index = buffer.find(b'\r', start, end)
+            if index == -1 : break
+            first = start
+            last = index
+            while first < last and buffer[first] == LF : first += 1
+            while last > first and buffer[last - 1] == LF : last -= 1
+            if last > first :
+                frames.append(self._view[first:last])
+            start = index + 1
+        if start >= end :
+            start = end = 0
+        self._start = start
+        self._end = end
+        self.framesRead += len(frames)
+        return frames
+
+    def read(self, port):
+        """ Read all data available on serial port and return complete frames.
+              Block until first byte or serial timeout, then read all bytes waiting in one call.
+            @param port : pyserial Serial object
+            @return : list of frames as memoryview
+        """
+        if hasattr(type(port), 'in_waiting') :
+            data = port.read(1)
+            if data :
+                waiting = port.in_waiting
+                if waiting : data += port.read(waiting)
+        else :
+            # Serial object without in_waiting (ex : test fake device), read by line.
+            data = port.readline()
+            if data and data.endswith(b'\n') : data += b'\r'
+        if data :
+            self.feed(data)
+            return self.frames()
+        return []
+
+    def getStats(self):
+        """ Return reader counters"""
+        return {'bytes': self.bytesRead, 'frames': self.framesRead, 'dropped': self.dropped, 'buffer': len(self._buffer)}
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Decoder of RF frames received in format HEXA and HEXA FIXED
+- Benchmark HEXA against JSON : python hexframes.py
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+import struct
+from binascii import unhexlify
+
+from domogik_packages.plugin_rfplayer.lib.infotypes import PROTOCOLS
+
+# Binary frame (little endian) : header of 8 bytes then infos in words of 16 bits depending of infoType.
+# In format HEXA FIXED frames are padded to the biggest infos size, padding is ignored by decoder.
+HEADER_FORMAT = '<BBBbbBBB'
+HEADER_FIELDS = ('frameType', 'cluster', 'dataFlag', 'rfLevel', 'floorNoise', 'rfQuality', 'protocol', 'infoType')
+INFOTYPE_POS = 7
+
+INFOS_FORMATS = {
+    0: ('HH', ('subType', 'id')),
+    1: ('HHH', ('subType', 'idLsb', 'idMsb')),
+    2: ('HHHH', ('subType', 'idLsb', 'idMsb', 'qualifier')),
+    3: ('HHHH', ('subType', 'idLsb', 'idMsb', 'qualifier')),
+    4: ('HHHHhH', ('subType', 'id_PHY', 'adr_channel', 'qualifier', 'temp', 'hygro')),
+    5: ('HHHHhHH', ('subType', 'id_PHY', 'adr_channel', 'qualifier', 'temp', 'hygro', 'pressure')),
+    6: ('HHHHHH', ('subType', 'id_PHY', 'adr_channel', 'qualifier', 'speed', 'direction')),
+    7: ('HHHHH', ('subType', 'id_PHY', 'adr_channel', 'qualifier', 'uv')),
+    8: ('HHHHHHHHHHH', ('subType', 'filler', 'id_PHY', 'adr_channel', 'qualifier', 'energyLsb', 'energyMsb',
+                        'power', 'P1', 'P2', 'P3')),
+    9: ('HHHHHHH', ('subType', 'id_PHY', 'adr_channel', 'qualifier', 'totalRainLsb', 'totalRainMsb', 'rain')),
+    10: ('HHHHHHHHHH', ('subType', 'idLsb', 'idMsb', 'qualifier', 'function', 'mode', 'd0', 'd1', 'd2', 'd3')),
+    11: ('HHHHHHHHHH', ('subType', 'idLsb', 'idMsb', 'qualifier', 'function', 'mode', 'd0', 'd1', 'd2', 'd3'))
+    }
+
+# Precompiled struct of full frame for each infoType
+FRAME_STRUCTS = dict((iType, (struct.Struct(HEADER_FORMAT + fmt[0]), fmt[1])) for iType, fmt in INFOS_FORMATS.items())
+
+FREQUENCIES = {0: "433920", 1: "868950"}
+
+# Sensors models by id_PHY, as given in JSON format (id_PHYMeaning)
+ID_PHY_MEANINGS = {0x0000: "ProbeV1", 0x1A2D: "THGR228", 0xFA28: "THGR810", 0x5A6D: "THGR918N", 0x1A89: "WGR800",
+                   0xDA78: "UVN800", 0x2A19: "PCR800"}
+
+def _measure(mType, value, unit):
+    return {'type': mType, 'value': value, 'unit': unit}
+
+def _infos_id(values):
+    """ Infos of infotypes with 32 bits id (1, 2, 3, 10, 11)"""
+    infos = {'subType': str(values['subType']), 'id': str((values['idMsb'] << 16) | values['idLsb'])}
+    if 'qualifier' in values : infos['qualifier'] = str(values['qualifier'])
+    if 'function' in values :
+        infos.update({'function': str(values['function']), 'mode': str(values['mode']),
+                      'data': [str(values['d0']), str(values['d1']), str(values['d2']), str(values['d3'])]})
+    return infos
+
+def _infos_sensor(values):
+    """ Infos of sensors infotypes (OREGON and OWL)"""
+    adrChannel = values['adr_channel']
+    qualifier = values['qualifier']
+    return {'subType': str(values['subType']), 'id_PHY': "0x{0:04X}".format(values['id_PHY']),
+            'id_PHYMeaning': ID_PHY_MEANINGS.get(values['id_PHY'], "UNKNOWN"), 'adr_channel': str(adrChannel), 'adr': str(adrChannel >> 8), 'channel': str(adrChannel & 0xFF),
+            'qualifier': str(qualifier), 'lowBatt': str(qualifier & 1)}
+
+def _measures(iType, values):
+    """ Measures list of sensors infotypes, in same units than JSON format"""
+    if iType == 4 :
+        return [_measure('temperature', "{0:+.1f}".format(values['temp'] / 10.0), 'Celsius'),
+                _measure('hygrometry', str(values['hygro']), '%')]
+    elif iType == 5 :
+        return [_measure('temperature', "{0:+.1f}".format(values['temp'] / 10.0), 'Celsius'),
+                _measure('hygrometry', str(values['hygro']), '%'),
+                _measure('pressure', str(values['pressure']), 'hPa')]
+    elif iType == 6 :
+        return [_measure('wind speed', "{0:.1f}".format(values['speed'] / 10.0), 'm/s'),
+                _measure('direction', str(values['direction']), 'degree')]
+    elif iType == 7 :
+        return [_measure('uv', str(values['uv']), '1/10 index')]
+    elif iType == 8 :
+        return [_measure('energy', str((values['energyMsb'] << 16) | values['energyLsb']), 'Wh'),
+                _measure('power', str(values['power']), 'W'),
+                _measure('P1', str(values['P1']), 'W'),
+                _measure('P2', str(values['P2']), 'W'),
+                _measure('P3', str(values['P3']), 'W')]
+    elif iType == 9 :
+        return [_measure('total rain', "{0:.1f}".format(((values['totalRainMsb'] << 16) | values['totalRainLsb']) / 10.0), 'mm'),
+                _measure('current rain', "{0:.2f}".format(values['rain'] / 100.0), 'mm/h')]
+    return []
+
+def decode_HEX_frame(data):
+    """ Decode a RF frame received in format HEXA or HEXA FIXED.
+        @param data : frame without header, binary frame coded in hexadecimal characters
+        @return : dict {'frame': {'header': {}, 'infos': {}}} with same keys and string values than JSON format,
+                      empty dict if infoType is unknown or frame too short.
+    """
+    binary = unhexlify(data.strip())
+    if len(binary) <= INFOTYPE_POS : return {}
+    iType = ord(binary[INFOTYPE_POS])
+    if iType not in FRAME_STRUCTS : return {}
+    frameStruct, fields = FRAME_STRUCTS[iType]
+    if len(binary) < frameStruct.size : return {}
+    raw = frameStruct.unpack_from(binary)
+    protocol = str(raw[6])
+    header = {'frameType': str(raw[0]), 'cluster': str(raw[1]), 'dataFlag': str(raw[2]), 'rfLevel': str(raw[3]),
+              'floorNoise': str(raw[4]), 'rfQuality': str(raw[5]), 'protocol': protocol,
+              'protocolMeaning': PROTOCOLS[protocol]['name'] if protocol in PROTOCOLS else "UNKNOWN",
+              'infoType': str(iType), 'frequency': FREQUENCIES.get(raw[2], "")}
+    values = dict(zip(fields, raw[len(HEADER_FIELDS):]))
+    if iType == 0 :
+        infos = {'subType': str(values['subType']), 'id': str(values['id'])}
+    elif iType in (1, 2, 3, 10, 11) :
+        infos = _infos_id(values)
+    else :
+        infos = _infos_sensor(values)
+        infos['measures'] = _measures(iType, values)
+    return {'frame': {'header': header, 'infos': infos}}
+
+if __name__ == "__main__":
+    # Benchmark : bytes/frame and decoding time of HEXA frames against same frames received in JSON from a RFP1000.
+    import json
+    import timeit
+    from binascii import hexlify
+
+    samples = [
+        (4, (0, 0, 0, -73, -98, 10, 5, 4, 0, 0xFA28, 59650, 17, 231, 81),          # OREGON THGR810
+         "{'frame' :{'header': {'frameType': '0', 'cluster': '0', 'dataFlag': '0', 'rfLevel': '-73', 'floorNoise': '-98', 'rfQuality': '10','protocol': '5', 'protocolMeaning': 'OREGON', 'infoType': '4', 'frequency': '433920'},'infos': {'subType': '0', 'id_PHY': '0xFA28', 'id_PHYMeaning': 'THGR810','adr_channel': '59650',  'adr': '233',  'channel': '2',  'qualifier': '17','lowBatt': '0', 'measures' : [{'type' : 'temperature', 'value' : '+23.1', 'unit' : 'Celsius'}, {'type' : 'hygrometry', 'value' : '81', 'unit' : '%'}]}}}"),
+        (5, (0, 0, 0, -68, -96, 7, 5, 5, 0, 0x5A6D, 24580, 17, 215, 75, 1016),    # OREGON THGR918N
+         "{'frame' :{'header': {'frameType': '0', 'cluster': '0', 'dataFlag': '0', 'rfLevel': '-68', 'floorNoise': '-96', 'rfQuality': '7','protocol': '5', 'protocolMeaning': 'OREGON', 'infoType': '5', 'frequency': '433920'},'infos': {'subType': '0', 'id_PHY': '0x5A6D', 'id_PHYMeaning': 'THGR918N','adr_channel': '24580',  'adr': '96',  'channel': '4',  'qualifier': '17','lowBatt': '1', 'measures' : [{'type' : 'temperature', 'value' : '+21.5', 'unit' : 'Celsius'}, {'type' : 'hygrometry', 'value' : '75', 'unit' : '%'}, {'type' : 'pressure', 'value' : '1016', 'unit' : 'hPa'}]}}}"),
+        (9, (0, 0, 0, -71, -98, 5, 5, 9, 0, 0x2A19, 39168, 48, 10401, 0, 805),     # OREGON PCR800
+         "{ 'frame' :{'header': {'frameType': '0', 'dataFlag': '0', 'rfLevel': '-71', 'floorNoise': '-98', 'rfQuality': '5', 'protocol': '5', 'protocolMeaning': 'OREGON', 'infoType': '9', 'frequency': '433920'}, 'infos': {'subType': '0', 'id_PHY': '0x2A19', 'id_PHYMeaning': 'PCR800', 'adr_channel': '39168',  'adr': '153', 'channel': '0',  'qualifier': '48',  'lowBatt': '0', 'measures' : [{'type' : 'total rain', 'value' : '1040.1', 'unit' : 'mm'}, {'type' : 'current rain', 'value' : '8.05', 'unit' : 'mm/h'}]}}}"),
+        ]
+    print(u"{0:>8} {1:>10} {2:>10} {3:>10} {4:>10}".format("infoType", "JSON B", "HEXA B", "JSON us", "HEXA us"))
+    for iType, values, jsonData in samples :
+        hexData = hexlify(FRAME_STRUCTS[iType][0].pack(*values)).upper()
+        n = 20000
+        # Same decoding than SerialRFPlayer.decode_JSON
+        tJson = timeit.timeit(lambda: json.loads(jsonData.replace("'", '"')), number=n) / n * 1000000
+        tHex = timeit.timeit(lambda: decode_HEX_frame(hexData), number=n) / n * 1000000
+        print(u"{0:>8} {1:>10} {2:>10} {3:>10.1f} {4:>10.1f}".format(iType, len("ZIA33" + jsonData + "\r"),
+                                                                   len("ZIA00" + hexData + "\r"), tJson, tHex))
@@ -102,6 +102,20 @@ def getInfoType(data) :
     elif data['header']['infoType'] == "11" : return InfoType11(data)
     return None
 
+# Units by group of protocols with ALL command (switch_all), group is id / units (X10 house code).
+GROUP_UNITS = {"1": 16, "4": 16}
+
+def getGroupKey(protocol, id):
+    """ Return group of a device id for protocols with ALL command, None if protocol has no group command.
+        @param protocol : protocol id in PROTOCOLS
+        @param id : device id, numeric or X10 address (ex : 'A1')
+    """
+    if protocol in GROUP_UNITS and 'switch_all' in PROTOCOLS[protocol].get('cmds', {}) :
+        id = u"{0}".format(id).strip()
+        if id.isdigit() : return int(id) // GROUP_UNITS[protocol]
+        if protocol == "1" and id[:1].isalpha() : return ord(id[0].upper()) - ord('A')  # X10 house code
+    return None
+
 def getInfoTypesFromProtocol(protocol):
     """ Return infotype(s) corresponding to protocol"""
     if protocol in PROTOCOLS :
@@ -143,6 +157,8 @@ class InfoType(object) :
     """Base class to handle InfoType"""
 
     infoType = "255"
+    # Sensors valued from measures : {(sensor data_type, measure unit or None for any unit): converter of measure value}
+    MEASURE_CONVERTERS = {}
 
     def __init__(self, data) :
         """ Initialize InfoType object with RFP Data
@@ -179,8 +195,46 @@ class InfoType(object) :
             @param sensor : the domogik sensor data_type dict.
             @return : value in data_type format, else None.
         """
+        if self.MEASURE_CONVERTERS :
+            try :
+                return self.compile_sensor(sensor)(self, self.get_measures())
+            except :
+                print(u"{0}".format(traceback.format_exc()))
         return None
 
+    def get_measures(self):
+        """Return measures of RFP data grouped by type, in one pass over frame."""
+        measures = {}
+        for mes in self.data['infos'].get('measures', []) :
+            measures.setdefault(mes['type'], []).append(mes)
+        return measures
+
+    @classmethod
+    def compile_sensor(cls, sensor):
+        """Return extractor of a domogik sensor value for this infotype, compiled once for a device type.
+            @param sensor : the domogik sensor data_type dict.
+            @return : function(iType, measures) returning value in data_type format, else None.
+                      measures is dict returned by iType.get_measures().
+        """
+        if not cls.MEASURE_CONVERTERS :
+            return lambda iType, measures: iType.get_RFP_data_to_sensor(sensor)
+        name = sensor['name']
+        converters = dict((unit, conv) for (dataType, unit), conv in cls.MEASURE_CONVERTERS.items() if dataType == sensor['data_type'])
+        anyUnit = converters.get(None)
+        if sensor['reference'] == "low_battery" :
+            other = lambda iType: int(iType.data['infos']['lowBatt'])
+        elif sensor['reference'] == "rf_quality" :
+            other = lambda iType: int(iType.data['header']['rfQuality']) * 10
+        else :
+            other = lambda iType: None
+        if not converters : return lambda iType, measures: other(iType)
+        def extract(iType, measures):
+            for mes in measures.get(name, ()) :
+                conv = converters.get(mes['unit'], anyUnit)
+                if conv is not None : return conv(mes['value'])
+            return other(iType)
+        return extract
+
     def get_Available_Sensors(self):
         """Return all dmg sensors id available by this infotype, for device detection"""
         return []
@@ -393,6 +447,7 @@ class InfoType4(InfoType) :
     """Info Type for OREGON protocol"""
 
     infoType = "4"
+    MEASURE_CONVERTERS = {("DT_Temp", "Celsius"): float, ("DT_Humidity", "%"): int}
 
     @property
     def protocols_Id(self):
@@ -406,25 +461,6 @@ class InfoType4(InfoType) :
             return "{0}.{1}.{2}".format(self.data['infos']['id_PHY'], self.data['infos']['adr'], self.data['infos']['channel'])
         return ""
 
-    def get_RFP_data_to_sensor(self, sensor):
-        """ Return sensor value from RFP data"""
-        print("Format value : {0}".format(self.data))
-        try :
-            for mes in self.data['infos']['measures']:
-                if mes['type'] == sensor['name']:
-                    if sensor['data_type'] == "DT_Temp" and mes['unit'] == 'Celsius':
-                        return float(mes['value'])
-                    elif sensor['data_type'] == "DT_Humidity" and mes['unit'] == '%':
-                        return int(mes['value'])
-            if sensor['reference'] == "low_battery" :
-                return int(self.data['infos']['lowBatt'])
-            elif sensor['reference'] == "rf_quality" :
-                return int(self.data['header']['rfQuality']) * 10
-        except :
-            print(u"{0}".format(traceback.format_exc()))
-            pass
-        return None
-
     def get_Available_Sensors(self):
         """Return all dmg sensors id available by this infotype, for device detection"""
         sensors = [["temperature", "low_battery", "rf_quality"]]
@@ -439,28 +475,8 @@ class InfoType5(InfoType4) :
         inherit from InfoType4 of OREGON"""
 
     infoType = "5"
-
-    def get_RFP_data_to_sensor(self, sensor):
-        """ Return sensor value from RFP data"""
-        print("Format value : {0}".format(self.data))
-        try :
-            for mes in self.data['infos']['measures']:
-                if mes['type'] == sensor['name']: # TODO: Check type and name correspondance on real data
-                    if sensor['data_type'] == "DT_Temp" and mes['unit'] == 'Celsius':
-                        return float(mes['value'])
-                    elif sensor['data_type'] == "DT_Humidity" and mes['unit'] == '%':
-                        return int(mes['value'])
-                    elif sensor['data_type'] == "DT_Pressure" and mes['unit'] == 'hPa':
-                        # convert hPa to Pa for DT_Pressure
-                        return int(mes['value']) * 100
-            if sensor['reference'] == "low_battery" :
-                return int(self.data['infos']['lowBatt'])
-            elif sensor['reference'] == "rf_quality" :
-                return int(self.data['header']['rfQuality']) * 10
-        except :
-            print(u"{0}".format(traceback.format_exc()))
-            pass
-        return None
+    MEASURE_CONVERTERS = {("DT_Temp", "Celsius"): float, ("DT_Humidity", "%"): int,
+                          ("DT_Pressure", "hPa"): lambda value: int(value) * 100}    # convert hPa to Pa for DT_Pressure
 
     def get_Available_Sensors(self):
         """Return all dmg sensors id available by this infotype, for device detection"""
@@ -472,25 +488,7 @@ class InfoType6(InfoType4) :
         inherit from InfoType4 of OREGON"""
 
     infoType = "6"
-
-    def get_RFP_data_to_sensor(self, sensor):
-        """ Return sensor value from RFP data"""
-        print("Format value : {0}".format(self.data))
-        try :
-            for mes in self.data['infos']['measures']:
-                if mes['type'] == sensor['name']:  # TODO: Check type and name correspondance on real data
-                    if sensor['data_type'] == "DT_Speed" and mes['unit'] == 'm/s':
-                        return float(mes['value'])
-                    elif sensor['data_type'] == "DT_Angle" and mes['unit'] == 'degree':
-                        return int(mes['value'])
-            if sensor['reference'] == "low_battery" :
-                return int(self.data['infos']['lowBatt'])
-            elif sensor['reference'] == "rf_quality" :
-                return int(self.data['header']['rfQuality']) * 10
-        except :
-            print(u"{0}".format(traceback.format_exc()))
-            pass
-        return None
+    MEASURE_CONVERTERS = {("DT_Speed", "m/s"): float, ("DT_Angle", "degree"): int}
 
     def get_Available_Sensors(self):
         """Return all dmg sensors id available by this infotype, for device detection"""
@@ -502,23 +500,7 @@ class InfoType7(InfoType4) :
        inherit from InfoType4 of OREGON"""
 
     infoType = "7"
-
-    def get_RFP_data_to_sensor(self, sensor):
-        """ Return sensor value from RFP data"""
-        print("Format value : {0}".format(self.data))
-        try :
-            for mes in self.data['infos']['measures']:
-                if mes['type'] == sensor['name']:  # TODO: Check type unit and name correspondance on real data
-                    if sensor['data_type'] == "DT_Number" : # and mes['unit'] == '': # TODO: NO unit control for momment, must be checked
-                        return int(mes['value'])
-            if sensor['reference'] == "low_battery" :
-                return int(self.data['infos']['lowBatt'])
-            elif sensor['reference'] == "rf_quality" :
-                return int(self.data['header']['rfQuality']) * 10
-        except :
-            print(u"{0}".format(traceback.format_exc()))
-            pass
-        return None
+    MEASURE_CONVERTERS = {("DT_Number", None): int}    # TODO: NO unit control for momment, must be checked
 
     def get_Available_Sensors(self):
         """Return all dmg sensors id available by this infotype, for device detection"""
@@ -528,6 +510,8 @@ class InfoType8(InfoType) :
     """Info Type for OWL protocol"""
 
     infoType = "8"
+    # TODO: Handle qualifier ? D1 = 0 : Only the tatal instaneous power is given, D1 = 1 : power in each imput 1,2,3
+    MEASURE_CONVERTERS = {("DT_ActiveEnergy", "Wh"): int, ("DT_Power", "W"): int}    # power, P1, P2, P3
 
     @property
     def protocols_Id(self):
@@ -541,26 +525,6 @@ class InfoType8(InfoType) :
             return "{0}.{1}.{2}".format(self.data['infos']['id_PHY'], self.data['infos']['adr'], self.data['infos']['channel'])
         return ""
 
-    def get_RFP_data_to_sensor(self, sensor):
-        """ Return sensor value from RFP data"""
-        print("Format value : {0}".format(self.data))
-        # TODO: Handle qualifier ? D1 = 0 : Only the tatal instaneous power is given, D1 = 1 : power in each imput 1,2,3
-        try :
-            for mes in self.data['infos']['measures']:
-                if mes['type'] == sensor['name']:  # TODO: Check type and name correspondance on real data
-                    if sensor['data_type'] == "DT_ActiveEnergy" and mes['unit'] == 'Wh':
-                        return int(mes['value'])
-                    elif sensor['data_type'] == "DT_Power" and mes['unit'] == 'W': # power, P1, P2, P3
-                        return int(mes['value'])
-            if sensor['reference'] == "low_battery" :
-                return int(self.data['infos']['lowBatt'])
-            elif sensor['reference'] == "rf_quality" :
-                return int(self.data['header']['rfQuality']) * 10
-        except :
-            print(u"{0}".format(traceback.format_exc()))
-            pass
-        return None
-
     def get_Available_Sensors(self):
         """Return all dmg sensors id available by this infotype, for device detection"""
         return [["energy", "power", "P1", "P2", "P3", "low_battery", "rf_quality"]]
@@ -570,25 +534,7 @@ class InfoType9(InfoType4) :
        inherit from InfoType4 of OREGON"""
 
     infoType = "9"
-
-    def get_RFP_data_to_sensor(self, sensor):
-        """ Return sensor value from RFP data"""
-        print("Format value : {0}".format(self.data))
-        try :
-            for mes in self.data['infos']['measures']:
-                if mes['type'] == sensor['name']:  # TODO: Check type and name correspondance on real data
-                    if sensor['data_type'] == "DT_mMeter" and mes['unit'] == 'mm':
-                        return float(mes['value'])
-                    elif sensor['data_type'] == "DT_mMeterHour" and mes['unit'] == 'mm/h':
-                        return float(mes['value'])
-            if sensor['reference'] == "low_battery" :
-                return int(self.data['infos']['lowBatt'])
-            elif sensor['reference'] == "rf_quality" :
-                return int(self.data['header']['rfQuality']) * 10
-        except :
-            print(u"{0}".format(traceback.format_exc()))
-            pass
-        return None
+    MEASURE_CONVERTERS = {("DT_mMeter", "mm"): float, ("DT_mMeterHour", "mm/h"): float}
 
     def get_Available_Sensors(self):
         """Return all dmg sensors id available by this infotype, for device detection"""
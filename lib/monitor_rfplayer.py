@@ -43,7 +43,7 @@ import threading
 from datetime import datetime
 import time
 from domogik_packages.plugin_rfplayer.lib.defs import getRFPId, RFPlayerException
-from collections import deque
+from Queue import Queue
 import pprint
 import traceback
 
@@ -63,7 +63,7 @@ class ManageMonitorClient(threading.Thread):
         self.name = "Manage_Monitor_Client"
         self._rfpManager = rfpManager
         self.ClientsMonitor={}
-        self.__reports = deque([])
+        self.__reports = Queue()
         self._pluginLog = rfpManager.log
         self._stop = rfpManager._stop
         self._running = False
@@ -79,13 +79,13 @@ class ManageMonitorClient(threading.Thread):
         self._running = True
         self._pluginLog.info(u'Monitor client(s) manager is started.')
         while not self._stop.isSet() and self._running :
-            if self.__reports :
-                report = self.__reports.popleft()
-                try :
-                    self.logClient(report['date'], report['type'], report['clientID'], report['data'])
-                except :
-                    self._pluginLog.warning(u"Monitor client bad report : {0}, {1}".format(traceback.format_exc(), report))
-            else : self._stop.wait(0.01)
+            # Wait without timeout, stop() put a None report to wake up.
+            report = self.__reports.get()
+            if report is None : continue
+            try :
+                self.logClient(report['date'], report['type'], report['clientID'], report['data'])
+            except :
+                self._pluginLog.warning(u"Monitor client bad report : {0}, {1}".format(traceback.format_exc(), report))
         # flush and close list nodes
         for client in self.ClientsMonitor :
             self.ClientsMonitor[client].close()
@@ -95,6 +95,7 @@ class ManageMonitorClient(threading.Thread):
     def stop(self):
         """Stop all thread of monitoring"""
         self._running = False
+        self.__reports.put(None)
 
     def mq_report(self, device, dmgId):
         """Callback from MQ message"""
@@ -104,13 +105,13 @@ class ManageMonitorClient(threading.Thread):
                 if 'node' in device :
                     if self.isMonitored(homeId, device['node']) :
                         if 'instance' in device :
-                            self.__reports.append({'date': datetime.now(),'type': "MQ report : ",
+                            self.__reports.put({'date': datetime.now(),'type': "MQ report : ",
                                     'homeId': homeId,
                                     'nodeId': device['node'],
                                     'instance': device['instance'],
                                     'datas' : str(dmgId)})
                         else:
-                            self.__reports.append({'date': datetime.now(),'type': "MQ report : ",
+                            self.__reports.put({'date': datetime.now(),'type': "MQ report : ",
                                     'homeId': homeId,
                                     'nodeId': device['node'],
                                     'datas' : str(dmgId)})
@@ -121,7 +122,7 @@ class ManageMonitorClient(threading.Thread):
         """Callback from client himself."""
         if self.hasMonitored :
             if self.isMonitored(clientID) :
-                self.__reports.append({'clientID': clientID,
+                self.__reports.put({'clientID': clientID,
                                     'date': time.strftime('%Y-%m-%d %H:%M:%S.{0}'.format(repr(timestamp).split('.')[1][:3]), time.localtime(timestamp)),
                                     'type': "Raw recieved : ", 'data': msg})
 
@@ -129,7 +130,7 @@ class ManageMonitorClient(threading.Thread):
         """Callback from manager for client."""
         if self.hasMonitored :
             if self.isMonitored(clientID) :
-                self.__reports.append({'clientID': clientID,
+                self.__reports.put({'clientID': clientID,
                         'date': time.strftime('%Y-%m-%d %H:%M:%S.{0}'.format(repr(timestamp).split('.')[1][:3]), time.localtime(timestamp)),
                         'type': "Data for new device {0} :".format(iType.dmgDevice_Id), 'data': iType.data})
 
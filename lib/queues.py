@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Bounded queues with overload policy used between RFPlayer serial port and handlers
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+import time
+from collections import deque
+try :
+    from Queue import Queue
+except ImportError :
+    from queue import Queue     # python 3
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+COALESCE = 'coalesce'
+POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+# Kind of RF commands, a command supersede a command of same kind waiting for same device.
+COMMAND_KINDS = {'ON': 'switch', 'OFF': 'switch', 'DIM': 'dimmer',
+                 'ALL_ON': 'switch_all', 'ALL_OFF': 'switch_all'}
+# Relative RF commands, applied on result of waiting commands : never superseded, and they keep waiting commands of same kind.
+RELATIVE_COMMANDS = {'BRIGHT': 'dimmer'}
+
+class Fence(tuple):
+    """ Key of an item never coalesced, items with same key waiting before it can't be superseded any more."""
+    pass
+
+def frameKey(data):
+    """ Return device key of a received RF frame record, None if not a RF frame (ex : response)"""
+    msg = data.get('msg') if type(data) == dict else None
+    if type(msg) == dict and 'frame' in msg :
+        try :
+            header = msg['frame']['header']
+            infos = msg['frame']['infos']
+            if 'id' in infos :
+                return (header['protocol'], header['infoType'], infos['subType'], infos['id'])
+            return (header['protocol'], header['infoType'], infos['subType'], infos.get('id_PHY'), infos.get('adr_channel'))
+        except :
+            pass
+    return None
+
+def isProtected(data):
+    """ Return True if a record must never be dropped nor coalesced : wake-up sentinel (None),
+          command waiting a response or response matched to a pending request.
+    """
+    return data is None or (type(data) == dict and (data.get('request') is not None or bool(data.get('ackFor'))))
+
+def commandKey(data):
+    """ Return device key of a command record to write, None for request waiting a response or command without kind.
+          Key is protocol, device address and kind of command (ex : 'ZIA++ DIM A1 X10 %50' -> ('X10', 'A1', 'dimmer')),
+          a Fence for a relative command (ex : 'ZIA++ BRIGHT A1 X10').
+    """
+    if type(data) == dict and data.get('request') is None :
+        parts = data['data'].split(' ')
+        if len(parts) >= 4 :
+            if parts[1] in COMMAND_KINDS : return (parts[3], parts[2], COMMAND_KINDS[parts[1]])
+            if parts[1] in RELATIVE_COMMANDS : return Fence((parts[3], parts[2], RELATIVE_COMMANDS[parts[1]]))
+    return None
+
+class RFPQueue(Queue):
+    """ Queue never blocking producer, with a bound and a policy applied when full :
+            - drop_oldest : oldest item is removed to keep last ones.
+            - drop_newest : new item is dropped.
+            - coalesce : new item replace item with same key still in queue, else drop oldest.
+          With supersede, items are always coalesced on their key, whatever the queue size.
+          An item with a Fence key is never coalesced and items with same key waiting before it are kept.
+          Items put by put_first are got before others, in their order, and are never dropped nor coalesced.
+          Protected records (see isProtected) are never dropped, queue can exceed its bound to keep them.
+    """
+
+    def __init__(self, maxsize=0, policy=DROP_OLDEST, keyFunc=None, supersede=False):
+        """ Init bounded queue
+            @param maxsize : max items in queue, 0 for unbounded. Default: 0
+            @param policy : overload policy, one of POLICIES. Default: drop_oldest
+            @param keyFunc : function returning coalescing key of an item, None if item can't be coalesced.
+            @param supersede : optional, new item always replace waiting item with same key. Default: False
+        """
+        Queue.__init__(self, maxsize)
+        self.policy = policy if policy in POLICIES else DROP_OLDEST
+        self._keyFunc = keyFunc
+        self._supersede = supersede
+        self._coalesce = supersede or self.policy == COALESCE
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.highWater = 0
+
+    def _init(self, maxsize):
+        self.queue = deque()
+        self._keys = {}
+        self._heads = 0     # Items put by put_first, at head of queue
+
+    def _put(self, item, key=None):
+        # Items are stored in a list to be replaced in place by coalescing
+        entry = [item, key]
+        if key is not None : self._keys[key] = entry
+        self.queue.append(entry)
+
+    def _get(self):
+        if self._heads : self._heads -= 1
+        entry = self.queue.popleft()
+        if entry[1] is not None and self._keys.get(entry[1]) is entry :
+            del self._keys[entry[1]]
+        return entry[0]
+
+    def _dropOldest(self):
+        """ Remove oldest item not protected, return False if all items are protected."""
+        for i, entry in enumerate(self.queue) :
+            if i >= self._heads and not isProtected(entry[0]) :
+                del self.queue[i]
+                if entry[1] is not None and self._keys.get(entry[1]) is entry :
+                    del self._keys[entry[1]]
+                self.unfinished_tasks -= 1
+                return True
+        return False
+
+    def put(self, item, block=True, timeout=None):
+        """ Put an item in queue, never block. Overload policy is applied if queue is full."""
+        with self.mutex:
+            self.enqueued += 1
+            protected = isProtected(item)
+            full = self.maxsize > 0 and self._qsize() >= self.maxsize
+            key = None
+            if self._coalesce and self._keyFunc is not None and not protected :
+                key = self._keyFunc(item)
+                if isinstance(key, Fence) :
+                    self._keys.pop(key, None)
+                    key = None
+                if key is not None and key in self._keys and (self._supersede or full) :
+                    # Futures of superseded command (asyncio API) are done when new command is written
+                    if 'futures' in self._keys[key][0] : item['futures'] = self._keys[key][0]['futures'] + item.get('futures', [])
+                    self._keys[key][0] = item
+                    self.coalesced += 1
+                    return
+            if full and not protected :
+                self.dropped += 1
+                if self.policy == DROP_NEWEST or not self._dropOldest() : return
+            self._put(item, key)
+            self.unfinished_tasks += 1
+            size = self._qsize()
+            if size > self.highWater : self.highWater = size
+            self.not_empty.notify()
+
+    def put_nowait(self, item):
+        """ Put an item in queue, never block."""
+        return self.put(item, False)
+
+    def put_first(self, item):
+        """ Put an item at head of queue, after items already put first. Never block, queue can exceed its bound."""
+        self._putFirst(item, True)
+
+    def put_back(self, item):
+        """ Put back an item got but not handled (ex : command not written), before items waiting except ones put first."""
+        self._putFirst(item, False)
+
+    def _putFirst(self, item, head):
+        with self.mutex:
+            self.enqueued += 1
+            # deque of python 2 has no insert
+            self.queue.rotate(-self._heads)
+            self.queue.appendleft([item, None])
+            self.queue.rotate(self._heads)
+            if head : self._heads += 1
+            self.unfinished_tasks += 1
+            size = self._qsize()
+            if size > self.highWater : self.highWater = size
+            self.not_empty.notify()
+
+    def find(self, key):
+        """ Return item waiting in queue with a coalescing key, None if not found."""
+        with self.mutex:
+            entry = self._keys.get(key)
+            return entry[0] if entry is not None else None
+
+    def peek(self):
+        """ Return first item without removing it, None if queue is empty."""
+        with self.mutex:
+            return self.queue[0][0] if self._qsize() else None
+
+    def getBatch(self, maxItems=1, budget=None, block=True, timeout=None):
+        """ Wait for an item then drain all items available, up to maxItems or time budget.
+            @param maxItems : max items returned. Default: 1
+            @param budget : max time (s) spent to drain queue, None for no limit. Default: None
+            @param block, timeout : same as Queue.get for first item, raise Empty.
+            @return : list of items in queue order
+        """
+        items = [self.get(block, timeout)]
+        if maxItems > 1 :
+            end = time.time() + budget if budget else None
+            with self.mutex:
+                while self._qsize() and len(items) < maxItems :
+                    items.append(self._get())
+                    if end is not None and time.time() > end : break
+                self.not_full.notify()
+        return items
+
+    def getStats(self):
+        """ Return queue counters"""
+        with self.mutex:
+            return {'size': self._qsize(), 'maxsize': self.maxsize, 'policy': self.policy, 'enqueued': self.enqueued,
+                    'dropped': self.dropped, 'coalesced': self.coalesced, 'highWater': self.highWater}
@@ -45,7 +45,7 @@ import json
 import serial
 import time
 import traceback
-from serial_rfplayer import SerialRFPlayer
+from domogik_packages.plugin_rfplayer.lib.serial_rfplayer import SerialRFPlayer
 
 BAND_SPECIF = { 'Frequency': {'cmd' : {
                                 'name' :'FREQ',
@@ -142,8 +142,8 @@ BAND_SPECIF = { 'Frequency': {'cmd' : {
                 'LBT':        {'cmd' : {
                                 'name' :'LBT',
                                 'params' : {
-                                        'values': dict({"0": u"Inhibits LBT function"}.items() +
-                                                {str(x):u"{0} dBm{1}".format(x, " <Default>" if x==16 else "") for x in range(6,31)}.items()),
+                                        'values': dict([("0", u"Inhibits LBT function")] +
+                                                [(str(x), u"{0} dBm{1}".format(x, " <Default>" if x==16 else "")) for x in range(6,31)]),
                                         'help': u"Set receiver Listen Before Talk value in dBm."},
                                 },
                                 'help' : u"Out of bounds value of val leads to come back to the default value. \
@@ -159,7 +159,9 @@ class SerialRFP1000(SerialRFPlayer):
 
     def __init__(self, manager, rfp_device, cd_handle_RFP_Data,
                  baudrate=115200, bytesize=serial.EIGHTBITS, parity=serial.PARITY_NONE,
-                 stopbits=serial.STOPBITS_ONE, timeout=0.1, xonxoff=0, rtscts=1, dsrdtr=None, fake_device=None):
+                 stopbits=serial.STOPBITS_ONE, timeout=0.1, xonxoff=0, rtscts=1, dsrdtr=None, fake_device=None, data_format='JSON',
+                 queues={}, batch_size=SerialRFPlayer.BATCH_SIZE, tickless=True, tx_scheduler=True, tx_holdoff=0,
+                 dedup_windows=SerialRFPlayer.DEDUP_WINDOWS, reconnect=True):
         """ Init An RFP1000 device and start communication.
             @param manager : RFPManager instance
             @param rfp_device : rfplayer device (ex : /dev/rfplayer)
@@ -174,11 +176,19 @@ class SerialRFP1000(SerialRFPlayer):
             @param rtscts : optional serial port hardware flow control rtscts. Default: unable (1)
             @param dsrdtr : optional serial port hardware flow control rtscts. Default: disabled (None)
             @param fake_device : optional fake device. If None, this will not be used. Else, the fake serial device library will be used. Default: None
+            @param data_format : optional format of RF frames received : JSON, HEXA, HEXA FIXED. Default: JSON
+            @param queues : optional bounds and overload policy of received and write queues. Default: SerialRFPlayer.QUEUES
+            @param batch_size : optional max RF frames handled in one call, 1 to disable batch. Default: SerialRFPlayer.BATCH_SIZE
+            @param tickless : optional, block on serial port without timeout when idle. Default: True
+            @param tx_scheduler : optional, commands dispatched by RF band (433/868) when band is free. Default: True
+            @param tx_holdoff : optional time (s) a RF command wait to be superseded by a newer one. Default: 0
+            @param dedup_windows : optional window (s) of repeated frames suppression by protocol name, None to disable. Default: SerialRFPlayer.DEDUP_WINDOWS
+            @param reconnect : optional, serial port lost is reopened with exponential back-off. Default: True
         """
         self._sendMessage = cd_handle_RFP_Data
         self.status = {}
         SerialRFPlayer.__init__(self, manager, rfp_device, self.handle_msg,
-                                baudrate, bytesize, parity, stopbits, timeout, xonxoff, rtscts, dsrdtr, fake_device)
+                                baudrate, bytesize, parity, stopbits, timeout, xonxoff, rtscts, dsrdtr, fake_device, data_format, queues, batch_size, tickless, tx_scheduler, tx_holdoff, dedup_windows, reconnect)
 
     @property
     def RFP_Id(self):
@@ -189,16 +199,17 @@ class SerialRFP1000(SerialRFPlayer):
         """ Open serial com and start communication."""
         if SerialRFPlayer.open(self) :
             self.start_services()
-            self.getStatus()
             return True
         else :
             return False
 
-    def getStatus(self):
-        """ Send a STATUS command to rfplayer"""
+    def getStatus(self, first=False):
+        """ Send a STATUS command to rfplayer
+            @param first : optional, send command before commands waiting in queue (ex : at open). Default: False
+        """
         if  self.rfPlayer is not None :
             self.log.info(u"Get Status of {0}".format(self.RFP_device))
-            self.send_to_RFP('STATUS JSON', True, self.setStatus)
+            self.send_to_RFP('STATUS JSON', True, self.setStatus, first = first)
 
     def setStatus(self, data, ack=''):
         """ Decode Status data from RFP100 JSON, can be call by callback request.
@@ -214,9 +225,28 @@ class SerialRFP1000(SerialRFPlayer):
             self.status['systemStatus'] = data['systemStatus']
         if 'radioStatus' in data :
             self.status['radioStatus'] = data['radioStatus']
+            if hasattr(self.write_RFP, 'setLBT') : self.setBandsLBT(data['radioStatus'])
+
+    def setBandsLBT(self, radioStatus):
+        """ Give LBT state of each band to transmit scheduler
+            @param radioStatus: radioStatus data of STATUS JSON
+        """
+        for bands in radioStatus.values() :
+            if type(bands) != list : continue
+            for band in bands :
+                if 'i' not in band : continue
+                params = dict((param['n'], param['v']) for param in band['i'] if 'n' in param and 'v' in param)
+                if 'Frequency' in params and 'LBT' in params :
+                    freq = '433' if params['Frequency'].find('433') != -1 else '868'
+                    self.write_RFP.setLBT(freq, params['LBT'].strip() not in ('0', ''))
 
     def handle_msg(self, client, msg):
-        """Handle msg to MQ"""
+        """Handle msg to MQ
+            @param msg : message dict or list of RF frames received in batch.
+        """
+        if type(msg) == list :
+            self._sendMessage(client, msg)
+            return
         print(msg)
         if "radioStatus" in msg :
             self.setStatus(msg)
@@ -237,7 +267,7 @@ class SerialRFP1000(SerialRFPlayer):
         retVal = {}
         if 'radioStatus' in self.status :
             retVal['radioStatus'] = []
-            for i, bands in self.status['radioStatus'].iteritems() :
+            for i, bands in self.status['radioStatus'].items() :
                 for band in bands :
                     if 'i' in band :
                         b = {'band':'unknown', 'params':{}}
@@ -277,7 +307,7 @@ class SerialRFP1000(SerialRFPlayer):
                 if 'transmitter' not in param and 'receiver' not in param and 'repeater' not in param :
                     detail[param['n']] = {'value': param['v'], 'unit': param['unit'], 'comment': param['c']}
                 else :
-                    key = param.keys()[0]
+                    key = list(param.keys())[0]
                     if key not in prot : prot[key] = {}
                     if 'available' in param[key] :
                         for p in param[key]['available']['p'] :
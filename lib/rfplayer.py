@@ -43,11 +43,17 @@ Implements
 import traceback
 import threading
 import time
+import json
 
 from domogik_packages.plugin_rfplayer.lib.infotypes import *
 from domogik_packages.plugin_rfplayer.lib.defs import *
 from domogik_packages.plugin_rfplayer.lib.monitor_rfplayer import ManageMonitorClient
 from domogik_packages.plugin_rfplayer.lib.rfp1000 import SerialRFP1000
+from domogik_packages.plugin_rfplayer.lib.eventloop import RFPEventLoop, Waker
+from domogik_packages.plugin_rfplayer.lib.dedup import parseWindows
+from domogik_packages.plugin_rfplayer.lib.decodecache import DecodeCache, payloadKey
+from domogik_packages.plugin_rfplayer.lib.sensorfilter import SensorFilter, parseRules
+from domogik_packages.plugin_rfplayer.lib.aggregate import SensorAggregator, parseAggregates
 
 def checkIfConfigured(deviceType,  device):
     """ Check if device_type have his all paramerter configured.
@@ -62,14 +68,56 @@ class RFPManager(object):
 
     """" Manager RFPlayer(s)
     """
-    def __init__ (self, plugin, cb_send_sensor) :
-        """Init RFPlayer manager client"""
+    def __init__ (self, plugin, cb_send_sensor, cb_send_sensors=None) :
+        """Init RFPlayer manager client
+            @param cb_send_sensor : callback(device, sensor_id, dt_type, value) publishing one sensor value.
+            @param cb_send_sensors : optional callback({sensor_id: value}) publishing several sensors values in one message.
+        """
         self._plugin = plugin
         self._send_sensor = cb_send_sensor
+        self._send_sensors = cb_send_sensors
+        self.sensorsPublished = {'messages': 0, 'values': 0}
         self._stop = plugin.get_stop()  # TODO : pas forcement util ?
         self.rfpClients = {} # list of all RFPlayer
+        self.dataFormat = self._plugin.get_config('data_format') or 'JSON'
+        self.queuesConfig = self.getQueuesConfig()
+        self.batchSize = self._plugin.get_config('rx_batch_size') or SerialRFP1000.BATCH_SIZE
+        self.tickless = self._plugin.get_config('tickless') is not False
+        self.txScheduler = self._plugin.get_config('tx_scheduler') is not False
+        self.txHoldoff = self._plugin.get_config('tx_holdoff') or 0
+        self.dedupWindows = parseWindows(self._plugin.get_config('rx_dedup'))
+        self.reconnect = self._plugin.get_config('reconnect') is not False
+        cacheSize = self._plugin.get_config('rx_decode_cache')
+        self.decodeCache = DecodeCache(cacheSize if cacheSize is not None else 256) if cacheSize != 0 else None
+        # Sensors extractors compiled by (device_type, infoType), rebuilt when devices change.
+        self.sensorsRoutes = {}
+        heartbeat = self._plugin.get_config('sensor_heartbeat')
+        self.sensorFilter = SensorFilter(parseRules(self._plugin.get_config('sensor_deadband')),
+                                         parseRules(self._plugin.get_config('sensor_interval')),
+                                         parseRules(heartbeat if heartbeat is not None else 60, 60))    # minutes in s
+        if not self.sensorFilter.enabled : self.sensorFilter = None
+        aggregates = parseAggregates(self._plugin.get_config('sensor_aggregate'))
+        self.sensorAggregator = SensorAggregator(aggregates, self.getDmgSensor) if aggregates else None
+        # Optional event loop driving all RFPlayers from one thread, else each RFPlayer use its threads.
+        self.eventLoop = None
+        if self._plugin.get_config('event_loop') :
+            self.eventLoop = RFPEventLoop(self)
+            self.eventLoop.start()
+        # Aggregation windows ended without new sample and values held by filter minimum interval are published by timer.
+        intervals = [o.flushInterval for o in (self.sensorAggregator, self.sensorFilter) if o is not None and o.flushInterval]
+        if intervals :
+            interval = min(intervals)
+            if self.eventLoop is not None :
+                self.eventLoop.callLater(interval, self._flush_sensors, interval)
+            else :
+                self._flushTimer = Timer(interval, self._flush_sensors, self._plugin)
+                self._flushTimer.start()
         self.monitorClients = ManageMonitorClient(self)
         self.monitorClients.start()  # Start supervising nodes activity to helper log.
+        # Threads wait without timeout, they are released by this watcher at plugin stop.
+        watcher = threading.Thread(None, self._wakeupAtStop, "RFPManager_stop", (), {})
+        self._plugin.register_thread(watcher)
+        watcher.start()
         self._plugin.publishMsg('rfplayer.manager.state', self.getManagerInfo())
         # get the devices list
         self.refreshDevices(self._plugin.get_device_list(quit_if_no_device = False, max_attempt = 2))
@@ -91,6 +139,15 @@ class RFPManager(object):
         self.monitorNodes.stop()
         for id in self.rfpClients : self.rfpClients[id] = None
 
+    def _wakeupAtStop(self):
+        """Wait for plugin stop then release threads of clients, event loop and monitor"""
+        self._stop.wait()
+        self.log.info(u"Plugin stop, wake up RFPlayer services.")
+        self.monitorClients.stop()
+        for id in self.rfpClients.keys() :
+            self.rfpClients[id].wakeup_services()
+        if self.eventLoop is not None : self.eventLoop.wakeup()
+
     def closeClients(self):
         """Close all RFPLayer CLients"""
         self.log.info(u"Closing RFPManager.")
@@ -99,6 +156,17 @@ class RFPManager(object):
     def sendRFPcmd(self, device, cmd_id, values):
         """Send command to RFPlayer"""
         print(cmd_id, values)
+        command, reason = self.buildRFPcmd(device, cmd_id, values)
+        if command is not None :
+            command['client'].send_to_RFP(command['data'])
+            return True, None
+        return False, reason
+
+    def buildRFPcmd(self, device, cmd_id, values):
+        """Resolve a domogik command to RFPlayer command
+            @return : (command, None), command is {'client', 'name', 'iType', 'cmd', 'values', 'data': RFP ASCII command},
+                      else (None, reason)
+        """
         cmd = None
         for k in device['commands'].keys():
             if  device['commands'][k]['id'] == cmd_id:
@@ -112,14 +180,125 @@ class RFPManager(object):
                     iType = getInfoTypeFromCmd(device, k, cmd, values)
                     if iType is not None :
                         #Add device address
-                        client.send_to_RFP(iType.get_cmd_to_RFP_data(k, cmd, values))
-                        return True, None
-                    return False, u"Command {0} for {1} does not match to an infoType.".format(cmd, device['device_type_id'])
-                return False, u"Command {0} don't find rfplayer dongle named {1}.".format(cmd, CliName)
-            return False, u"Command {0} device {1} have no dongle id.".format(cmd, device['name'])
+                        return {'client': client, 'name': k, 'iType': iType, 'cmd': cmd, 'values': values,
+                                'data': iType.get_cmd_to_RFP_data(k, cmd, values)}, None
+                    return None, u"Command {0} for {1} does not match to an infoType.".format(cmd, device['device_type_id'])
+                return None, u"Command {0} don't find rfplayer dongle named {1}.".format(cmd, CliName)
+            return None, u"Command {0} device {1} have no dongle id.".format(cmd, device['name'])
         else :
             self.log.warning(u"Command id {0} not exist in device {1}".format(cmd_id, device))
-            return False, u"Command id {0} not exist in device {1}".format(cmd_id, device['name'])
+            return None, u"Command id {0} not exist in device {1}".format(cmd_id, device['name'])
+
+    def sendRFPcmds(self, commands):
+        """Send several commands to RFPlayer(s) with the minimum of RF frames.
+            Same switch command to all domogik devices of a group (ex : X10 house code) on a dongle
+            is replaced by one ALL command (switch_all) of the protocol.
+            @param commands : list of (device, cmd_id, values)
+            @return : list of (status, reason) for each command, in same order
+        """
+        results = [None] * len(commands)
+        built = {}          # index -> command
+        frames = []         # [[client, data, [index of commands], first command]]
+        groups = {}         # (client, protocol, group, value) -> frame
+        for index, (device, cmd_id, values) in enumerate(commands) :
+            command, reason = self.buildRFPcmd(device, cmd_id, values)
+            if command is None :
+                results[index] = (False, reason)
+                continue
+            built[index] = command
+            protocol = command['iType'].data['header']['protocol']
+            group = getGroupKey(protocol, device['parameters']['device']['value']) if command['name'] == 'switch' else None
+            if group is None :
+                frames.append([command['client'], command['data'], [index], None])
+                continue
+            key = (command['client'], protocol, group, u"{0}".format(values['value']))
+            if key not in groups :
+                groups[key] = [command['client'], command['data'], [], command]
+                frames.append(groups[key])
+            groups[key][2].append(index)
+        for key, frame in groups.items() :
+            members = set(commands[i][0]['id'] for i in frame[2])
+            if len(members) > 1 and members >= self.getGroupDevices(key[0], key[1], key[2]) :
+                command = frame[3]
+                allCmd = command['iType'].get_cmd_to_RFP_data('switch_all', command['cmd'], {'value': key[3]})
+                if allCmd is not None :
+                    self.log.debug(u"{0} commands replaced by group command {1}".format(len(frame[2]), allCmd))
+                    frame[1] = allCmd
+                    continue
+            # Group not complete, send a command for each device
+            frames.remove(frame)
+            for i in frame[2] :
+                frames.append([built[i]['client'], built[i]['data'], [i], built[i]])
+        frames.sort(key=lambda f: min(f[2]))
+        for client, data, indexes, command in frames :
+            client.send_to_RFP(data)
+            for i in indexes :
+                results[i] = (True, None if len(indexes) == 1 else u"Sent in group command {0}".format(data))
+        return results
+
+    def processCmdBatch(self, data):
+        """Handle MQ request rfplayer.client.cmdbatch, several domogik commands in one request.
+            @param data : {'commands': [{'device_id': id, 'command_id': id, <command parameters>}, ...]}
+            @return : report {'error', 'results': [{'device_id', 'command_id', 'status', 'reason'}, ...] in same order}
+        """
+        report = {'error': u"", 'results': []}
+        entries = data.get('commands', [])
+        if isinstance(entries, basestring) :
+            try :
+                entries = json.loads(entries)
+            except ValueError :
+                entries = None
+        if type(entries) != list :
+            report['error'] = u"<client.cmdbatch>, Invalid commands list : {0}".format(data)
+            return report
+        commands = []
+        positions = []
+        results = []
+        for entry in entries :
+            result = {'device_id': entry.get('device_id') if type(entry) == dict else None,
+                      'command_id': entry.get('command_id') if type(entry) == dict else None, 'status': False, 'reason': None}
+            results.append(result)
+            try :
+                device = self._plugin.dmgDeviceFromId(result['device_id'])
+                cmd_id = int(result['command_id'])
+            except (TypeError, ValueError) :
+                result['reason'] = u"Invalid command entry : {0}".format(entry)
+                continue
+            values = dict((k, v) for k, v in entry.items() if k not in ['device_id', 'command_id'])
+            if device is None :
+                result['reason'] = u"Abording command, no device found for command : {0}".format(entry)
+            elif values == {} :
+                result['reason'] = u"Abording command, no extra key in command : {0}".format(entry)
+            else :
+                commands.append((device, cmd_id, values))
+                positions.append(result)
+        for result, (status, reason) in zip(positions, self.sendRFPcmds(commands)) :
+            result['status'] = status
+            result['reason'] = reason
+        report['results'] = results
+        return report
+
+    def getGroupDevices(self, client, protocol, group):
+        """Return ids of domogik devices of a protocol group on a RFPlayer client"""
+        ids = set()
+        for device in getattr(self._plugin, 'devices', []) :
+            try :
+                if device['device_type_id'].split(".")[1] != protocol : continue
+                if self.getClientFromDevName(device['parameters']['dongle_id']['value']) is not client : continue
+                if getGroupKey(protocol, device['parameters']['device']['value']) == group : ids.add(device['id'])
+            except (KeyError, IndexError) :
+                pass
+        return ids
+
+    def getQueuesConfig(self):
+        """Return queues bounds and policies from plugin configuration, missing values keep client default."""
+        queues = {'received': {}, 'write': {}}
+        for queue, prefix in [('received', 'rx'), ('write', 'tx')] :
+            size = self._plugin.get_config('{0}_queue_size'.format(prefix))
+            if size is not None and size != "" : queues[queue]['maxsize'] = int(size)
+            policy = self._plugin.get_config('{0}_queue_policy'.format(prefix))
+            if policy : queues[queue]['policy'] = policy
+        return queues
 
     def addClient(self, dmgDevice):
         """Add a RFPLayer from domogik device"""
@@ -132,30 +311,51 @@ class RFPManager(object):
                 if checkIfConfigured(dmgDevice["device_type_id"], dmgDevice ) :
                     if dmgDevice["device_type_id"] == "rfplayer.rfp1000" :
                         self.rfpClients[clID] = SerialRFP1000(self, self._plugin.get_parameter(dmgDevice, 'device'), self._handle_RFP_Data,
-                                                              fake_device = self._plugin.options.test_option)
+                                                              fake_device = self._plugin.options.test_option,
+                                                              data_format = self.dataFormat,
+                                                              queues = self.queuesConfig,
+                                                              batch_size = int(self.batchSize),
+                                                              tickless = self.tickless,
+                                                              tx_scheduler = self.txScheduler,
+                                                              tx_holdoff = int(self.txHoldoff) / 1000.0,
+                                                              dedup_windows = self.dedupWindows,
+                                                              reconnect = self.reconnect)
                     else :
                         self.log.error(u"Manager RFPLayer : RFPLayer Client type {0} not exist, not added.".format(clID))
                         return False
                     self.log.info(u"Manager RFPLayer : created new client {0}.".format(clID))
-                    if self.rfpClients[clID].open() :
-                        # Start thread for starting rfplayer services
-                        timer = self._plugin.get_parameter(dmgDevice, 'timer_status')
-                        if timer != 0 :
-                            Timer(timer, self.rfpClients[clID].ping, self._plugin).start()
-                        else :
-                            self.log.info(u"Ping timer for client {0} disable.".format(clID))
+                    # Dongles are opened in parallel, manager is ready before, each client report its state when it comes up.
+                    opener = threading.Thread(None, self._openClient, "RFPOpen_{0}".format(clID), (self.rfpClients[clID], dmgDevice), {})
+                    self._plugin.register_thread(opener)
+                    opener.start()
                 else :
                     self.log.warning(u"Manager RFPLayer : device not configured can't add new client {0}.".format(clID))
                     return False
             return True
         else : return False
 
+    def _openClient(self, client, dmgDevice):
+        """Open a RFPLayer client and start its ping timer, run in a thread by addClient"""
+        try :
+            if client.open() :
+                timer = self._plugin.get_parameter(dmgDevice, 'timer_status')
+                if timer != 0 :
+                    if client._eventLoop is not None :
+                        self.eventLoop.schedulePing(client, timer)
+                    else :
+                        Timer(timer, client.ping, self._plugin).start()
+                else :
+                    self.log.info(u"Ping timer for client {0} disable.".format(getRFPId(dmgDevice)))
+        except :
+            self.log.error(u"Manager RFPLayer : error while opening client {0} : {1}".format(getRFPId(dmgDevice), traceback.format_exc()))
+
     def removeClient(self, clID):
-        """Remove a RFPLayer client and close it"""
+        """Remove a RFPLayer client, close it and end its threads"""
         client = self.getClient(clID)
         if client :
             client.close()
             self.rfpClients.pop(clID)
+            client.release_services()
 
     def getClient(self, clID):
         """Get RFPLayer client object by id."""
@@ -239,6 +439,10 @@ class RFPManager(object):
 
     def refreshDevices(self, dmgDevices):
         """ Call all clients to refreshe they devices"""
+        if self.decodeCache is not None : self.decodeCache.clear()
+        if self.sensorFilter is not None : self.sensorFilter.clear()
+        if self.sensorAggregator is not None : self.sensorAggregator.clear()
+        self.sensorsRoutes = {}
         self.checkClientsRegistered(dmgDevices)
         self._plugin.publishMsg('rfplayer.manager.state', self.getManagerInfo())
 
@@ -324,31 +528,41 @@ class RFPManager(object):
                     "xpl_stats" : {}
                 })
 
-    def _handle_RFP_Data(self, client, data):
-        """Handle RFP data to domogik sensor """
-        if type(data) == dict and 'frame' in data :
-            iType = getInfoType(data['frame'])
-            if iType is not None :
-                if iType.isValid :
-                    devices = self._plugin.getDmgDevices(iType.dmgDevice_Id)
-                    if devices != [] :
-                        for dmgdev in devices :
-                            for s in dmgdev['sensors']:
-                                value = iType.get_RFP_data_to_sensor(dmgdev['sensors'][s])
-                                print(u" Value formatted : {0} for sensor {1}".format(value, dmgdev['sensors'][s]))
-                                if value is not None :
-                                    self._send_sensor(dmgdev, dmgdev['sensors'][s]['id'], dmgdev['sensors'][s]['data_type'], value)
-                                else :
-                                    self.log.warning(u"Domogik device {0} not according to info type {1}, sensor not find.\n data : {2}\n device :".format(dmgdev['name'], iType.infoType, data, dmgdev))
+    def _handle_RFP_Data(self, client, data, devicesCache=None, sensorsValues=None):
+        """Handle RFP data to domogik sensor
+            @param data : dict of RFP data or list of RF frames received in batch.
+            @param devicesCache : optional dict of domogik devices already searched in batch.
+            @param sensorsValues : optional list of (device, sensor, value) collected in batch, published by caller.
+        """
+        if sensorsValues is None :
+            # Sensors values of a frame or a batch are published in one message.
+            sensorsValues = []
+            self._handle_RFP_Data(client, data, devicesCache, sensorsValues)
+            self._publish_sensors(sensorsValues)
+        elif type(data) == list :
+            # Batch of frames, domogik devices are searched once per batch.
+            devicesCache = {}
+            for frame in data :
+                self._handle_RFP_Data(client, frame, devicesCache, sensorsValues)
+        elif type(data) == dict and 'frame' in data :
+            # Periodic sensors send same payload, sensors values are computed once by InfoType.
+            key = payloadKey(data['frame']) if self.decodeCache is not None else None
+            results = self.decodeCache.get(key) if key is not None else None
+            if results is None :
+                results = self._decode_RFP_frame(client, data, devicesCache)
+                if results and key is not None : self.decodeCache.put(key, results)
+            for dmgdev, sensor, value in results or [] :
+                if value is not None :
+                    if self.sensorAggregator is not None :
+                        # Sample kept in its window, values of windows ended
+                        values = self.sensorAggregator.aggregate(sensor, value, data.get('timestamp'), dmgdev)
                     else :
-                        self.liklyDmgDevices(iType)
-                        cIds = self.getIdsClient(client)
-                        for cId in cIds :
-                            self.monitorClients.noDmgDevice_report(cId, time.time(),  iType)
+                        values = [(dmgdev, sensor, value)]
+                    for dmgdev, sensor, value in values :
+                        if self.sensorFilter is None or self.sensorFilter.accept(sensor, value, data.get('timestamp'), dmgdev) :
+                            sensorsValues.append((dmgdev, sensor, value))
                 else :
-                    self.log.warning(u"Inconsistent RFP protocol ({0}) for info type {1}. data : {2}".format(data['header']['protocol'], iType.infoType, data))
-            else :
-                self.log.warning(u"Unknown RFP Data type : {0}".format(data))
+                    self.log.warning(u"Domogik device {0} not according to info type {1}, sensor not find.\n data : {2}\n device :".format(dmgdev['name'], data['frame']['header']['infoType'], data, dmgdev))
         elif type(data) == dict and 'client' in data:
             cIds = self.getIdsClient(data['client'])
             for cId in cIds :
@@ -357,10 +571,100 @@ class RFPManager(object):
                     for dmgdev in self._plugin.getDmgDevices(client.RFP_device):
                             for s in dmgdev['sensors']:
                                 if 'status' in data and dmgdev['sensors'][s]['reference'] == "rfp_status":
-                                    self._send_sensor(dmgdev, dmgdev['sensors'][s]['id'], dmgdev['sensors'][s]['data_type'], data['status'])
+                                    sensorsValues.append((dmgdev, dmgdev['sensors'][s], data['status']))
         else:
             self.log.warning(u"Bad RFP Data format : {0}".format(data))
 
+    def _flush_sensors(self):
+        """Publish values of aggregation windows ended without new sample and values held by filter, called by timer"""
+        sensorsValues = []
+        if self.sensorAggregator is not None :
+            for dmgdev, sensor, value in self.sensorAggregator.flush() :
+                if self.sensorFilter is None or self.sensorFilter.accept(sensor, value, None, dmgdev) :
+                    sensorsValues.append((dmgdev, sensor, value))
+        if self.sensorFilter is not None : sensorsValues.extend(self.sensorFilter.flush())
+        self._publish_sensors(sensorsValues)
+
+    def _publish_sensors(self, sensorsValues):
+        """Publish sensors values collected from a frame or a batch of frames.
+            All values are sent in one message, a sensor value received again in batch starts a new message
+            to keep each value. Without cb_send_sensors, values are sent one by one.
+            @param sensorsValues : list of (domogik device, sensor, value)
+        """
+        if not sensorsValues : return
+        if self._send_sensors is None :
+            for dmgdev, sensor, value in sensorsValues :
+                self._send_sensor(dmgdev, sensor['id'], sensor['data_type'], value)
+            self.sensorsPublished['messages'] += len(sensorsValues)
+        else :
+            values = {}
+            for dmgdev, sensor, value in sensorsValues :
+                if sensor['id'] in values :
+                    self._send_sensors(values)
+                    self.sensorsPublished['messages'] += 1
+                    values = {}
+                values[sensor['id']] = value
+            self._send_sensors(values)
+            self.sensorsPublished['messages'] += 1
+        self.sensorsPublished['values'] += len(sensorsValues)
+
+    def _decode_RFP_frame(self, client, data, devicesCache=None):
+        """Compute domogik sensors values of a RF frame
+            @param data : dict of RFP data with RF frame.
+            @param devicesCache : optional dict of domogik devices already searched in batch.
+            @return : list of (domogik device, sensor, value), None if no domogik device for frame.
+        """
+        iType = getInfoType(data['frame'])
+        if iType is not None :
+            if iType.isValid :
+                if devicesCache is None :
+                    devices = self._plugin.getDmgDevices(iType.dmgDevice_Id)
+                else :
+                    devId = iType.dmgDevice_Id
+                    if devId not in devicesCache : devicesCache[devId] = self._plugin.getDmgDevices(devId)
+                    devices = devicesCache[devId]
+                if devices != [] :
+                    results = []
+                    measures = iType.get_measures()     # One pass over frame for all sensors
+                    for dmgdev in devices :
+                        sensors = dmgdev['sensors']
+                        for s, extract in self.getSensorsRoute(dmgdev, iType) :
+                            try :
+                                value = extract(iType, measures)
+                            except :
+                                value = None
+                            results.append((dmgdev, sensors[s], value))
+                    return results
+                else :
+                    self.liklyDmgDevices(iType)
+                    cIds = self.getIdsClient(client)
+                    for cId in cIds :
+                        self.monitorClients.noDmgDevice_report(cId, time.time(),  iType)
+            else :
+                self.log.warning(u"Inconsistent RFP protocol ({0}) for info type {1}. data : {2}".format(data['frame']['header']['protocol'], iType.infoType, data))
+        else :
+            self.log.warning(u"Unknown RFP Data type : {0}".format(data))
+        return None
+
+    def getDmgSensor(self, sensorId):
+        """Return (domogik device, sensor) of a sensor id, else None"""
+        for dmgdev in self._plugin.devices :
+            for sensor in dmgdev['sensors'].values() :
+                if sensor['id'] == sensorId : return (dmgdev, sensor)
+        return None
+
+    def getSensorsRoute(self, dmgdev, iType):
+        """Return sensors extractors of a domogik device for an infoType, compiled once by device type.
+            @return : list of (sensor key, function(iType, measures) returning sensor value or None)
+        """
+        key = (dmgdev.get('device_type_id'), iType.infoType)
+        route = self.sensorsRoutes.get(key)
+        if route is None :
+            route = [(s, iType.compile_sensor(dmgdev['sensors'][s])) for s in dmgdev['sensors']]
+            self.sensorsRoutes[key] = route
+            self.log.debug(u"Sensors route compiled for {0} : {1}".format(key, [s for s, e in route]))
+        return route
+
     def processRequest(self, request, data):
         """Callback come from MQ (request with reply)"""
         report = {'error' : u"Unknown request <{0}>, data : {1}".format(request, data)}
@@ -368,7 +672,9 @@ class RFPManager(object):
         if reqRef[0] == 'manager' :
             if reqRef[1] == 'getstatus' :
                 report = self.getManagerInfo()
-        if reqRef[0] == 'client' :
+        if request == 'client.cmdbatch' :
+            report = self.processCmdBatch(data)
+        elif reqRef[0] == 'client' :
             if 'rfplayerID' in data :
                 client = self.getClient(data['rfplayerID'])
                 if client is not None :
@@ -388,6 +694,12 @@ class RFPManager(object):
         """ Return all manger information """
         report = {}
         report['status'] = 'alive'
+        report['eventLoop'] = self.eventLoop.getStats() if self.eventLoop is not None else {}
+        report['decodeCache'] = self.decodeCache.getStats() if self.decodeCache is not None else {}
+        report['sensorsRoutes'] = len(self.sensorsRoutes)
+        report['sensorsPublished'] = dict(self.sensorsPublished)
+        report['sensorFilter'] = self.sensorFilter.getStats() if self.sensorFilter is not None else {}
+        report['sensorAggregator'] = self.sensorAggregator.getStats() if self.sensorAggregator is not None else {}
         report['rfPlayers'] = []
         for cId in self.rfpClients :
             info = self.rfpClients[cId].getState()
@@ -424,7 +736,7 @@ class Timer():
         @param time : time of loop in second
         @param cb : callback function which will be call eact 'time' seconds
         """
-        self._stop = threading.Event()
+        self._stop = Waker()   # wait(time) without periodic wake-up
         self._timer = self.__InternalTimer(time, cb, self._stop, plugin.log)
         self._plugin = plugin
         self.log = plugin.log
@@ -439,7 +751,7 @@ class Timer():
         self._timer.start()
 
     def get_stop(self):
-        """ Returns the threading.Event instance used to stop the Timer
+        """ Returns the Waker (threading.Event like) instance used to stop the Timer
         """
         return self._stop
 
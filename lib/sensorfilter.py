@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Publish filter of sensors values : deadband, minimum interval and heartbeat by sensor id or data_type
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+import time
+from threading import Lock
+
+DEFAULT_RULE = 'default'
+EPSILON = 1e-9     # Tolerance of deadband comparison on float values (ex : 19.3 - 19.2 < 0.1)
+
+def parseRules(config, factor=1):
+    """ Parse rules configuration by sensor id or data_type, ex : 'DT_Temp:0.1,DT_Power:5,1234:0.5' or '60,DT_Power:15'
+        @param config : rules separated by ',', a value without key is the default rule.
+        @param factor : multiplier of configured values (ex : 60 for minutes in s). Default: 1
+        @return : {'default': value, data_type: value, sensor id (int): value}
+    """
+    rules = {}
+    for item in u"{0}".format(config if config is not None else "").split(',') :
+        item = item.strip()
+        if not item : continue
+        try :
+            if ':' in item :
+                key, value = item.split(':', 1)
+                key = key.strip()
+                rules[int(key) if key.isdigit() else key] = float(value) * factor
+            else :
+                rules[DEFAULT_RULE] = float(item) * factor
+        except ValueError :
+            pass
+    return rules
+
+class SensorFilter(object):
+    """ Decide if a sensor value must be published, last published value and time are kept by sensor id.
+          Only sensors with a deadband or a minimum interval rule (by sensor id or data_type) are filtered,
+          others (switch, trigger...) are always published. For a filtered sensor, value is published if :
+            - it is the first value, or
+            - it differs from last published by deadband or more (any change for a not numeric value)
+              and last publish is older than minimum interval, or
+            - last publish is older than heartbeat.
+          A changed value received during minimum interval is held, flush() publishes it at end of interval
+          if no newer value was published.
+    """
+
+    def __init__(self, deadbands={}, minIntervals={}, heartbeats={DEFAULT_RULE: 3600}):
+        """ Init publish filter
+            @param deadbands : min change to publish by sensor id or data_type, 0 to suppress unchanged values.
+            @param minIntervals : min time (s) between two publishes by sensor id or data_type.
+            @param heartbeats : time (s) after which a value is published even unchanged, by sensor id, data_type and 'default', 0 disable it.
+        """
+        self.deadbands = dict(deadbands)
+        self.minIntervals = dict(minIntervals)
+        self.heartbeats = dict(heartbeats)
+        self._rules = {}    # sensor id -> (deadband, min interval, heartbeat) or None if not filtered
+        self._last = {}     # sensor id -> (value, time of publish)
+        self._held = {}     # sensor id -> (device, sensor, value) changed during minimum interval
+        self._lock = Lock()
+        self.passed = 0
+        self.suppressed = 0
+        self.heartbeatsSent = 0
+        self.released = 0
+
+    @property
+    def enabled(self):
+        """ True if a sensor can be filtered"""
+        return bool(self.deadbands or self.minIntervals)
+
+    @property
+    def flushInterval(self):
+        """ Time (s) between two flush() calls, None if no minimum interval"""
+        return min(self.minIntervals.values()) if self.minIntervals else None
+
+    def _rule(self, sensor):
+        """ Return filter rule of a sensor, None if sensor is not filtered."""
+        sId, dataType = sensor['id'], sensor['data_type']
+        deadband = self.deadbands.get(sId, self.deadbands.get(dataType))
+        minInterval = self.minIntervals.get(sId, self.minIntervals.get(dataType))
+        if deadband is None and minInterval is None : return None
+        heartbeat = self.heartbeats.get(sId, self.heartbeats.get(dataType, self.heartbeats.get(DEFAULT_RULE, 0)))
+        return (deadband or 0, minInterval or 0, heartbeat)
+
+    def accept(self, sensor, value, timestamp=None, device=None):
+        """ Check if a sensor value must be published, and record it as published if so.
+            @param sensor : the domogik sensor dict (id, data_type).
+            @param value : value to publish.
+            @param timestamp : time of value. Default: now
+            @param device : domogik device of sensor, returned by flush() with a held value.
+            @return : True if value must be published
+        """
+        sId = sensor['id']
+        with self._lock:
+            if sId not in self._rules : self._rules[sId] = self._rule(sensor)
+            rule = self._rules[sId]
+            if rule is None : return True
+            now = timestamp if timestamp is not None else time.time()
+            last = self._last.get(sId)
+            if last is not None :
+                deadband, minInterval, heartbeat = rule
+                elapsed = now - last[1]
+                if heartbeat and elapsed >= heartbeat :
+                    self.heartbeatsSent += 1
+                else :
+                    try :
+                        changed = abs(value - last[0]) >= deadband - EPSILON if deadband else value != last[0]
+                    except TypeError :
+                        changed = value != last[0]
+                    if not changed or elapsed < minInterval :
+                        self.suppressed += 1
+                        if changed :
+                            self._held[sId] = (device, sensor, value)
+                        else :
+                            self._held.pop(sId, None)
+                        return False
+            self._held.pop(sId, None)
+            self._last[sId] = (value, now)
+            self.passed += 1
+            return True
+
+    def flush(self, timestamp=None):
+        """ Publish values held during minimum interval of their sensor, if interval is ended.
+            @param timestamp : current time. Default: now
+            @return : list of (device, sensor, value) to publish.
+        """
+        now = timestamp if timestamp is not None else time.time()
+        values = []
+        with self._lock:
+            for sId, (device, sensor, value) in list(self._held.items()) :
+                if sId not in self._rules : self._rules[sId] = self._rule(sensor)
+                rule = self._rules[sId]
+                if rule is not None and now - self._last[sId][1] < rule[1] : continue
+                del self._held[sId]
+                self._last[sId] = (value, now)
+                self.passed += 1
+                self.released += 1
+                values.append((device, sensor, value))
+        return values
+
+    def clear(self):
+        """ Forget sensors rules, to compute them again after devices update. Last published values are kept."""
+        with self._lock:
+            self._rules.clear()
+
+    def getStats(self):
+        """ Return filter counters"""
+        with self._lock:
+            return {'passed': self.passed, 'suppressed': self.suppressed, 'heartbeats': self.heartbeatsSent,
+                    'held': len(self._held), 'released': self.released, 'sensors': len(self._last),
+                    'filtered': sum(1 for r in self._rules.values() if r is not None)}
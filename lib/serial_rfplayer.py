@@ -43,12 +43,26 @@ Implements
 
 import json
 import serial
-import domogik.tests.common.testserial as testserial
+try :
+    import domogik.tests.common.testserial as testserial
+except ImportError :
+    testserial = None   # Fake device only available with domogik (ex : asyncio client on python 3)
 import time
 import os
 import traceback
-from threading import Thread, Lock
-from Queue import Queue, Empty
+from collections import namedtuple
+from threading import Thread, Lock, Event
+try :
+    from Queue import Empty
+except ImportError :
+    from queue import Empty     # python 3
+from domogik_packages.plugin_rfplayer.lib.stats import RunningStats
+from domogik_packages.plugin_rfplayer.lib.framing import FrameReader, toText, toBytes
+from domogik_packages.plugin_rfplayer.lib.hexframes import decode_HEX_frame
+from domogik_packages.plugin_rfplayer.lib.queues import RFPQueue, frameKey, commandKey
+from domogik_packages.plugin_rfplayer.lib.txscheduler import TxScheduler
+from domogik_packages.plugin_rfplayer.lib.dedup import FrameDedup
+from domogik_packages.plugin_rfplayer.lib.eventloop import Waker
 
 PORT = '/dev/rfplayer' # Linux with UDEV rule
 #PORT = 'COM3'  # Windows
@@ -61,6 +75,54 @@ if PORT.find('COM') != -1 :
     ZiBlue.close()
 
 
+# Header descriptor of a received packet
+#    Sync: True/False if RFPLayer ID detected
+#    SDQ: SourceDestQualifier get if data formet ASCII or BINARY
+#    Qualifier: Data format type XML, JSON, TEXT if ASSCI else len of Bytes.
+#    pos: First data index, to get data without header
+RFPHeader = namedtuple('RFPHeader', ['Sync', 'SDQ', 'Qualifier', 'pos'])
+
+def buildHeadersTable(syncId, sdqs, qualifiers, headSize):
+    """ Return dict of all known headers, key is the header string, value is RFPHeader"""
+    table = {}
+    for sdq in sdqs :
+        for qualifier in qualifiers :
+            table["{0}{1}{2}".format(syncId, sdq, qualifier)] = RFPHeader(True, sdq, qualifier, headSize)
+    return table
+
+
+class RFPRequest(object):
+    """Pending request sended to RFPLAYER and waiting for its response"""
+
+    def __init__(self, ackFor, timeOut):
+        """ Init a pending request
+            @param ackFor : Command source info {'command': the command sended, 'reqNum': request number, 'callback': callback}
+            @param timeOut : time in second before request expiration
+        """
+        self.ackFor = ackFor
+        self.timeOut = timeOut
+        self.deadline = time.time() + timeOut
+        self.sent = None    # Time of writing on serial port
+        self.response = None
+        self._event = Event()
+
+    reqNum = property(lambda self: self.ackFor['reqNum'])
+    done = property(lambda self: self._event.isSet())
+
+    def setResponse(self, response):
+        """ Release request with response data, None if request expired."""
+        self.response = response
+        self._event.set()
+
+    def wait(self, timeOut=None):
+        """ Wait until response received or request expired.
+            @param timeOut : maximum time to wait, default is request time out.
+            @return : True if response received.
+        """
+        self._event.wait(self.timeOut if timeOut is None else timeOut)
+        return self.response is not None
+
+
 class SerialRFPlayer(object):
     """Base class to handle RFPLAYER on serial port"""
 
@@ -75,10 +137,24 @@ class SerialRFPlayer(object):
     Q_XML = '22'    # Asynchronous received RF Frames. Enabled by “FORMAT XML”
     Q_JSON = '33'   # Asynchronous received RF Frames. Enabled by “FORMAT JSON”
     Q_TXT = '44'    # Asynchronous received RF Frames. Set by “FORMAT TEXT”
+    HEADERS = buildHeadersTable(SYNC_ID, (SDQ_ASCII, SDQ_BIN), (Q_REP, Q_HEX, Q_HEXF, Q_XML, Q_JSON, Q_TXT), HEADSIZE)
+    NO_SYNC = RFPHeader(False, '', '', HEADSIZE)
+    DATA_FORMATS = ('JSON', 'HEXA', 'HEXA FIXED', 'XML', 'TEXT')
+    QUEUES = {'received': {'maxsize': 500, 'policy': 'drop_oldest'},
+              'write': {'maxsize': 100, 'policy': 'drop_oldest'}}
+    BATCH_SIZE = 50         # Max frames handled in one call by receive daemon
+    BATCH_BUDGET = 0.05     # Max time (s) to drain received queue for one batch
+    PING_TIMEOUT = 2
+    DEDUP_WINDOWS = {'default': 0.5}   # Window (s) of repeated frames suppression by protocol name
+    RECONNECT_DELAY = 1         # First delay (s) before reopening a lost serial port, doubled at each attempt
+    RECONNECT_MAX_DELAY = 60    # Max delay (s) between two reopening attempts
+    REPLAY_MAX_AGE = 30         # Commands queued during an outage are replayed at reconnection if not older (s)
 
     def __init__(self, manager, RFP_device, cd_handle_RFP_Data,
                  baudrate=115200, bytesize=serial.EIGHTBITS, parity=serial.PARITY_NONE,
-                 stopbits=serial.STOPBITS_ONE, timeout=2, xonxoff=0, rtscts=1, dsrdtr=None, fake_device=None):
+                 stopbits=serial.STOPBITS_ONE, timeout=2, xonxoff=0, rtscts=1, dsrdtr=None, fake_device=None, data_format='JSON',
+                 queues={}, batch_size=BATCH_SIZE, tickless=True, tx_scheduler=True, tx_holdoff=0,
+                 dedup_windows=DEDUP_WINDOWS, reconnect=True):
         """ Init Serial com base
             @param manager : RFPManager instance
             @param RFP_device : rfplayer device (ex : /dev/rfplayer)
@@ -93,6 +169,15 @@ class SerialRFPlayer(object):
             @param rtscts : optional serial port hardware flow control rtscts. Default: unable (1)
             @param dsrdtr : optional serial port hardware flow control rtscts. Default: disabled (None)
             @param fake_device : optional fake device. If None, this will not be used. Else, the fake serial device library will be used. Default: None
+            @param data_format : optional format of RF frames received, one of DATA_FORMATS. Default: JSON
+            @param queues : optional bounds of queues {'received': {'maxsize': 500, 'policy': 'drop_oldest'}, 'write': {...}}
+                            policy is drop_oldest, drop_newest or coalesce (per device). Default: see QUEUES
+            @param batch_size : optional max RF frames given in one call to cd_handle_RFP_Data, 1 to disable batch. Default: BATCH_SIZE
+            @param tickless : optional, listener block on serial port without timeout when idle, woken at close. Default: True
+            @param tx_scheduler : optional, commands queued by RF band (433/868) and dispatched when band is free, else one FIFO. Default: True
+            @param tx_holdoff : optional time (s) a RF command wait to be superseded by a newer one of same kind, with tx_scheduler. Default: 0
+            @param dedup_windows : optional window (s) of repeated RF frames suppression by protocol name and 'default', None to disable. Default: DEDUP_WINDOWS
+            @param reconnect : optional, serial port lost is reopened with exponential back-off, queues and threads are kept. Default: True
         """
         self._manager = manager
         self.RFP_device = RFP_device
@@ -100,13 +185,47 @@ class SerialRFPlayer(object):
         self.fake_device = fake_device
         self.rfPlayer = None
         self.status = {}
-        self._waiting_for_reponse = False
         self._dataFormat = self.Q_TXT
+        self.data_format = data_format if data_format in self.DATA_FORMATS else 'JSON'
 
         # Queues for writing and receiving packets to/from Rfxcom
-        self.RFP_Lock = Lock()
-        self.write_RFP = Queue()
-        self.RFP_received = Queue()
+        # Full-duplex : listener thread is the only reader of serial port, the write lock only serialize writers.
+        self._writeLock = Lock()
+        # Pending requests waiting for a response, matched by listener on reqNum.
+        self._requestsLock = Lock()
+        self._pendingRequests = {}
+        self._pongEvent = Waker()
+        self._pingRequest = None    # Last PING sended through write queue, PONG is matched by listener.
+        self._pingRtt = RunningStats()
+        # Tickless : threads block without timeout, they are woken by data, a None sentinel in queues or _openEvent.
+        self.tickless = tickless
+        self._openEvent = Event()
+        self._wireLatency = RunningStats()
+        self._frameReader = FrameReader()
+        # Bounded queues, overload policy keep memory steady and fresh frames first.
+        # Waiting commands are superseded by a newer command of same kind for same device.
+        qConf = dict(self.QUEUES['write'], **queues.get('write', {}))
+        if tx_scheduler :
+            self.write_RFP = TxScheduler(qConf['maxsize'], qConf['policy'], holdoff=tx_holdoff)
+        else :
+            self.write_RFP = RFPQueue(qConf['maxsize'], qConf['policy'], commandKey, True)
+        qConf = dict(self.QUEUES['received'], **queues.get('received', {}))
+        self.RFP_received = RFPQueue(qConf['maxsize'], qConf['policy'], frameKey)
+        self.batchSize = max(1, batch_size)
+        self._eventLoop = None  # RFPEventLoop handling this client, else threads
+        self._batchSizes = RunningStats(scale=1, unit="frames")
+        self._dedup = FrameDedup(dedup_windows) if dedup_windows else None
+        # Supervised reconnection when serial port is lost (USB glitch), commands stay queued during outage.
+        self.reconnect = reconnect
+        self._reconnectLock = Lock()
+        self._reconnectWaker = Waker()
+        self._reconnecting = False
+        self._threadsStarted = False
+        self._released = False      # Client removed from manager, service threads end
+        self._lostAt = None
+        self._resumedAt = 0
+        self._recoverTime = RunningStats(scale=1, unit="s")
+        self._reconnectStats = {'lost': 0, 'attempts': 0, 'recovered': 0, 'replayed': 0, 'expired': 0}
         # request command id, increase at each request
         self._reqNum = 0
         # Serial port config
@@ -145,33 +264,17 @@ class SerialRFPlayer(object):
 
     def getHeaderData(self, data):
         """ Return header type of packet
-              @param data: raw data from serial RFPlayer
-              @return : header dict type : {
+              @param data: raw data from serial RFPlayer (str or memoryview)
+              @return : RFPHeader namedtuple (
                         Sync: True/False if RFPLayer ID detected
                         SDQ: SourceDestQualifier get if data formet ASCII or BINARY
                         Qualifier: Data format type XML, JSON, TEXT if ASSCI else len of Bytes.
                         pos: First data index, to get data without header
-                        }
-        """
-        header = {'Sync': False, 'SDQ': '',  'Qualifier':'', 'pos': self.HEADSIZE}
-#        print(u"Decode header of :{0}".format(data))
-        if data[:self.HEADSIZE]=="{0}{1}{2}".format(self.SYNC_ID, self.SDQ_ASCII, self.Q_REP) :
-            header.update({'Sync': True, 'SDQ': self.SDQ_ASCII,  'Qualifier': self.Q_REP})
-        elif data[:self.HEADSIZE]=="{0}{1}{2}".format(self.SYNC_ID, self.SDQ_ASCII, self.Q_JSON) :
-            header.update({'Sync': True, 'SDQ': self.SDQ_ASCII,  'Qualifier': self.Q_JSON})
-        elif data[:self.HEADSIZE]=="{0}{1}{2}".format(self.SYNC_ID, self.SDQ_ASCII, self.Q_XML) :
-            header.update({'Sync': True, 'SDQ': self.SDQ_ASCII,  'Qualifier': self.Q_XML})
-        elif data[:self.HEADSIZE]=="{0}{1}{2}".format(self.SYNC_ID, self.SDQ_ASCII, self.Q_TXT) :
-            header.update({'Sync': True, 'SDQ': self.SDQ_ASCII,  'Qualifier': self.Q_TXT})
-        elif data[:self.HEADSIZE]=="{0}{1}{2}".format(self.SYNC_ID, self.SDQ_BIN, self.Q_REP) :
-            header.update({'Sync': True, 'SDQ': self.SDQ_BIN,  'Qualifier': self.Q_REP})
-        elif data[:self.HEADSIZE]=="{0}{1}{2}".format(self.SYNC_ID, self.SDQ_BIN, self.Q_JSON) :
-            header.update({'Sync': True, 'SDQ': self.SDQ_BIN,  'Qualifier': self.Q_JSON})
-        elif data[:self.HEADSIZE]=="{0}{1}{2}".format(self.SYNC_ID, self.SDQ_BIN, self.Q_XML) :
-            header.update({'Sync': True, 'SDQ': self.SDQ_BIN,  'Qualifier': self.Q_XML})
-        elif data[:self.HEADSIZE]=="{0}{1}{2}".format(self.SYNC_ID, self.SDQ_BIN, self.Q_TXT) :
-            header.update({'Sync': True, 'SDQ': self.SDQ_BIN,  'Qualifier': self.Q_TXT})
-        return header
+                        )
+        """
+        head = data[:self.HEADSIZE]
+        if type(head) is memoryview : head = toText(head.tobytes())
+        return self.HEADERS.get(head, self.NO_SYNC)
 
     @property
     def isOpen(self):
@@ -186,25 +289,33 @@ class SerialRFPlayer(object):
     def open(self):
         """ Open serial com."""
         if self.rfPlayer is None :
+            rfPlayer = None
             try :
                 if self.fake_device != None:
                     self.log.info(u"Try to open fake RFPLAYER : %s" % self.fake_device)
-                    self.rfPlayer = testserial.Serial(self.fake_device, baudrate = self.baudrate, parity = testserial.PARITY_NONE, stopbits = testserial.STOPBITS_ONE, timeout = 5)
-                    self.rfPlayer.first_read = 1
+                    rfPlayer = testserial.Serial(self.fake_device, baudrate = self.baudrate, parity = testserial.PARITY_NONE, stopbits = testserial.STOPBITS_ONE, timeout = 5)
+                    rfPlayer.first_read = 1
                 else:
-                    self.rfPlayer = serial.Serial(self.RFP_device, self.baudrate, self.bytesize, self.parity,
+                    rfPlayer = serial.Serial(self.RFP_device, self.baudrate, self.bytesize, self.parity,
                                                   self.stopbits, self.timeout, self.xonxoff, self.rtscts, self.dsrdtr)
                 self._state = "Starting"
                 self._manager.publishRFPlayerMsg(self)
-                with self.RFP_Lock:
-                    self.rfPlayer.reset_output_buffer()
-                    self.rfPlayer.write(b'ZIA++HELLO\r')
-                    id = self.rfPlayer.readline()
+                # Listener don't read serial port until rfPlayer is set, so HELLO response can be read here.
+                with self._writeLock:
+                    rfPlayer.reset_output_buffer()
+                    rfPlayer.write(b'ZIA++HELLO\r')
+                id = toText(rfPlayer.readline())
                 print(id)
                 if id.find(self.RFP_Id) != -1 :
+                    self._frameReader.reset()
+                    self.rfPlayer = rfPlayer
                     self._state = "alive"
                     self._error = ""
-                    self.set_JSON_Format()
+                    # Format and status commands are put at head of write queue before writer resume,
+                    # they are sent before commands queued during outage.
+                    self.set_Data_Format(self.data_format, True)
+                    self.getStatus(True)
+                    self._openEvent.set()
                     self._cd_handle_RFP_Data(self, {'timestamp': time.time(), 'client': self, 'status': 1})
                     self.log.info(u"{0} {1} CONNECTED : {2}".format(self.RFP_type, self.RFP_device, id))
                     self._manager.publishRFPlayerMsg(self)
@@ -215,7 +326,7 @@ class SerialRFPlayer(object):
                     self.log.error(self._error)
                     self._manager.publishRFPlayerMsg(self)
                     try:
-                        self.rfPlayer.close()
+                        rfPlayer.close()
                     except:
                         pass
             except :
@@ -225,7 +336,7 @@ class SerialRFPlayer(object):
                 self.log.error(self._error)
                 self._manager.publishRFPlayerMsg(self)
                 try:
-                    self.rfPlayer.close()
+                    rfPlayer.close()
                 except:
                     pass
         else :
@@ -233,22 +344,49 @@ class SerialRFPlayer(object):
         return False
 
     def close(self):
-        """ close serial com
+        """ close serial com, reconnection in progress is cancelled.
         """
-        self.log.info(u"Close {0} on {1}".format(self.RFP_type, self.RFP_device))
-        try:
-            self.rfPlayer.close()
+        self._reconnecting = False
+        self._reconnectWaker.set()
+        if self.rfPlayer is None and self._state == "reconnecting" :
+            # Port already lost, only reconnection is stopped
             self._state = "stopped"
-        except:
-            error = u"Error while closing {0} device {1} (disconnected ?) : {2}".format(self.RFP_type, self.RFP_device, traceback.format_exc())
-            if self._state != 'dead': self._error = error
-            self.log.error(error)
-        self.rfPlayer = None
+            self._manager.publishRFPlayerMsg(self)
+            return
+        self._close_port()
+
+    def _close_port(self):
+        """ close serial port and report status"""
+        self.log.info(u"Close {0} on {1}".format(self.RFP_type, self.RFP_device))
+        if self._eventLoop is not None : self._eventLoop.removeClient(self)
+        self._openEvent.clear()
+        # Port is not closed during a write
+        with self._writeLock:
+            try:
+                self._cancel_read()
+                self.rfPlayer.close()
+                self._state = "stopped"
+            except:
+                error = u"Error while closing {0} device {1} (disconnected ?) : {2}".format(self.RFP_type, self.RFP_device, traceback.format_exc())
+                if self._state != 'dead': self._error = error
+                self.log.error(error)
+            self.rfPlayer = None
         self._cd_handle_RFP_Data(self, {'timestamp': time.time(), 'client': self, 'status': 0})
         self._manager.publishRFPlayerMsg(self)
 
     def start_services(self):
-        """ Start all daemon service in threads"""
+        """ Start all daemon service in threads, or register client in manager event loop if used."""
+        eventLoop = getattr(self._manager, 'eventLoop', None)
+        if eventLoop is not None and hasattr(self.rfPlayer, 'fileno') :
+            eventLoop.addClient(self)
+            return
+        if self.tickless and self.fake_device is None and hasattr(self.rfPlayer, 'cancel_read') :
+            # Listener block in read until data, close() and wakeup_services() release it by cancel_read.
+            self.rfPlayer.timeout = None
+        if self._threadsStarted :
+            # Reconnected, running threads resume on _openEvent with same queues.
+            return
+        self._threadsStarted = True
         listen_process = Thread(None,
                              self.listen_RFP,
                              "ListenRFP",
@@ -270,217 +408,441 @@ class SerialRFPlayer(object):
                              {})
         self._manager._plugin.register_thread(read_process)
         read_process.start()
-        # Sleep to get all service started
-        self.stop.wait(1)
 
-    def set_XML_Format(self):
+    def wakeup_services(self):
+        """ Release all service threads waiting without timeout, called at plugin stop."""
+        self.write_RFP.put_nowait(None)
+        self.RFP_received.put_nowait(None)
+        self._openEvent.set()
+        self._reconnectWaker.set()
+        self._cancel_read()
+
+    def release_services(self):
+        """ End service threads of a client removed from manager, called after close."""
+        self._released = True
+        self.wakeup_services()
+
+    def connection_lost(self):
+        """ Close serial port lost (disconnected ?) and start reopening it with exponential back-off.
+              Called by listener, writer or event loop on serial error, commands stay queued until reconnection.
+        """
+        with self._reconnectLock:
+            if self.rfPlayer is None : return  # Already closed by another thread
+            self._reconnectStats['lost'] += 1
+            if not self.reconnect or self.stop.isSet() :
+                self.close()
+                return
+            # Set before closing, writer keep its command until reconnection.
+            self._reconnecting = True
+            self._reconnectWaker.clear()
+            self._lostAt = time.time()
+            self._close_port()
+            self._state = "reconnecting"
+        self._manager.publishRFPlayerMsg(self)
+        reconnect_process = Thread(None,
+                             self._daemon_reconnect,
+                             "Reconnect_RFP",
+                             (),
+                             {})
+        self._manager._plugin.register_thread(reconnect_process)
+        reconnect_process.start()
+
+    def _daemon_reconnect(self):
+        """ Reopen serial port lost until success, plugin stop or close, delay is doubled at each attempt."""
+        self.log.info(u"***** Start reconnecting {0} on {1} *****".format(self.RFP_type, self.RFP_device))
+        delay = self.RECONNECT_DELAY
+        while self._reconnecting and not self.stop.isSet() :
+            self._reconnectWaker.wait(delay)
+            if not self._reconnecting or self.stop.isSet() : break
+            self._reconnectStats['attempts'] += 1
+            self._resumedAt = time.time()    # Commands queued before are replayed if not expired
+            if self.open() :
+                recoverTime = time.time() - self._lostAt
+                self._recoverTime.add(recoverTime)
+                self._reconnectStats['recovered'] += 1
+                self._reconnecting = False
+                self.log.info(u"{0} {1} reconnected in {2:.1f}s".format(self.RFP_type, self.RFP_device, recoverTime))
+                break
+            if self.isOpen : break
+            self._state = "reconnecting"
+            delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+        self.log.info(u"***** Reconnecting {0} on {1} stopped *****".format(self.RFP_type, self.RFP_device))
+
+    def _cancel_read(self):
+        """ Release listener blocked in a read without timeout"""
+        if self.rfPlayer is not None and hasattr(self.rfPlayer, 'cancel_read') :
+            try :
+                self.rfPlayer.cancel_read()
+            except :
+                pass
+
+    def set_Data_Format(self, data_format, first=False):
+        """ Set RFPlayer data format from its name
+            @param data_format : one of DATA_FORMATS
+            @param first : optional, send command before commands waiting in queue. Default: False
+        """
+        if data_format == 'HEXA' : self.set_HEX_Format(first)
+        elif data_format == 'HEXA FIXED' : self.set_HEXF_Format(first)
+        elif data_format == 'XML' : self.set_XML_Format(first)
+        elif data_format == 'TEXT' : self.set_TXT_Format(first)
+        else : self.set_JSON_Format(first)
+
+    def set_HEX_Format(self, first=False):
+        """ Set RFPlayer in HEXA data format, binary frames coded in hexadecimal"""
+        self.send_to_RFP('FORMAT HEXA', False, first = first)
+        self._dataFormat = self.Q_HEX
+
+    def set_HEXF_Format(self, first=False):
+        """ Set RFPlayer in HEXA FIXED data format, binary frames of fixed size coded in hexadecimal"""
+        self.send_to_RFP('FORMAT HEXA FIXED', False, first = first)
+        self._dataFormat = self.Q_HEXF
+
+    def set_XML_Format(self, first=False):
         """ Set RFPlayer in XML data format"""
-        self.send_to_RFP('FORMAT XML', False)
+        self.send_to_RFP('FORMAT XML', False, first = first)
         self._dataFormat = self.Q_XML
 
-    def set_JSON_Format(self):
+    def set_JSON_Format(self, first=False):
         """ Set RFPlayer in JSON data format"""
-        self.send_to_RFP('FORMAT JSON', False)
+        self.send_to_RFP('FORMAT JSON', False, first = first)
         self._dataFormat = self.Q_JSON
 
-    def set_TXT_Format(self):
+    def set_TXT_Format(self, first=False):
         """ Set RFPlayer in TEXT data format"""
-        self.send_to_RFP('FORMAT TEXT', False)
+        self.send_to_RFP('FORMAT TEXT', False, first = first)
         self._dataFormat = self.Q_TXT
 
     def _read_RFP_data(self):
         """ Read data from serial RFPlayer and put it in Queue.
               Packet data must have RFPlayer 'ZI' header sync to be validate and queuing.
+              Only the listener thread read serial port, responses waited by writers are matched here.
         """
-        if not self._waiting_for_reponse :
-            if self.isOpen :
-                try :
-                    with self.RFP_Lock:
-#                        self.log.debug(u"Serial read Listen")
-                        buffer = self.rfPlayer.readline()
-                        if buffer is not None:
-                            timestamp = time.time()
-                            if buffer != "" :
-                                if buffer[0] == '\r' :  # new line remove it
-                                    buffer = buffer[1:]
-                            if buffer != "" and len(buffer) > self.HEADSIZE:
-                                if self.isMonitored : self._manager.monitorClients.rawData_report(self.monitorID, timestamp, buffer)
-                                header = self.getHeaderData(buffer)
-                                if header['Sync']:
-                                    index = buffer.find('reqNum')
-                                    if index != -1 :
-                                        reqNum = self.getReqNum(buffer[self.HEADSIZE:])
-                                        if reqNum != 0 : print(u"****** A ReqNum is find in data : {0}".format(reqNum))
-                                    self.log.debug(u"Queuing for {0} data received : {1}".format(self.RFP_device, buffer))
-                                    self.RFP_received.put_nowait({'timestamp': timestamp, 'header': header, 'data': buffer[self.HEADSIZE:]})
-                except serial.SerialException:
-                    self.log.error(u"Error while reading {0} device {1} (disconnected ?) : {2}".format(self.RFP_type, self.RFP_device, traceback.format_exc()))
-                    self.close()
-                except :
-                    self.log.warning(u"Error on read {0} : {1}".format(self.RFP_device, traceback.format_exc()))
+        if self.isOpen :
+            try :
+#                self.log.debug(u"Serial read Listen")
+                frames = self._frameReader.read(self.rfPlayer)
+                timestamp = time.time()
+                for frame in frames :
+                    self._receive_RFP_frame(frame, timestamp)
+                if self._pendingRequests : self._expire_RFP_requests()
+            except serial.SerialException:
+                self.log.error(u"Error while reading {0} device {1} (disconnected ?) : {2}".format(self.RFP_type, self.RFP_device, traceback.format_exc()))
+                self.connection_lost()
+            except :
+                self.log.warning(u"Error on read {0} : {1}".format(self.RFP_device, traceback.format_exc()))
 
-    def wait_RFP_response(self, ackFor, timeOut = 5):
-        """ Wair for a response at RFPlayer request/command.
-            Lock flow read until reponse or timeout.
-            @param ackFor : Command source info {'command': the command sended, 'id': timestamp at send}
-            @param timeOut : time to exit if no reponse. Default 5s
+    def _receive_RFP_frame(self, frame, timestamp):
+        """ Check header of a received frame and queue it.
+            @param frame : frame without end of line, memoryview of reader buffer
+            @param timestamp : time of reception
         """
-        if self.isOpen :
-            exitTimeOut = False
-            endTime = time.time() + timeOut
-            while not exitTimeOut and not self.stop.isSet():
-                try :
-                    buffer = self.rfPlayer.readline()
-                    if buffer is not None :
-                        timestamp = time.time()
-                        if buffer != "" :
-                            if buffer[0] == '\r' :  # new line remove it
-                                buffer = buffer[1:]
-                        if buffer != "" and len(buffer) > self.HEADSIZE :
-                            header = self.getHeaderData(buffer)
-                            if self.isMonitored : self._manager.monitorClients.rawData_report(self.monitorID, timestamp, buffer)
-                            if header['Sync'] :
-                                if header['Qualifier'] == self.Q_REP :
-                                    if len(buffer[self.HEADSIZE:]) > 2: # some Q_REP have no data !
-                                        index = buffer.find('reqNum')
-                                        if index != -1 :
-                                            reqNum = self.getReqNum(buffer[self.HEADSIZE:])
-                                            if reqNum == ackFor['reqNum'] :
-                                                self.log.debug(u"Queuing for {0} response reqNum {1} : {2}".format(self.RFP_device, reqNum, buffer))
-                                                self.RFP_received.put_nowait({'timestamp': timestamp, 'header': header, 'data': buffer[self.HEADSIZE:], 'ackFor': ackFor})
-                                                return True
-                                        else :
-                                            if ackFor['command'] == 'UPDATE FIRMWARE' : # In case no reqNum, must be end off download.
-                                                self.log.debug(u"Queuing for {0} response download firmware : {1}".format(self.RFP_device, buffer))
-                                                self.RFP_received.put_nowait({'timestamp': timestamp, 'header': header, 'data': buffer[self.HEADSIZE:], 'ackFor': ackFor})
-                                                return True
-                                        self.log.debug(u"Data response received on {0} Without reqNum, not the one we wait. Nevertheless queuing :{1}".format(self.RFP_device, buffer))
-                                        self.RFP_received.put_nowait({'timestamp': timestamp, 'header': header, 'data': buffer[self.HEADSIZE:]})
-                                    else :
-                                        print(u" *********** No data **********")
-                                else :
-                                    self.log.debug(u"Data received on {0} Not reponse type the one we wait. Nevertheless queuing :{1}".format(self.RFP_device, buffer))
-                                    self.RFP_received.put_nowait({'timestamp': timestamp, 'header': header, 'data': buffer[self.HEADSIZE:]})
-                except serial.SerialException:
-                    self.log.error(u"Error while reading {0} device {1} (disconnected ?) : {2}".format(self.RFP_type, self.RFP_device, traceback.format_exc()))
-                    self.close()
-                except :
-                    self.log.warning(u"Error on read {0} for reponse: {1}".format(self.RFP_device, traceback.format_exc()))
-                if time.time() >= endTime : exitTimeOut = True
-            self.log.debug(u"Exit on timeOut {0}s for reponse :{1}\n{2}".format(self.RFP_device, ackFor, traceback.format_exc()))
+        if len(frame) > self.HEADSIZE :
+            header = self.getHeaderData(frame)
+            if header.Sync:
+                packet = toText(frame[self.HEADSIZE:].tobytes())
+                if self.isMonitored : self._manager.monitorClients.rawData_report(self.monitorID, timestamp, frame.tobytes())
+                if header.Qualifier == self.Q_REP and packet.startswith('PONG') :  # PING response is consumed by ping
+                    self._receive_PONG(timestamp)
+                    return
+                # Packet is decoded only once here, decoded message is queued with raw data.
+                data = {'timestamp': timestamp, 'header': header, 'data': packet, 'msg': self.decode_packet(header, packet)}
+                if header.Qualifier == self.Q_REP :
+                    ackFor = self._match_RFP_response(packet, data['msg']['data'])
+                    if ackFor is not None :
+                        data['ackFor'] = ackFor
+                self.log.debug(u"Queuing for {0} data received : {1}".format(self.RFP_device, packet))
+                self.RFP_received.put_nowait(data)
+                return
+        if toText(frame.tobytes()).find('PONG') != -1 :  # PING response without header (ex : fake device)
+            self._receive_PONG(timestamp)
+
+    def _receive_PONG(self, timestamp):
+        """ Match a PONG with pending PING request and record round trip time.
+            @param timestamp : time of reception
+        """
+        request = self._pingRequest
+        if request is not None and not request.done :
+            if request.sent is not None : self._pingRtt.add(timestamp - request.sent)
+            request.setResponse('PONG')
+        self._pongEvent.set()
+
+    def _match_RFP_response(self, packet, response):
+        """ Search the pending request corresponding to a response and release it.
+              Response with reqNum match request with same reqNum, else the request without reqNum (ex : UPDATE FIRMWARE).
+            @param packet : data of response without header
+            @param response : decoded data of response
+            @return : ackFor of request if response match, else None
+        """
+        if not self._pendingRequests : return None
+        if len(packet) > 2: # some Q_REP have no data !
+            reqNum = self.getReqNum(response)
+            with self._requestsLock:
+                request = self._pendingRequests.pop(reqNum, None)
+            if request is not None :
+                self.log.debug(u"Response received on {0} for request {1} : {2}".format(self.RFP_device, request.ackFor['command'], response))
+                request.setResponse(response)
+                return request.ackFor
+            self.log.debug(u"Data response received on {0} with reqNum {1}, not one we wait :{2}".format(self.RFP_device, reqNum, response))
+        return None
+
+    def _expect_RFP_response(self, ackFor, timeOut = 5):
+        """ Register a request that listener must match with a response.
+            @param ackFor : Command source info {'command': the command sended, 'reqNum': request number, 'callback': callback}
+            @param timeOut : time before request expiration. Default 5s
+            @return : RFPRequest pending object
+        """
+        request = RFPRequest(ackFor, timeOut)
+        with self._requestsLock:
+            self._pendingRequests[request.reqNum] = request
+        return request
+
+    def _expire_RFP_requests(self):
+        """ Remove pending requests with deadline exceeded."""
+        now = time.time()
+        with self._requestsLock:
+            expired = [r for r in self._pendingRequests.values() if r.deadline <= now]
+            for request in expired :
+                del self._pendingRequests[request.reqNum]
+        for request in expired :
+            self.log.debug(u"Exit on timeOut {0}s for reponse on {1} :{2}".format(request.timeOut, self.RFP_device, request.ackFor))
+            request.setResponse(None)
+
+    def nextDeadline(self):
+        """ Return nearest deadline of pending requests or of next command waiting its band, None if nothing."""
+        deadline = self.write_RFP.nextReady() if hasattr(self.write_RFP, 'nextReady') else None
+        with self._requestsLock:
+            if not self._pendingRequests : return deadline
+            nearest = min(r.deadline for r in self._pendingRequests.values())
+        return nearest if deadline is None else min(nearest, deadline)
+
+    def wait_RFP_response(self, request, timeOut = None):
+        """ Wait for a response at RFPlayer request/command.
+            Response is read and queued by listener, reception flow is never locked.
+            @param request : RFPRequest object returned by _expect_RFP_response or send_to_RFP
+            @param timeOut : time to exit if no reponse. Default request time out.
+            @return : True if response received
+        """
+        if request.wait(timeOut) :
+            return True
+        with self._requestsLock:
+            if self._pendingRequests.get(request.reqNum) is request :
+                del self._pendingRequests[request.reqNum]
         return False
 
     def _write_RFP_data(self, data):
         """ Write a packet data to RFPlayer
             @param data : the ASCII data to send.
+            @return : True if data writed.
         """
         if self.isOpen :
             try:
-                self.rfPlayer.write(b'{0}{1}'.format(data, '\r'))
+                with self._writeLock:
+                    if self.rfPlayer is None : return False   # Closed meanwhile
+                    self.rfPlayer.write(toBytes(data) + b'\r')
                 print(u"Data writed : {0}".format(data))
+                return True
             except serial.SerialException:
                 self.log.error(u"Error while writing on {0} device {1} (disconnected ?) : {2}".format(self.RFP_type, self.RFP_device, traceback.format_exc()))
-                self.close()
+                self.connection_lost()
+        return False
 
     def _daemon_queue_write(self):
         """ Listen send Queue, write on RFPlayer and wait for reponse if nessecary.
         """
         self.log.info(u"***** Start write daemon Queue {0} on {1} *****".format(self.RFP_type, self.RFP_device))
         # infinite
-        while not self.stop.isSet():
-            # Wait for a packet in the queue
-            try:
-                data = self.write_RFP.get(block = True, timeout = 2)
-            except Empty:
+        while not self.stop.isSet() and not self._released:
+            if not self.isOpen and self._reconnecting :
+                # Port lost, commands stay queued until reconnection
+                self._openEvent.wait()
                 continue
-            else :
-                self.log.debug(u"New data to send : {0}".format(data))
-            self._waiting_for_reponse = True if data['response'] else False
-            with self.RFP_Lock:
-                self.log.debug(u"Send request {0} on {1} {2}".format(data['data'], self.RFP_type, self.RFP_device))
-                self._write_RFP_data(data['data'])
-                if data['response'] :
-                    self.wait_RFP_response(data['ackFor'])
-#                    print(u"----------- wait terminate {0} -------------".format(data['ackFor']['command']))
-            self._waiting_for_reponse = False
+            # Wait for a packet in the queue, None is a wake-up sentinel
+            data = self.write_RFP.get()
+            if data is None : continue
+            self.log.debug(u"New data to send : {0}".format(data))
+            # Port lost before or while writing, command is put back and written at reconnection, after FORMAT
+            if not self._send_RFP_record(data) and self._reconnecting and not self.stop.isSet() and not self._released :
+                self.write_RFP.put_back(data)
         self.log.info(u"***** Write daemon Queue {0} on {1} stopped *****".format(self.RFP_type, self.RFP_device))
 
+    def _send_RFP_record(self, data):
+        """ Write a command record from write queue, request is registered to be matched by listener.
+            @param data : record queued by send_to_RFP
+            @return : False if port is closed, else True (written or expired)
+        """
+        self.log.debug(u"Send request {0} on {1} {2}".format(data['data'], self.RFP_type, self.RFP_device))
+        if self._pendingRequests : self._expire_RFP_requests()
+        if data['queued'] < self._resumedAt and not self._replay_RFP_record(data) : return True
+        if data['request'] is not None :
+            # Reset deadline at send time, response is matched by listener, no wait here.
+            data['request'].deadline = time.time() + data['request'].timeOut
+            with self._requestsLock:
+                self._pendingRequests[data['request'].reqNum] = data['request']
+        sent = time.time()
+        # Set before writing, response could be read by listener before write return.
+        if data['request'] is not None : data['request'].sent = sent
+        if data.get('ping') is not None :
+            data['ping'].deadline = sent + data['ping'].timeOut
+            data['ping'].sent = sent
+        if self._write_RFP_data(data['data']) :
+            self._wireLatency.add(time.time() - data['queued'])
+            return True
+        return False
+
+    def _replay_RFP_record(self, data):
+        """ Check a command queued before reconnection, expired if older than REPLAY_MAX_AGE or its request timeout.
+            @return : True if command must be sended
+        """
+        maxAge = self.REPLAY_MAX_AGE
+        if data['request'] is not None : maxAge = min(maxAge, data['request'].timeOut)
+        if time.time() - data['queued'] > maxAge :
+            self._reconnectStats['expired'] += 1
+            self.log.info(u"Command queued during outage of {0} expired : {1}".format(self.RFP_device, data['data']))
+            if data['request'] is not None : data['request'].setResponse(None)
+            return False
+        self._reconnectStats['replayed'] += 1
+        return True
+
+    def _process_write_queue(self):
+        """ Write all commands waiting in queue without blocking, used by event loop."""
+        while self.isOpen :
+            try :
+                data = self.write_RFP.get_nowait()
+            except Empty:
+                break
+            if data is None : continue
+            if not self._send_RFP_record(data) :
+                # Port lost while writing, command is put back and written at reconnection like with writer thread
+                if self._reconnecting and not self.stop.isSet() and not self._released : self.write_RFP.put_back(data)
+                break
+
     def _daemon_queue_read(self):
         """ Listen receive Queue, call calback registered.
+              All RF frames available at wake-up are drained and given in one call as a list (batch), up to batchSize.
         """
         self.log.info(u"***** Start receive daemon Queue {0} on {1} *****".format(self.RFP_type, self.RFP_device))
         # infinite
-        while not self.stop.isSet():
-            # Wait for a packet in the queue
-            try:
-                data = self.RFP_received.get(block = True, timeout = 2)
+        while not self.stop.isSet() and not self._released:
+            # Wait for packets in the queue, without timeout
+            batch = self.RFP_received.getBatch(self.batchSize, self.BATCH_BUDGET)
+            self._handle_RFP_batch(batch)
+        self.log.info(u"***** Receive daemon Queue {0} on {1} stopped *****".format(self.RFP_type, self.RFP_device))
+
+    def _process_received_queue(self):
+        """ Handle all packets waiting in receive queue without blocking, used by event loop."""
+        while True :
+            try :
+                batch = self.RFP_received.getBatch(self.batchSize, self.BATCH_BUDGET, block = False)
             except Empty:
-                continue
+                break
+            self._handle_RFP_batch(batch)
+
+    def _handle_RFP_batch(self, batch):
+        """ Dispatch responses of a batch and give its RF frames in one call to handler.
+            @param batch : list of records queued by listener
+        """
+        frames = []
+        for data in batch :
 #            print(u"----- Data Queue receive : {0}".format(data))
+            if data is None : continue  # wake-up sentinel
+            try :
+                msg = self._dispatch_RFP_data(data)
+                if msg is not None :
+                    # Repeats of a RF frame are suppressed before handlers
+                    if self._dedup is None or not self._dedup.isDuplicate(msg, data['timestamp']) : frames.append(msg)
+            except :
+                self._report_read_error(data)
+        if frames :
+            self._batchSizes.add(len(frames))
             try :
-                if data['header']['Qualifier'] == self.Q_REP:
-                    msg = self.decode_data(data['data'])
-                    if msg != {}:
-                        if 'ackFor' in data :
-                            if data['ackFor']['callback']is not None :
-                                if data['ackFor']['command'] == 'UPDATE FIRMWARE' :
-                                    data['ackFor']['callback'](msg['data'], data['ackFor'])
-                                else :
-                                    data['ackFor']['callback'](msg['data'], data['ackFor']['command'])
-                            else :
-                                msg['data'].update({'timestamp': data['timestamp']})
-                                self._cd_handle_RFP_Data(self, msg)
+                self._cd_handle_RFP_Data(self, frames if len(frames) > 1 else frames[0])
+            except :
+                self._report_read_error(frames)
+
+    def _dispatch_RFP_data(self, data):
+        """ Handle a received packet, responses are dispatched immediately.
+            @param data : record queued by listener
+            @return : RF frame message to handle in batch, else None
+        """
+        if data['header'].Qualifier == self.Q_REP:
+            msg = data['msg']
+            if msg['data'] :
+                if 'ackFor' in data :
+                    if data['ackFor']['callback']is not None :
+                        if data['ackFor']['command'] == 'UPDATE FIRMWARE' :
+                            data['ackFor']['callback'](msg['data'], data['ackFor'])
                         else :
-                            msg['data'].update({'timestamp': data['timestamp']})
-                            self._cd_handle_RFP_Data(self, msg['data'])
-                elif data['header']['Qualifier'] == self.Q_XML:
-                    msg = self.decode_XML(data['data'])
-                    if msg != {}:
-                        msg.update({'timestamp': data['timestamp']})
-                        self._cd_handle_RFP_Data(self, msg)
-                elif data['header']['Qualifier'] == self.Q_JSON:
-                    msg = self.decode_JSON(data['data'])
-                    if msg != {}:
-                        msg.update({'timestamp': data['timestamp']})
-                        self._cd_handle_RFP_Data(self, msg)
-                elif data['header']['Qualifier'] == self.Q_TXT:
-                    msg = self.decode_TEXT(data['data'])
-                    if msg != {}:
-                        msg.update({'timestamp': data['timestamp']})
+                            data['ackFor']['callback'](msg['data'], data['ackFor']['command'])
+                    else :
+                        msg['data'].update({'timestamp': data['timestamp']})
                         self._cd_handle_RFP_Data(self, msg)
-            except :
-                error = u"Error while reading {0} device {1}, data : {2}\n {3}".format(self.RFP_type, self.RFP_device, data, traceback.format_exc())
-                self.log.warning(error)
-                if self.isMonitored : self._manager.monitorClients.rawData_report(self.monitorID, time.time(), error)
+                elif type(msg['data']) == dict :
+                    msg['data'].update({'timestamp': data['timestamp']})
+                    self._cd_handle_RFP_Data(self, msg['data'])
+                else :
+                    self.log.debug(u"Response without request received on {0} : {1}".format(self.RFP_device, msg['data']))
+        elif data['header'].Qualifier in [self.Q_JSON, self.Q_HEX, self.Q_HEXF, self.Q_XML, self.Q_TXT]:
+            msg = data['msg']
+            if msg != {} and type(msg) == dict:
+                msg.update({'timestamp': data['timestamp']})
+                return msg
+        return None
 
-        self.log.info(u"***** Receive daemon Queue {0} on {1} stopped *****".format(self.RFP_type, self.RFP_device))
+    def _report_read_error(self, data):
+        """ Log and report to monitor an error on received data handling"""
+        error = u"Error while reading {0} device {1}, data : {2}\n {3}".format(self.RFP_type, self.RFP_device, data, traceback.format_exc())
+        self.log.warning(error)
+        if self.isMonitored : self._manager.monitorClients.rawData_report(self.monitorID, time.time(), error)
 
     def listen_RFP(self):
         """ Start listening to RFPlayer forever.
         """
         self.log.info(u"***** Start listening {0} on {1} *****".format(self.RFP_type, self.RFP_device))
         # infinite
-        while not self.stop.isSet():
+        while not self.stop.isSet() and not self._released:
+            if self.isOpen :
                 self._read_RFP_data()
+            else :
+                # Wait for open (or plugin stop) instead of spinning on a closed port.
+                self._openEvent.wait()
         self.log.info(u"***** listening {0} on {1} stopped *****".format(self.RFP_type, self.RFP_device))
         self._cd_handle_RFP_Data(self, {'timestamp': time.time(), 'client': self, 'status': 0})
 
-    def send_to_RFP(self, command, response=False, callback = None):
+    def send_to_RFP(self, command, response=False, callback = None, timeOut = 5, first = False):
         """ Put in queue a command to send to RFPLAYER
+             Several requests could wait for they response at same time, each one have a reqNum.
              @param command : the command in ASCII
              @param response : True to wait for a response else False (default)
              @param callback : Fonction to be called at response received.
+             @param timeOut : time to wait for the response after sending. Default 5s
+             @param first : put command at head of queue, before commands waiting (ex : at reconnection). Default False
+             @return : RFPRequest object if response, else None
         """
         cmd = "{0}{1}{2}".format(self. SYNC_ID, self.SDQ_ASCII, self.Q_CMD)
+        request = None
         if response :
-            self._reqNum += 1
-            cmd += "{0}".format(self._reqNum)
-            ackFor = {'command': command, 'reqNum': self._reqNum,  'callback': callback}
+            with self._requestsLock:
+                self._reqNum += 1
+                reqNum = self._reqNum
+            cmd += "{0}".format(reqNum)
+            ackFor = {'command': command, 'reqNum': reqNum,  'callback': callback}
+            request = RFPRequest(ackFor, timeOut)
         else :
             ackFor = {}
         cmd +=" {0}".format(command)
         self.log.debug(u"Push msg in command queue : {0}".format(cmd))
-        self.write_RFP.put_nowait({'data': cmd, 'response': response, 'ackFor': ackFor})
+        self._queue_RFP_record({'data': cmd, 'response': response, 'ackFor': ackFor, 'request': request, 'queued': time.time()}, first)
+        return request
+
+    def _queue_RFP_record(self, record, first=False):
+        """ Put a command record in write queue and wake the writer if it's an event loop
+            @param first : put record at head of queue. Default False
+        """
+        if first :
+            self.write_RFP.put_first(record)
+        else :
+            self.write_RFP.put_nowait(record)
+        if self._eventLoop is not None : self._eventLoop.wakeup()
 
     def RebuildFirmware(self, data):
         """Rebuild all lines of a firmware sended by external"""
@@ -535,7 +897,7 @@ class SerialRFPlayer(object):
         if self.isOpen :
             self._locked = "updatefirmware"
             try:
-                with self.RFP_Lock:
+                with self._writeLock:
                     msg = u"Start Update firmware on {0} device {1}\n  File: {2}\nWait and DO NOT SHUTDOWN the device ...".format(self.RFP_type, self.RFP_device, firmFile)
                     self.log.info(msg)
                     self._manager.publishRFPlayerMsg(self, 'rfplayer.client.updatefirmware', {'error': "", 'progress' : 0, 'totalprogress': offsetP, 'msg': msg, 'info': u"download"})
@@ -560,8 +922,9 @@ class SerialRFPlayer(object):
                     self._manager.publishRFPlayerMsg(self, 'rfplayer.client.updatefirmware', {'error': "", 'progress' : 30, 'totalprogress': offsetP+int(100/nbStep), 'msg': msg, 'info': u"Checking"})
                     self.log.info(msg)
                     self._firmwareData = []
-                    self.wait_RFP_response({'command': 'UPDATE FIRMWARE', 'reqNum': 0, 'callback': self.validate_UpdFirmware,
-                                            'offsetP': offsetP+int(100/nbStep), 'nbStep': nbStep }, 80)
+                    request = self._expect_RFP_response({'command': 'UPDATE FIRMWARE', 'reqNum': 0, 'callback': self.validate_UpdFirmware,
+                                                         'offsetP': offsetP+int(100/nbStep), 'nbStep': nbStep }, 80)
+                    self.wait_RFP_response(request)
             except serial.SerialException:
                     self._locked = ""
                     self._firmwareData = []
@@ -592,7 +955,6 @@ class SerialRFPlayer(object):
             self._manager.publishRFPlayerMsg(self, 'rfplayer.client.updatefirmware', {'error': '', 'progress' : 100, 'totalprogress': offsetP+int((100/nbStep)), 'msg': msg, 'info': u"Acheived"})
             self._locked = ""
             if SerialRFPlayer.open(self) :
-                self.getStatus()
                 msg = u"{0} device {1} reconnected\n******* Updated successfully. *******".format(self.RFP_type, self.RFP_device)
                 self._manager.publishRFPlayerMsg(self, 'rfplayer.client.updatefirmware', {'error': '', 'progress' : 100, 'totalprogress': 100, 'msg': msg, 'info': u"Achieved"})
             else :
@@ -604,7 +966,7 @@ class SerialRFPlayer(object):
             self.log.warning(msg)
             self._manager.publishRFPlayerMsg(self, 'rfplayer.client.updatefirmware', {'error': msg, 'progress' : 0, 'totalprogress': 0, 'msg': ""})
 
-    def getStatus(self):
+    def getStatus(self, first=False):
         """ Send a STATUS command to rfplayer. Must be overwrited."""
         return {}
 
@@ -617,43 +979,66 @@ class SerialRFPlayer(object):
 
     def ping(self):
         """ Send a PING command to rfplayer."""
+        if self._send_ping() :
+            # PONG is read by listener, reception flow is not stopped by ping.
+            self._pongEvent.wait(self.PING_TIMEOUT)
+        self._ping_result()
+
+    def _send_ping(self):
+        """ Queue a PING command like other commands, PONG is matched by listener.
+            @return : True if PING queued
+        """
+        if self.rfPlayer is None : return False
+        self._pongEvent.clear()
+        self._pingRequest = RFPRequest({'command': 'PING', 'reqNum': None, 'callback': None}, self.PING_TIMEOUT)
+        self._queue_RFP_record({'data': "{0}{1}{2}PING".format(self.SYNC_ID, self.SDQ_ASCII, self.Q_CMD), 'response': True,
+                                'ackFor': self._pingRequest.ackFor, 'request': None, 'ping': self._pingRequest, 'queued': time.time()})
+        return True
+
+    def _ping_result(self):
+        """ Check PONG reception after PING and report status"""
         msg = {'timestamp': time.time(), 'client': self,  'status': 0}
-        with self.RFP_Lock:
-            if self.rfPlayer is not None :
-                self.rfPlayer.reset_output_buffer()
-                self.rfPlayer.write(b'ZIA++PING\r')
-                ack = self.rfPlayer.readline()
-                print(ack)
-                if ack.find('PONG') != -1 :
-#                    self.log.debug(u"RFPLAYER on {0} receive PING reponse".format(self.RFP_device))
-                    msg['status'] = 1
-                    self._error = ""
-                else :
-                    self._error = u"RFPLAYER on {0} don't receive PING response".format(self.RFP_device)
-                    self.log.warning(self._error)
-                    self._manager.publishRFPlayerMsg(self)
+        if self.rfPlayer is not None :
+            if self._pongEvent.isSet() :
+#                self.log.debug(u"RFPLAYER on {0} receive PING reponse".format(self.RFP_device))
+                msg['status'] = 1
+                self._error = ""
+            else :
+                self._error = u"RFPLAYER on {0} don't receive PING response".format(self.RFP_device)
+                self.log.warning(self._error)
+                self._manager.publishRFPlayerMsg(self)
         self._cd_handle_RFP_Data(self, msg)
 
-    def getReqNum(self, packet):
-        """ Extract RefNum from data (JSON)"""
+    def getReqNum(self, data):
+        """ Extract RefNum from decoded data (JSON)"""
         # TODO : Handle data XML and TEXT, if this proves useful ?
-        data = self.decode_JSON(packet)
-        for k in data :
-            for k2 in data[k] :
-                if k2 == 'reqNum' : return int(data[k][k2])
+        if type(data) == dict :
+            for k in data :
+                if type(data[k]) == dict and 'reqNum' in data[k] : return int(data[k]['reqNum'])
         return 0
 
+    def decode_packet(self, header, packet):
+        """ Decode a packet depending of its header qualifier, each packet must be decoded only once.
+             @param header : RFPHeader of packet
+             @param packet : data without header
+             @return : decoded data, format of decode_data for responses.
+        """
+        if header.Qualifier == self.Q_REP : return self.decode_data(packet)
+        elif header.Qualifier == self.Q_JSON : return self.decode_JSON(packet)
+        elif header.Qualifier == self.Q_XML : return self.decode_XML(packet)
+        elif header.Qualifier == self.Q_TXT : return self.decode_TEXT(packet)
+        elif header.Qualifier in (self.Q_HEX, self.Q_HEXF) : return self.decode_HEX(packet)
+        return {}
+
     def decode_data(self, data):
-        """ Find and decode response from RFPLAYER
-             @param data : data that could parse in JSON
+        """ Find format and decode response from RFPLAYER
+             @param data : data that could parse in JSON, XML or TEXT
              @return : data in JSON format
         """
-        msg = self.decode_JSON(data)
-        if msg != {} : return {"type": self.Q_JSON, 'data': msg}
-        msg = self.decode_XML(data)
-        if msg != {} : return {"type": self.Q_XML, 'data': msg}
-        msg = self.decode_TEXT(data)
-        return {"type": self.Q_TXT, 'data': msg}
+        start = data.lstrip()[:1]
+        if start == '{' : return {"type": self.Q_JSON, 'data': self.decode_JSON(data)}
+        if start == '<' : return {"type": self.Q_XML, 'data': self.decode_XML(data)}
+        return {"type": self.Q_TXT, 'data': self.decode_TEXT(data)}
 
     def decode_JSON(self, data):
         """ Try JSON decode response from RFPLAYER
@@ -662,17 +1047,26 @@ class SerialRFPlayer(object):
         """
         retval = {}
         if len(data) > 2 :
+            if self.fake_device is not None : # Due to testserial format json, single quote must be replace for fake device.
+                data = data.replace("'", '"')
             try :
                 retval = json.loads(data)
     #            print(u" ******* Data JSON decode OK ********")
             except :
-                try: # Due to testserial format json, single quote must be replace for fake device.
-                    retval = json.loads(data.replace("'", '"'))
-                except:
-                    self.log.error(u"{0} on {1} fail decode JSON :{2} \n{3}".format(self.RFP_type, self.RFP_device, data, traceback.format_exc()))
-#                    pass
+                self.log.error(u"{0} on {1} fail decode JSON :{2} \n{3}".format(self.RFP_type, self.RFP_device, data, traceback.format_exc()))
         return retval
 
+    def decode_HEX(self, data):
+        """ Decode RF frame received in HEXA or HEXA FIXED format from RFPLAYER
+             @param data : binary frame coded in hexadecimal
+             @return : data in JSON format
+        """
+        try :
+            return decode_HEX_frame(data)
+        except :
+            self.log.error(u"{0} on {1} fail decode HEXA :{2} \n{3}".format(self.RFP_type, self.RFP_device, data, traceback.format_exc()))
+        return {}
+
     def decode_XML(self, data):
         """ Try XML decode response from RFPLAYER
              @param data : data that could parse in XML
@@ -718,4 +1112,14 @@ class SerialRFPlayer(object):
         retVal['serialParam'] = {'baudrate' : self.baudrate, 'bytesize' : self.bytesize, 'parity' : self.parity, 'stopbits' : self.stopbits
                                  ,'timeout' : self.timeout, 'xonxoff' : self.xonxoff, 'rtscts' : self.rtscts, 'dsrdtr' : self.dsrdtr}
         retVal['status'] = {}
+        retVal['dataFormat'] = self.data_format
+        retVal['ioEngine'] = "eventloop" if self._eventLoop is not None else "threads"
+        retVal['tickless'] = self.isOpen and self._eventLoop is None and self.rfPlayer.timeout is None
+        retVal['stats'] = {'wireLatency': self._wireLatency.getStats(),
+                           'batchSize': self._batchSizes.getStats(),
+                           'pingRtt': self._pingRtt.getStats(),
+                           'dedup': self._dedup.getStats() if self._dedup is not None else {},
+                           'reconnect': dict(self._reconnectStats, timeToRecover=self._recoverTime.getStats()),
+                           'receivedQueue': self.RFP_received.getStats(), 'writeQueue': self.write_RFP.getStats()}
+        retVal['pendingRequests'] = len(self._pendingRequests)
         return retVal
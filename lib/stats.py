@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Rolling statistics used to report RFPlayer I/O performances
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+from collections import deque
+from threading import Lock
+
+class RunningStats(object):
+    """Rolling statistics on a serie of values (ex : latency in seconds)"""
+
+    def __init__(self, window=100, scale=1000.0, unit="ms"):
+        """ Init statistics
+            @param window : number of last values used for average and percentile. Default: 100
+            @param scale : factor applied to values at report. Default: 1000 (seconds to ms)
+            @param unit : unit name of reported values. Default: ms
+        """
+        self._values = deque(maxlen=window)
+        self._scale = scale
+        self._unit = unit
+        self._lock = Lock()
+        self.count = 0
+        self.last = None
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """ Add a new value to statistics"""
+        with self._lock:
+            self._values.append(value)
+            self.count += 1
+            self.last = value
+            if self.min is None or value < self.min : self.min = value
+            if self.max is None or value > self.max : self.max = value
+
+    def reset(self):
+        """ Clear all statistics"""
+        with self._lock:
+            self._values.clear()
+            self.count = 0
+            self.last = None
+            self.min = None
+            self.max = None
+
+    def getStats(self):
+        """ Return statistics formated to UI"""
+        with self._lock:
+            values = sorted(self._values)
+            retVal = {'count': self.count, 'unit': self._unit}
+            if values :
+                retVal['last'] = round(self.last * self._scale, 3)
+                retVal['min'] = round(self.min * self._scale, 3)
+                retVal['max'] = round(self.max * self._scale, 3)
+                retVal['avg'] = round((sum(values) / len(values)) * self._scale, 3)
+                retVal['p95'] = round(values[int(len(values) * 0.95)] * self._scale, 3) if len(values) > 1 else retVal['last']
+        return retVal
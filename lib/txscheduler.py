@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+
+""" This file is part of B{Domogik} project (U{http://www.domogik.org}).
+
+License
+=======
+
+B{Domogik} is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+B{Domogik} is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Domogik. If not, see U{http://www.gnu.org/licenses}.
+
+Plugin purpose
+==============
+
+The dongle RFPLAYER RFP1000 is a new generation Radio Frequency device. The RFP1000 looks like a USB
+key with 2 independent Radio Frequency transceivers 433 Mhz and 868 Mhz dedicated to a Home Automation
+usage.
+
+Implements
+==========
+
+- Transmit scheduler of commands with a queue by RF band (433/868 Mhz), bands are paced on estimated airtime
+
+@author: Nico <nico84dev@gmail.com>
+@copyright: (C) 2007-2016 Domogik project
+@license: GPL(v3)
+@organization: Domogik
+"""
+
+import time
+from threading import Lock, Condition
+try :
+    from Queue import Empty
+except ImportError :
+    from queue import Empty     # python 3
+from domogik_packages.plugin_rfplayer.lib.infotypes import RF_PROTOCOLS
+from domogik_packages.plugin_rfplayer.lib.queues import RFPQueue, DROP_OLDEST, commandKey
+from domogik_packages.plugin_rfplayer.lib.stats import RunningStats
+
+BAND_CTRL = 'ctrl'  # Commands without RF transmission (STATUS, FORMAT, PING, ...)
+BAND_433 = '433'
+BAND_868 = '868'
+RF_BANDS = (BAND_433, BAND_868)
+
+def _protocolBands():
+    """ Return {protocol name: tuple of bands} from RF_PROTOCOLS, a name can be on both bands (ex : X2D)"""
+    bands = {}
+    for protocol in RF_PROTOCOLS.values() :
+        if 'name' in protocol and protocol['freq'] :
+            bands[protocol['name']] = tuple(sorted(set(bands.get(protocol['name'], ()) + tuple(protocol['freq']))))
+    return bands
+
+PROTOCOL_BANDS = _protocolBands()
+
+# Estimated airtime (s) of a command, frame length x default repeats of protocol.
+# With LBT enabled RFPlayer could hold a frame up to 3s, only the band of the frame is delayed.
+AIRTIMES = {'X10': 0.35, 'CHACON': 0.3, 'DOMIA': 0.25, 'BLYSS': 0.2, 'KD101': 0.25,
+            'VISONIC': 0.15, 'X2D': 0.15, 'X2D_SHUTTER': 0.15, 'PARROT': 0.25}
+DEFAULT_AIRTIME = 0.25
+LBT_MARGIN = 0.2    # Added to airtime of a band with LBT enabled (RFPlayer default), for channel listening and usual holds.
+
+def commandProtocol(data):
+    """ Return protocol name of a command record (ex : 'ZIA++ ON A1 X10' -> 'X10'), None if not a RF command."""
+    if type(data) == dict :
+        parts = data['data'].split(' ')
+        for part in parts[2:4] :
+            if part in PROTOCOL_BANDS : return part
+    return None
+
+class TxScheduler(object):
+    """ Write queue with a bounded queue by band : control commands, 433 Mhz and 868 Mhz.
+          RFPlayer transceivers are independent, a command is dispatched when its band is free,
+          so a 433 command never waits behind 868 commands (or an 868 band held by LBT).
+          A band is busy during estimated airtime of last command dispatched on it.
+          Control commands are dispatched first, RF bands in order of oldest command waiting.
+          A RF command supersede a command of same protocol, device and kind still waiting (ex : dimmer slider),
+          it can be held a hold-off time to be superseded before sending.
+          Same interface as RFPQueue used by writer (put_nowait, get, get_nowait, getStats).
+    """
+
+    def __init__(self, maxsize=0, policy=DROP_OLDEST, airtimes={}, holdoff=0):
+        """ Init scheduler
+            @param maxsize : max commands waiting in each band queue, 0 for unbounded. Default: 0
+            @param policy : overload policy of band queues, see RFPQueue. Default: drop_oldest
+            @param airtimes : optional airtime (s) by protocol name, override AIRTIMES.
+            @param holdoff : optional time (s) a RF command wait for a newer command of same kind before sending. Default: 0
+        """
+        self.maxsize = maxsize
+        self.policy = policy
+        self.holdoff = holdoff
+        self._airtimes = dict(AIRTIMES, **airtimes)
+        self._mutex = Lock()
+        self._notEmpty = Condition(self._mutex)
+        self._queues = dict((band, RFPQueue(maxsize, policy, commandKey, True)) for band in (BAND_CTRL, ) + RF_BANDS)
+        self._busyUntil = dict((band, 0) for band in RF_BANDS)
+        self._lbtMargin = dict((band, LBT_MARGIN) for band in RF_BANDS)
+        self._airtimeUsed = dict((band, 0.0) for band in RF_BANDS)
+        self._dispatched = dict((band, 0) for band in (BAND_CTRL, ) + RF_BANDS)
+        self._waits = dict((band, RunningStats()) for band in (BAND_CTRL, ) + RF_BANDS)
+
+    def setLBT(self, band, enabled):
+        """ Set Listen Before Talk state of a band, read from RFPlayer radio status.
+            @param band : BAND_433 or BAND_868
+            @param enabled : True if LBT enabled, airtime of band commands include LBT_MARGIN
+        """
+        if band in self._lbtMargin : self._lbtMargin[band] = LBT_MARGIN if enabled else 0
+
+    def commandBands(self, data):
+        """ Return (protocol, bands) of a command record, bands is (BAND_CTRL, ) for commands without RF."""
+        protocol = commandProtocol(data)
+        if protocol is None : return None, (BAND_CTRL, )
+        return protocol, PROTOCOL_BANDS[protocol]
+
+    def put(self, item, block=True, timeout=None):
+        """ Put a command record in queue of its band, never block. A None item (wake-up sentinel) is a control one."""
+        protocol, bands = self.commandBands(item)
+        if type(item) == dict :
+            item['bands'] = bands
+            item['airtime'] = self._airtimes.get(protocol, DEFAULT_AIRTIME) if protocol is not None else 0
+            item['holdUntil'] = time.time() + self.holdoff if protocol is not None else 0
+        with self._mutex:
+            # Queue of first band keep the command, a command on both bands wait for both.
+            queue = self._queues[bands[0]]
+            if protocol is not None and self.holdoff :
+                # Hold-off window start at first command, superseding commands don't delay it.
+                waiting = queue.find(commandKey(item))
+                if waiting is not None : item['holdUntil'] = waiting['holdUntil']
+            queue.put_nowait(item)
+            self._notEmpty.notify()
+
+    def put_nowait(self, item):
+        """ Put a command record in queue, never block."""
+        return self.put(item, False)
+
+    def put_first(self, item):
+        """ Put a control command record (ex : FORMAT at open) before all commands waiting, never block."""
+        item['bands'] = (BAND_CTRL, )
+        item['airtime'] = 0
+        item['holdUntil'] = 0
+        with self._mutex:
+            self._queues[BAND_CTRL].put_first(item)
+            self._notEmpty.notify()
+
+    def put_back(self, item):
+        """ Put back a command record got but not written, before commands waiting in its band."""
+        with self._mutex:
+            self._queues[item['bands'][0]].put_back(item)
+            self._notEmpty.notify()
+
+    def _readyAt(self, record):
+        """ Return time when a RF command can be dispatched, its bands free and hold-off ended."""
+        return max([record['holdUntil']] + [self._busyUntil[b] for b in record['bands']])
+
+    def _nextRecord(self, now):
+        """ Pop next command record ready to dispatch, must be called with mutex.
+            @return : (record, found) or (None, False) if no band ready
+        """
+        queue = self._queues[BAND_CTRL]
+        if queue.qsize() :
+            record = queue.get_nowait()
+            self._dispatch(BAND_CTRL, record, now)
+            return record, True
+        best = None
+        for band in RF_BANDS :
+            queue = self._queues[band]
+            head = queue.peek()
+            if head is not None and self._readyAt(head) <= now :
+                if best is None or head['queued'] < best[1]['queued'] : best = (band, head)
+        if best is None : return None, False
+        record = self._queues[best[0]].get_nowait()
+        for band in record['bands'] :
+            self._busyUntil[band] = now + record['airtime'] + self._lbtMargin[band]
+            self._airtimeUsed[band] += record['airtime']
+        self._dispatch(best[0], record, now)
+        return record, True
+
+    def _dispatch(self, band, record, now):
+        self._dispatched[band] += 1
+        if type(record) == dict and 'queued' in record : self._waits[band].add(now - record['queued'])
+
+    def nextReady(self):
+        """ Return time when a band with waiting commands will be free, None if no command waiting."""
+        with self._mutex:
+            ready = None
+            if self._queues[BAND_CTRL].qsize() : return time.time()
+            for band in RF_BANDS :
+                head = self._queues[band].peek()
+                if head is not None :
+                    free = self._readyAt(head)
+                    if ready is None or free < ready : ready = free
+            return ready
+
+    def get(self, block=True, timeout=None):
+        """ Return next command record to write, wait until a band is ready.
+            @param block, timeout : same as Queue.get, raise Empty.
+        """
+        end = time.time() + timeout if timeout is not None else None
+        with self._notEmpty:
+            while True :
+                now = time.time()
+                record, found = self._nextRecord(now)
+                if found : return record
+                if not block : raise Empty
+                # Without command wait without timeout, else until a band is free or a new command.
+                wait = None
+                for band in RF_BANDS :
+                    head = self._queues[band].peek()
+                    if head is not None :
+                        free = self._readyAt(head) - now
+                        wait = free if wait is None else min(wait, free)
+                if end is not None :
+                    if end <= now : raise Empty
+                    wait = end - now if wait is None else min(wait, end - now)
+                self._notEmpty.wait(wait)
+
+    def get_nowait(self):
+        """ Return next command record ready, raise Empty."""
+        return self.get(False)
+
+    def qsize(self):
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    def getStats(self):
+        """ Return scheduler counters, totals of all bands and details by band"""
+        stats = {'size': 0, 'maxsize': self.maxsize, 'policy': self.policy, 'enqueued': 0,
+                 'dropped': 0, 'coalesced': 0, 'highWater': 0, 'holdoff': self.holdoff, 'bands': {}}
+        for band, queue in self._queues.items() :
+            qStats = queue.getStats()
+            for k in ('size', 'enqueued', 'dropped', 'coalesced') : stats[k] += qStats[k]
+            stats['highWater'] = max(stats['highWater'], qStats['highWater'])
+            stats['bands'][band] = {'size': qStats['size'], 'dispatched': self._dispatched[band], 'suppressed': qStats['coalesced'],
+                                    'wait': self._waits[band].getStats()}
+            if band in RF_BANDS :
+                stats['bands'][band]['airtime'] = round(self._airtimeUsed[band], 3)
+                stats['bands'][band]['lbt'] = self._lbtMargin[band] != 0
+        stats['suppressed'] = stats['coalesced']   # Commands superseded by a newer one before sending
+        return stats
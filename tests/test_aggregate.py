@@ -0,0 +1,90 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of sensors values aggregation in time windows
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.aggregate import SensorAggregator, parseAggregates
+
+POWER = {'id': 1, 'data_type': 'DT_Power'}
+ENERGY = {'id': 2, 'data_type': 'DT_ActiveEnergy'}
+SWITCH = {'id': 3, 'data_type': 'DT_Switch'}
+SENSORS = {2: ('owl', ENERGY), 3: ('owl', SWITCH)}
+
+def windows(values):
+    """ Return values of windows ended, without samples published"""
+    return [v for d, s, v in values if s is not POWER]
+
+class ParseTestCase(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual(parseAggregates("DT_Power:avg:300, 1:integral:3600:2,DT_Temp:median:60,DT_Bool:max:x,bad"),
+                         {'DT_Power': ('avg', 300.0, None), 1: ('integral', 3600.0, 2)})
+        # Integral needs a rate sensor id and a target sensor id
+        self.assertEqual(parseAggregates("DT_Power:integral:3600:2,1:integral:3600,1:avg:60:2"), {})
+        self.assertEqual(parseAggregates(None), {})
+
+class SensorAggregatorTestCase(unittest.TestCase):
+
+    def test_window_functions(self):
+        for function, expected in (('avg', 20.0), ('min', 10), ('max', 30), ('last', 30)) :
+            agg = SensorAggregator({'DT_Power': (function, 60, None)})
+            out = [agg.aggregate(POWER, v, t, 'owl') for v, t in ((10, 0), (20, 30), (30, 59), (40, 61))]
+            self.assertEqual(out, [[], [], [], [('owl', POWER, expected)]], function)
+
+    def test_not_aggregated(self):
+        agg = SensorAggregator({'DT_Power': ('avg', 60, None)})
+        self.assertEqual(agg.aggregate(SWITCH, 1, 0), [(None, SWITCH, 1)])
+        self.assertEqual(agg.aggregate(POWER, "NaN", 0), [(None, POWER, "NaN")])
+        self.assertEqual(agg.aggregate(POWER, True, 0), [(None, POWER, True)])
+
+    def test_integral(self):
+        agg = SensorAggregator({1: ('integral', 3600, 2)}, SENSORS.get)
+        out = [agg.aggregate(POWER, 1000, t, 'owl') for t in range(0, 2 * 3600 + 1, 12)]
+        self.assertTrue(all(o[0] == ('owl', POWER, 1000) for o in out))    # Power samples still published
+        self.assertEqual([o[1:] for o in out if len(o) > 1], [[('owl', ENERGY, 1000.0)]] * 2)    # 1000 W during 1 h
+
+    def test_integral_variable_spacing(self):
+        agg = SensorAggregator({1: ('integral', 3600, 2)}, SENSORS.get)
+        # 0 W up to 1800 s, 2000 W up to 2700 s, 500 W up to 3600 s, value held until next sample
+        samples = ((0, 0), (0, 1000), (2000, 1800), (2000, 1810), (2000, 2500), (500, 2700), (100, 3600))
+        out = sum([windows(agg.aggregate(POWER, v, t)) for v, t in samples], [])
+        self.assertEqual(out, [625.0])      # 2000 * 0.25 + 500 * 0.25 Wh
+
+    def test_integral_rejected(self):
+        sensors = dict(SENSORS)
+        sensors[4] = ('owl', {'id': 4, 'data_type': 'DT_mMeter'})
+        agg = SensorAggregator({1: ('integral', 3600, 4), 2: ('integral', 3600, 3), 5: ('integral', 3600, 2)}, sensors.get)
+        self.assertEqual(agg.aggregate(POWER, 1000, 0), [(None, POWER, 1000)])       # Target of other unit
+        self.assertEqual(agg.aggregate(ENERGY, 1000, 0), [(None, ENERGY, 1000)])     # Not a rate sensor
+        rain = {'id': 5, 'data_type': 'DT_mMeterHour'}
+        self.assertEqual(agg.aggregate(rain, 2.5, 0), [(None, rain, 2.5)])           # Target of other unit
+        self.assertEqual(agg.getStats()['rejected'], [1, 2, 5])
+        self.assertEqual(SensorAggregator({1: ('integral', 3600, 2)}).aggregate(POWER, 1000, 0), [(None, POWER, 1000)])
+
+    def test_flush(self):
+        agg = SensorAggregator({'DT_Power': ('avg', 60, None)})
+        agg.aggregate(POWER, 10, 0, 'dev')
+        agg.aggregate(POWER, 20, 30, 'dev')
+        self.assertEqual(agg.flush(59), [])
+        self.assertEqual(agg.flush(70), [('dev', POWER, 15.0)])
+        self.assertEqual(agg.flush(80), [])     # Published once
+        self.assertEqual(agg.aggregate(POWER, 40, 61, 'dev'), [])   # Late sample of flushed window kept for next one
+        self.assertEqual(agg.aggregate(POWER, 50, 130, 'dev'), [('dev', POWER, 40)])
+        self.assertEqual(agg.getStats()['flushed'], 1)
+
+    def test_flush_integral(self):
+        agg = SensorAggregator({1: ('integral', 3600, 2)}, SENSORS.get)
+        agg.aggregate(POWER, 1000, 1800, 'owl')
+        self.assertEqual(agg.flush(3610), [('owl', ENERGY, 500.0)])     # 1000 W held up to end of window
+        self.assertEqual(windows(agg.aggregate(POWER, 1000, 5400, 'owl')), [])
+        self.assertEqual(windows(agg.aggregate(POWER, 0, 7200, 'owl')), [1000.0])   # Held value from start of window
+        agg.clear()
+        self.assertEqual(agg.flush(10800), [('owl', ENERGY, 0.0)])      # Rule found again after devices update
+
+if __name__ == "__main__":
+    unittest.main()
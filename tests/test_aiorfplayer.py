@@ -0,0 +1,170 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of asyncio RFP1000 client, with a fake dongle on a pseudo terminal
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import os
+import tty
+import time
+import json
+import logging
+import threading
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.aiorfplayer import AsyncRFP1000, StopAsyncIteration, asyncio
+
+FRAME = {"frame": {"header": {"frameType": "0", "cluster": "0", "dataFlag": "0", "rfLevel": "-76", "floorNoise": "-102",
+                              "rfQuality": "5", "protocol": "5", "protocolMeaning": "OREGON", "infoType": "4", "frequency": "433920"},
+                   "infos": {"subType": "0", "id_PHY": "0x0000", "id_PHYMeaning": "ProbeV1", "adr_channel": "256", "adr": "1",
+                             "channel": "0", "qualifier": "17", "lowBatt": "1",
+                             "measures": [{"type": "temperature", "value": "+19.0", "unit": "Celsius"}]}}}
+
+class FakeDongle(object):
+    """ RFP1000 on master side of a pseudo terminal, answers HELLO and STATUS.
+          ECHO commands are answered in reverse order when two are received.
+    """
+
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.received = []
+        self._held = []
+        self._running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def send(self, line):
+        os.write(self.master, u"{0}\n\r".format(line).encode('latin-1'))
+
+    def sendFrame(self, frame):
+        self.send(u"ZIA33{0}".format(json.dumps(frame)))
+
+    def _run(self):
+        data = b''
+        while self._running :
+            try :
+                data += os.read(self.master, 4096)
+            except OSError :
+                break
+            while b'\r' in data :
+                line, data = data.split(b'\r', 1)
+                line = line.decode('latin-1')
+                self.received.append(line)
+                self.answer(line)
+
+    def answer(self, line):
+        command = line[5:]
+        reqNum = command.split(' ')[0]
+        if command == 'HELLO' :
+            self.send("ZIA--Welcome to Ziblue Dongle RFPLAYER (RFP1000, Firmware V1.12 Mac 0xF6C09FDD)!")
+        elif command.endswith('STATUS JSON') :
+            self.send(u'ZIA--{{"systemStatus": {{"reqNum": "{0}", "info": []}}}}'.format(reqNum))
+            self.send(u'ZIA--{{"radioStatus": {{"reqNum": "{0}", "band": []}}}}'.format(reqNum))
+        elif ' ECHO ' in command :
+            self._held.append(u'ZIA--{{"echo": {{"reqNum": "{0}", "value": "{1}"}}}}'.format(reqNum, command.split(' ')[-1]))
+            if len(self._held) == 2 :
+                for response in reversed(self._held) : self.send(response)
+                self._held = []
+
+    def close(self):
+        self._running = False
+        os.close(self.master)
+        os.close(self.slave)
+
+class FakeManager(object):
+
+    def __init__(self):
+        self.log = logging.getLogger('rfplayer_test')
+        self._plugin = self
+        self._stop = threading.Event()
+
+    def get_stop(self):
+        return self._stop
+
+    def publishRFPlayerMsg(self, rfPLayer, category='rfplayer.client.state', data={}):
+        pass
+
+def waitFor(check, timeOut=2):
+    """ Wait until check() is True, return its last value"""
+    end = time.time() + timeOut
+    while not check() and time.time() < end : time.sleep(0.01)
+    return check()
+
+class AsyncRFP1000TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.dongle = FakeDongle()
+        self.client = AsyncRFP1000(FakeManager(), self.dongle.port, loop=self.loop, dedup_windows=None)
+
+    def tearDown(self):
+        if self.client.isOpen : self.client.close()
+        self.dongle.close()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_loop(self, future, timeOut=5):
+        return self.loop.run_until_complete(asyncio.wait_for(future, timeOut))
+
+    def test_connect(self):
+        future = self.client.connect()
+        self.assertFalse(future.done())     # Handshake not done in loop thread
+        self.assertTrue(self.run_loop(future))
+        self.assertTrue(self.client.isOpen)
+        self.assertEqual(self.dongle.received[0], 'ZIA++HELLO')
+
+    def test_not_open(self):
+        self.assertRaises(IOError, self.run_loop, self.client.send('ON A1 X10'))
+        self.assertRaises(IOError, self.run_loop, self.client.request('STATUS JSON'))
+
+    def test_send(self):
+        self.run_loop(self.client.connect())
+        self.assertTrue(self.run_loop(self.client.send('ON A1 X10')))
+        self.assertTrue(waitFor(lambda: 'ZIA++ ON A1 X10' in self.dongle.received))    # Future done when written
+
+    def test_request_correlation(self):
+        self.run_loop(self.client.connect())
+        first = self.client.request('ECHO first')
+        second = self.client.request('ECHO second')
+        results = self.run_loop(asyncio.gather(first, second))
+        self.assertEqual([r['echo']['value'] for r in results], ['first', 'second'])   # Responses received in reverse order
+        self.assertEqual(self.client._pendingRequests, {})
+
+    def test_request_timeout(self):
+        self.run_loop(self.client.connect())
+        self.assertRaises(asyncio.TimeoutError, self.run_loop, self.client.request('SILENT', 0.2))
+        self.assertEqual(self.client._pendingRequests, {})
+        self.run_loop(self.client.requestStatus())     # Next request is answered
+        self.assertTrue('systemStatus' in self.client.status)
+
+    def test_frames(self):
+        self.run_loop(self.client.connect())
+        stream = self.client.frames()
+        waiting = stream.__anext__()
+        self.dongle.sendFrame(FRAME)
+        self.dongle.sendFrame(FRAME)
+        self.assertEqual(self.run_loop(waiting)['frame']['infos'], FRAME['frame']['infos'])
+        self.assertEqual(self.run_loop(stream.get())['frame']['header']['protocolMeaning'], 'OREGON')
+        self.assertTrue(stream.__aiter__() is stream)
+        self.client.close()
+        self.assertRaises(StopAsyncIteration, self.run_loop, stream.__anext__())
+
+    def test_frames_bounded(self):
+        stream = self.client.frames(2)
+        for n in range(3) : stream.put({'frame': n})
+        self.assertEqual([self.run_loop(stream.get())['frame'] for n in range(2)], [1, 2])
+        self.assertEqual(stream.dropped, 1)
+        stream.put({'frame': 3})
+        stream.close()
+        self.assertEqual(self.run_loop(stream.get())['frame'], 3)    # Frames received before end are kept
+        self.assertRaises(StopAsyncIteration, self.run_loop, stream.get())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of MQ request rfplayer.client.cmdbatch : commands resolved in one pass, status of each command
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import json
+import logging
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.rfplayer import RFPManager
+
+from test_groupcmds import FakeClient, device
+
+class FakePlugin(object):
+    """ Plugin with domogik devices list indexed by id"""
+
+    def __init__(self, devices):
+        self.log = logging.getLogger('rfplayer_test')
+        self.devices = devices
+
+    def dmgDeviceFromId(self, id):
+        for device in self.devices :
+            if device['id'] == int(id) : return device
+        return None
+
+class CmdBatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.devices = [device(n) for n in range(16)]    # CHACON ids 32 to 47 : one group
+        self.client = FakeClient()
+        self.manager = RFPManager.__new__(RFPManager)
+        self.manager._plugin = FakePlugin(self.devices)
+        self.manager.rfpClients = {'rfp.1': self.client}
+
+    def test_results_in_order(self):
+        report = self.manager.processCmdBatch({'commands': [{'device_id': 1, 'command_id': 101, 'value': '1'},
+                                                            {'device_id': 99, 'command_id': 101, 'value': '1'},
+                                                            {'device_id': 2, 'command_id': 102},
+                                                            {'device_id': 3, 'command_id': 999, 'value': '0'},
+                                                            {'device_id': 'x', 'command_id': 101, 'value': '0'},
+                                                            {'device_id': 4, 'command_id': '104', 'value': '0'}]})
+        self.assertEqual(report['error'], u"")
+        self.assertEqual([(r['device_id'], r['status']) for r in report['results']],
+                         [(1, True), (99, False), (2, False), (3, False), ('x', False), (4, True)])
+        self.assertTrue(report['results'][1]['reason'].startswith(u"Abording command, no device found"))
+        self.assertTrue(report['results'][2]['reason'].startswith(u"Abording command, no extra key"))
+        self.assertTrue(report['results'][3]['reason'].startswith(u"Command id 999 not exist"))
+        self.assertTrue(report['results'][4]['reason'].startswith(u"Invalid command entry"))
+        self.assertEqual(self.client.sent, ['ON 33 CHACON', 'OFF 36 CHACON'])
+
+    def test_group_command(self):
+        commands = [{'device_id': d['id'], 'command_id': 100 + d['id'], 'value': '0'} for d in self.devices]
+        report = self.manager.processCmdBatch({'commands': json.dumps(commands)})     # List received as JSON string
+        self.assertEqual(self.client.sent, ['ALL_OFF 32 CHACON'])
+        self.assertTrue(all(r['status'] for r in report['results']))
+        self.assertEqual(len(report['results']), 16)
+
+    def test_invalid_list(self):
+        for data in ({'commands': "not json"}, {'commands': {'device_id': 1}}, {}) :
+            report = self.manager.processCmdBatch(data)
+            if data :
+                self.assertTrue(report['error'].startswith(u"<client.cmdbatch>, Invalid commands list"))
+            else :
+                self.assertEqual(report, {'error': u"", 'results': []})
+        self.assertEqual(self.client.sent, [])
+
+if __name__ == "__main__":
+    unittest.main()
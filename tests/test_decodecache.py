@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of decoded RF payloads cache
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.decodecache import DecodeCache, payloadKey
+
+def frame(temperature, rfLevel='-60', rfQuality='5'):
+    return {'header': {'protocol': '5', 'infoType': '4', 'rfLevel': rfLevel, 'floorNoise': '-100', 'rfQuality': rfQuality},
+            'infos': {'id_PHY': '0xFA28', 'adr_channel': '1', 'measures': [{'type': 'temperature', 'value': temperature}]}}
+
+class PayloadKeyTestCase(unittest.TestCase):
+
+    def test_payload_key(self):
+        self.assertEqual(payloadKey(frame('+19.5')), payloadKey(frame('+19.5', rfLevel='-80')))
+        self.assertNotEqual(payloadKey(frame('+19.5')), payloadKey(frame('+19.6')))
+        self.assertNotEqual(payloadKey(frame('+19.5')), payloadKey(frame('+19.5', rfQuality='3')))
+        self.assertEqual(payloadKey({'data': 'PONG'}), None)
+
+class DecodeCacheTestCase(unittest.TestCase):
+
+    def test_get_put(self):
+        cache = DecodeCache()
+        device = {'id': 1, 'name': 'probe'}
+        key = payloadKey(frame('+19.5'))
+        self.assertEqual(cache.get(key), None)
+        cache.put(key, [(device, {'id': 10}, 19.5)])
+        self.assertTrue(cache.get(payloadKey(frame('+19.5', rfLevel='-80')))[0][0] is device)
+        stats = cache.getStats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hitRate']), (1, 1, 50.0))
+        self.assertTrue(stats['memory'] > 0)
+
+    def test_least_recently_used_evicted(self):
+        cache = DecodeCache(2)
+        cache.put('a', [])
+        cache.put('b', [])
+        cache.get('a')
+        cache.put('c', [])
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), [])
+        self.assertEqual(cache.getStats()['evicted'], 1)
+
+    def test_clear(self):
+        cache = DecodeCache()
+        cache.put('a', [])
+        cache.clear()
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(cache.getStats()['memory'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of repeated RF frames suppression
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.dedup import FrameDedup, parseWindows
+
+def frame(protocol, device, value='ON', rfLevel='-60'):
+    return {'frame': {'header': {'protocol': '1', 'protocolMeaning': protocol, 'infoType': '0', 'frameType': '0',
+                                 'dataFlag': '0', 'rfLevel': rfLevel, 'floorNoise': '-100', 'rfQuality': '5'},
+                      'infos': {'subType': value, 'id': device}}}
+
+class FrameDedupTestCase(unittest.TestCase):
+
+    def test_parse_windows(self):
+        self.assertEqual(parseWindows("700, x10:300,OREGON:0,bad:x"), {'default': 0.7, 'X10': 0.3, 'OREGON': 0})
+        self.assertEqual(parseWindows(None), {'default': 0.5})
+
+    def test_repeats_suppressed(self):
+        dedup = FrameDedup({'default': 0.5})
+        self.assertFalse(dedup.isDuplicate(frame('X10', '1'), 0))
+        self.assertTrue(dedup.isDuplicate(frame('X10', '1', rfLevel='-70'), 0.1))   # Reception fields ignored
+        self.assertFalse(dedup.isDuplicate(frame('X10', '1', 'OFF'), 0.2))
+        self.assertFalse(dedup.isDuplicate(frame('X10', '2'), 0.2))
+        self.assertEqual(dedup.getStats()['hits'], 1)
+
+    def test_sliding_window(self):
+        dedup = FrameDedup({'default': 0.5})
+        for t in (0, 0.4, 0.8, 1.2) :
+            dedup.isDuplicate(frame('X10', '1'), t)
+        self.assertEqual(dedup.getStats()['hits'], 3)       # Burst extend window
+        self.assertFalse(dedup.isDuplicate(frame('X10', '1'), 2))
+
+    def test_window_by_protocol(self):
+        dedup = FrameDedup({'default': 0.5, 'OREGON': 0})
+        dedup.isDuplicate(frame('OREGON', '1'), 0)
+        self.assertFalse(dedup.isDuplicate(frame('OREGON', '1'), 0.1))
+        self.assertFalse(dedup.isDuplicate({'msg': 'not a frame'}, 0))
+
+    def test_bounded_cache(self):
+        dedup = FrameDedup({'default': 10}, 4)
+        for n in range(10) : dedup.isDuplicate(frame('X10', str(n)), n * 0.1)
+        stats = dedup.getStats()
+        self.assertEqual(stats['size'], 4)
+        self.assertEqual(stats['evicted'], 6)
+        self.assertFalse(dedup.isDuplicate(frame('X10', '0'), 1))     # Evicted key
+
+if __name__ == "__main__":
+    unittest.main()
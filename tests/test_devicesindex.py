@@ -0,0 +1,74 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of domogik devices index of plugin, by device parameter and by id
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import logging
+import unittest
+
+try :
+    from domogik.common.plugin import Plugin
+except ImportError :
+    Plugin = None   # Plugin module needs domogik
+
+def device(n, address=None):
+    parameters = {'dongle_id': {'value': 'rfp'}}
+    if address is not None : parameters['device'] = {'value': address}
+    return {'id': n, 'name': u"D{0}".format(n), 'device_type_id': 'rfplayer.4.switch', 'parameters': parameters}
+
+class FakeManager(object):
+    """ RFPManager recording devices refresh and index state at refresh"""
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+        self.refreshed = []
+
+    def refreshDevices(self, devices):
+        self.refreshed.append((devices, self.plugin.dmgDeviceFromId(devices[-1]['id'])))
+
+@unittest.skipIf(Plugin is None, "domogik is not installed")
+class DevicesIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        from domogik_packages.plugin_rfplayer.bin.rfplayer import RFPlayer, NO_DEVICES
+        self.NO_DEVICES = NO_DEVICES
+        self.plugin = RFPlayer.__new__(RFPlayer)
+        self.plugin.log = logging.getLogger('rfplayer_test')
+        self.plugin._devicesIndex = {}
+        self.plugin._idIndex = {}
+        self.plugin._indexedDevices = None
+        self.plugin.devices = [device(1, '32'), device(2, '32'), device(3, 'A1'), device(4)]
+
+    def test_index(self):
+        self.assertEqual([d['id'] for d in self.plugin.getDmgDevices('32')], [1, 2])
+        self.assertEqual([d['id'] for d in self.plugin.getDmgDevices('A1')], [3])
+        self.assertTrue(self.plugin.getDmgDevices('B1') is self.NO_DEVICES)
+        self.assertEqual(self.plugin.dmgDeviceFromId('4')['name'], u"D4")     # Device without address only indexed by id
+        self.assertEqual(self.plugin.dmgDeviceFromId(5), None)
+        self.assertRaises(ValueError, self.plugin.dmgDeviceFromId, 'x')
+
+    def test_check_index(self):
+        self.assertEqual(self.plugin.getDmgDevices('B1'), [])
+        self.plugin.devices.append(device(5, 'B1'))         # Same list changed
+        self.assertEqual([d['id'] for d in self.plugin.getDmgDevices('B1')], [5])
+        index = self.plugin._devicesIndex
+        self.plugin.devices = [device(6, 'C1')]             # List replaced (ex : get_device_list)
+        self.assertEqual(self.plugin.getDmgDevices('32'), [])
+        self.assertEqual(self.plugin.dmgDeviceFromId(6)['name'], u"D6")
+        self.assertTrue(self.plugin._devicesIndex is index)     # Updated in place
+
+    def test_update_devices(self):
+        self.plugin.managerRFP = FakeManager(self.plugin)
+        self.plugin.getDmgDevices('32')
+        devices = self.plugin.devices + [device(7, '32')]
+        self.plugin.devices = devices
+        self.plugin.updateDevices(devices)
+        self.assertEqual(self.plugin.managerRFP.refreshed[0][0], devices)
+        self.assertEqual(self.plugin.managerRFP.refreshed[0][1]['id'], 7)    # Index rebuilt before manager refresh
+        self.assertEqual([d['id'] for d in self.plugin.getDmgDevices('32')], [1, 2, 7])
+
+if __name__ == "__main__":
+    unittest.main()
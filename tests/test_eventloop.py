@@ -0,0 +1,208 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of RFPlayer clients event loop, serial ports replaced by pipes
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import os
+import time
+import logging
+import threading
+import unittest
+
+import serial
+
+from domogik_packages.plugin_rfplayer.lib.eventloop import Waker, RFPEventLoop
+from domogik_packages.plugin_rfplayer.lib.rfp1000 import SerialRFP1000
+
+class FakePlugin(object):
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self.threads = []
+
+    def get_stop(self):
+        return self._stop
+
+    def register_thread(self, thread):
+        self.threads.append(thread)
+
+class FakeManager(object):
+
+    def __init__(self):
+        self.log = logging.getLogger('rfplayer_test')
+        self._plugin = FakePlugin()
+
+    def publishRFPlayerMsg(self, rfPLayer, category='rfplayer.client.state', data={}):
+        pass
+
+class PipePort(object):
+    """ Serial port of a fake client, read end of a pipe"""
+
+    def __init__(self):
+        self.read, self.write = os.pipe()
+
+    def fileno(self):
+        return self.read
+
+    def close(self):
+        for fd in (self.read, self.write) :
+            try :
+                os.close(fd)
+            except OSError :
+                pass
+
+class FakeClient(object):
+    """ Client with the interface used by event loop, record calls"""
+
+    RFP_device = '/dev/fake'
+
+    def __init__(self):
+        self.rfPlayer = PipePort()
+        self._eventLoop = None
+        self._pendingRequests = {}
+        self.deadline = None
+        self.data = []
+        self.lost = 0
+        self.writes = 0
+
+    def nextDeadline(self):
+        return self.deadline
+
+    def _read_RFP_data(self):
+        self.data.append(os.read(self.rfPlayer.read, 4096))
+
+    def _process_write_queue(self):
+        self.writes += 1
+
+    def _process_received_queue(self):
+        pass
+
+    def connection_lost(self):
+        self.lost += 1
+        self._eventLoop.removeClient(self)
+
+def waitFor(check, timeOut=2):
+    """ Wait until check() is True, return its last value"""
+    end = time.time() + timeOut
+    while not check() and time.time() < end : time.sleep(0.01)
+    return check()
+
+class WakerTestCase(unittest.TestCase):
+
+    def test_wait_timeout(self):
+        waker = Waker()
+        start = time.time()
+        self.assertFalse(waker.wait(0.1))
+        self.assertTrue(time.time() - start >= 0.09)
+
+    def test_set_wake_waiter(self):
+        waker = Waker()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(waker.wait(5)))
+        thread.start()
+        time.sleep(0.05)
+        start = time.time()
+        waker.set()
+        thread.join()
+        self.assertEqual(results, [True])
+        self.assertTrue(time.time() - start < 1)
+        waker.clear()
+        self.assertFalse(waker.isSet())
+        self.assertFalse(waker.wait(0))
+
+class RFPEventLoopTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = FakeManager()
+        self.loop = RFPEventLoop(self.manager)
+        self.loop.start()
+        self.client = FakeClient()
+
+    def tearDown(self):
+        self.manager._plugin._stop.set()
+        self.loop.wakeup()
+        self.loop._thread.join(2)
+        self.client.rfPlayer.close()
+
+    def test_client_read(self):
+        self.loop.addClient(self.client)
+        self.assertTrue(self.client._eventLoop is self.loop)
+        os.write(self.client.rfPlayer.write, b'ZIA33{}\r')
+        self.assertTrue(waitFor(lambda: self.client.data == [b'ZIA33{}\r']))
+        self.assertTrue(self.client.writes > 0)      # Write queue processed at each wake-up
+        self.loop.removeClient(self.client)
+        self.assertTrue(waitFor(lambda: self.loop.getStats()['clients'] == 0))
+        os.write(self.client.rfPlayer.write, b'ZIA33{}\r')
+        time.sleep(0.1)
+        self.assertEqual(len(self.client.data), 1)
+
+    def test_port_error(self):
+        self.loop.addClient(self.client)
+        self.assertTrue(waitFor(lambda: self.loop.getStats()['clients'] == 1))
+        os.close(self.client.rfPlayer.write)     # Hang up without data
+        self.assertTrue(waitFor(lambda: self.client.lost == 1))
+        self.assertTrue(waitFor(lambda: self.loop.getStats()['clients'] == 0))
+
+    def test_call_later(self):
+        calls = []
+        start = time.time()
+        self.loop.callLater(0.1, lambda: calls.append(time.time() - start))
+        timer = self.loop.callLater(0.05, lambda: calls.append('repeat'), 0.05)
+        self.loop.cancelTimer(self.loop.callLater(0.05, lambda: calls.append('cancelled')))
+        self.assertTrue(waitFor(lambda: calls.count('repeat') >= 3))
+        self.loop.cancelTimer(timer)
+        self.assertTrue(waitFor(lambda: any(type(c) == float for c in calls)))
+        self.assertTrue([c for c in calls if type(c) == float][0] >= 0.09)
+        self.assertFalse('cancelled' in calls)
+
+    def test_next_timeout(self):
+        loop = RFPEventLoop(FakeManager())
+        self.assertEqual(loop._nextTimeout(), None)         # Nothing to wait : no timeout
+        loop._clients[0] = self.client
+        self.client.deadline = time.time() + 10
+        self.assertTrue(9 < loop._nextTimeout() <= 10)
+        loop.callLater(1, lambda: None)
+        self.assertTrue(0.9 < loop._nextTimeout() <= 1)
+        self.client.deadline = time.time() - 1
+        self.assertEqual(loop._nextTimeout(), 0)
+
+    def test_stop(self):
+        self.manager._plugin._stop.set()
+        self.loop.wakeup()
+        self.loop._thread.join(2)
+        self.assertFalse(self.loop.isRunning)
+
+class LostPort(object):
+    """ Serial port unplugged, write fails"""
+
+    def write(self, data):
+        raise serial.SerialException("device disconnected")
+
+    def fileno(self):
+        return -1
+
+    def close(self):
+        pass
+
+class EventLoopWriteTestCase(unittest.TestCase):
+
+    def test_command_kept_at_port_lost(self):
+        manager = FakeManager()
+        client = SerialRFP1000(manager, '/dev/rfp_not_found', lambda client, data: None, tx_scheduler=False)
+        client.RECONNECT_DELAY = 60
+        client.rfPlayer = LostPort()
+        client.send_to_RFP('ON A1 X10')
+        client.send_to_RFP('ON A2 X10')
+        client._process_write_queue()
+        try :
+            self.assertEqual(client.getState()['state'], 'reconnecting')
+            self.assertEqual([client.write_RFP.get_nowait()['data'] for i in range(2)], ['ZIA++ ON A1 X10', 'ZIA++ ON A2 X10'])
+        finally :
+            client.close()
+            manager._plugin._stop.set()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of serial data framing
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.framing import FrameReader
+
+class FakePort(object):
+    """ Serial port returning data blocks, in_waiting like pyserial"""
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def in_waiting(self):
+        return len(self.data)
+
+    def read(self, size=1):
+        data, self.data = self.data[:size], self.data[size:]
+        return data
+
+def frames(reader):
+    return [frame.tobytes() for frame in reader.frames()]
+
+class FrameReaderTestCase(unittest.TestCase):
+
+    def test_frames_of_a_block(self):
+        reader = FrameReader()
+        reader.feed(b"ZIA--PONG\r\nZIA33{'frame':{}}\r\n\r\n")
+        self.assertEqual(frames(reader), [b"ZIA--PONG", b"ZIA33{'frame':{}}"])
+        self.assertEqual(reader.getStats()['frames'], 2)
+
+    def test_frame_split_between_reads(self):
+        reader = FrameReader()
+        reader.feed(b"\nZIA--Welcome")
+        self.assertEqual(frames(reader), [])
+        reader.feed(b" to Ziblue\r\nZIA")
+        self.assertEqual(frames(reader), [b"ZIA--Welcome to Ziblue"])
+        reader.feed(b"--PONG\r")
+        self.assertEqual(frames(reader), [b"ZIA--PONG"])
+
+    def test_buffer_grow_and_compact(self):
+        reader = FrameReader(16)
+        for i in range(20) : reader.feed(b"ZIA--%02d\r" % i)
+        self.assertEqual(len(frames(reader)), 20)
+        reader.feed(b"ZIA--" + b"x" * 40)
+        reader.feed(b"\r")
+        self.assertEqual(frames(reader), [b"ZIA--" + b"x" * 40])
+        self.assertTrue(reader.getStats()['buffer'] >= 45)
+
+    def test_too_big_data_dropped(self):
+        reader = FrameReader(16, 32)
+        reader.feed(b"y" * 20)
+        reader.feed(b"y" * 20)      # No end of frame over 32 bytes, data is dropped
+        self.assertEqual(reader.getStats()['dropped'], 1)
+        reader.feed(b"y" * 40)
+        self.assertEqual(reader.getStats()['dropped'], 2)
+        reader.feed(b"ZIA--PONG\r")
+        self.assertEqual(frames(reader), [b"ZIA--PONG"])
+
+    def test_read_port(self):
+        reader = FrameReader()
+        port = FakePort(b"ZIA--PONG\rZIA--PO")
+        self.assertEqual([f.tobytes() for f in reader.read(port)], [b"ZIA--PONG"])
+        self.assertEqual(port.data, b"")
+        port.data = b"NG\r"
+        self.assertEqual([f.tobytes() for f in reader.read(port)], [b"ZIA--PONG"])
+        self.assertEqual(reader.read(port), [])
+
+    def test_reset(self):
+        reader = FrameReader()
+        reader.feed(b"garbage")
+        reader.reset()
+        reader.feed(b"ZIA--PONG\r")
+        self.assertEqual(frames(reader), [b"ZIA--PONG"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of bulk commands compressed to group commands (ALL_ON / ALL_OFF)
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import logging
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.infotypes import getGroupKey
+from domogik_packages.plugin_rfplayer.lib.rfplayer import RFPManager
+
+class FakeClient(object):
+    """ RFPlayer client recording commands sent"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_to_RFP(self, command, response=False, callback=None, timeOut=5, first=False):
+        self.sent.append(command)
+
+class FakePlugin(object):
+    """ Plugin with domogik devices list"""
+
+    def __init__(self, devices):
+        self.log = logging.getLogger('rfplayer_test')
+        self.devices = devices
+
+def device(n, protocol='4', address=None):
+    return {'id': n, 'name': u"L{0}".format(n), 'device_type_id': 'rfplayer.{0}.switch'.format(protocol),
+            'parameters': {'dongle_id': {'value': 'rfp'}, 'device': {'value': address if address is not None else str(32 + n)}},
+            'commands': {'switch': {'id': 100 + n}, 'switch_all': {'id': 200 + n}}}
+
+class GroupKeyTestCase(unittest.TestCase):
+
+    def test_group_key(self):
+        self.assertEqual(getGroupKey("4", "32"), getGroupKey("4", "47"))
+        self.assertNotEqual(getGroupKey("4", "47"), getGroupKey("4", "48"))
+        self.assertEqual(getGroupKey("1", "A1"), getGroupKey("1", "a16"))
+        self.assertNotEqual(getGroupKey("1", "A1"), getGroupKey("1", "B1"))
+        self.assertEqual(getGroupKey("3", "32"), None)      # BLYSS has no ALL command
+        self.assertEqual(getGroupKey("5", "32"), None)
+
+class SendRFPcmdsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.devices = [device(n) for n in range(16)]    # CHACON ids 32 to 47 : one group
+        self.client = FakeClient()
+        self.manager = RFPManager.__new__(RFPManager)
+        self.manager._plugin = FakePlugin(self.devices)
+        self.manager.rfpClients = {'rfp.1': self.client}
+
+    def test_complete_group(self):
+        results = self.manager.sendRFPcmds([(d, 100 + d['id'], {'value': '1'}) for d in self.devices])
+        self.assertEqual(self.client.sent, ['ALL_ON 32 CHACON'])
+        self.assertTrue(all(status for status, reason in results))
+        self.assertEqual(results[0][1], u"Sent in group command ALL_ON 32 CHACON")
+
+    def test_incomplete_group(self):
+        results = self.manager.sendRFPcmds([(d, 100 + d['id'], {'value': '0'}) for d in self.devices[:3]])
+        self.assertEqual(self.client.sent, ['OFF 32 CHACON', 'OFF 33 CHACON', 'OFF 34 CHACON'])
+        self.assertEqual(results, [(True, None)] * 3)
+
+    def test_mixed_values_and_errors(self):
+        commands = [(d, 100 + d['id'], {'value': '1' if d['id'] else '0'}) for d in self.devices]
+        commands.insert(1, (self.devices[1], 999, {'value': '1'}))
+        results = self.manager.sendRFPcmds(commands)
+        self.assertEqual(self.client.sent[0], 'OFF 32 CHACON')
+        self.assertEqual(len(self.client.sent), 16)         # Device 32 missing in ON group
+        self.assertFalse(results[1][0])
+        self.assertEqual(len(results), 17)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of HEXA frames decoder against frames received in JSON from a RFP1000 (x10_protocol_data.json)
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import os
+import json
+import unittest
+from binascii import hexlify
+
+from domogik_packages.plugin_rfplayer.lib.hexframes import FRAME_STRUCTS, decode_HEX_frame
+from domogik_packages.plugin_rfplayer.lib.infotypes import getInfoType
+
+def loadJSONFrames():
+    """ Return RF frames of test data, decoded like SerialRFPlayer.decode_JSON"""
+    frames = []
+    def search(item):
+        if type(item) == dict :
+            if unicode(item.get('data', "")).startswith("ZIA33") :
+                frames.append(json.loads(item['data'][5:].replace("'", '"')))
+            for value in item.values() : search(value)
+        elif type(item) == list :
+            for value in item : search(value)
+    search(json.load(open(os.path.join(os.path.dirname(os.path.realpath(__file__)), "x10_protocol_data.json"))))
+    return frames
+
+def encodeHEX(frame):
+    """ Return HEXA frame with same header and sensor measures than a JSON frame"""
+    header, infos = frame['frame']['header'], frame['frame']['infos']
+    iType = int(header['infoType'])
+    mes = dict((m['type'], m['value']) for m in infos['measures'])
+    values = [int(header['frameType']), int(header.get('cluster', 0)), int(header['dataFlag']), int(header['rfLevel']),
+              int(header['floorNoise']), int(header['rfQuality']), int(header['protocol']), iType,
+              int(infos['subType']), int(infos['id_PHY'], 16), int(infos['adr_channel']), int(infos['qualifier'])]
+    if iType in (4, 5) :
+        values += [int(round(float(mes['temperature']) * 10)), int(mes['hygrometry'])]
+        if iType == 5 : values.append(int(mes['pressure']))
+    elif iType == 6 :
+        values += [int(round(float(mes['wind speed']) * 10)), int(mes['direction'])]
+    elif iType == 7 :
+        values.append(int(mes['uv']))
+    elif iType == 9 :
+        total = int(round(float(mes['total rain']) * 10))
+        values += [total & 0xFFFF, total >> 16, int(round(float(mes['current rain']) * 100))]
+    return hexlify(FRAME_STRUCTS[iType][0].pack(*values)).upper()
+
+class HexFramesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = loadJSONFrames()
+
+    def test_same_frames_than_JSON(self):
+        self.assertEqual(len(self.frames), 6)
+        for frame in self.frames :
+            decoded = decode_HEX_frame(encodeHEX(frame))['frame']
+            header, infos = frame['frame']['header'], frame['frame']['infos']
+            for key in header :
+                self.assertEqual(decoded['header'][key], header[key], key)
+            self.assertEqual(sorted(decoded['infos']), sorted(infos))
+            for key in infos :
+                # lowBatt of test data is not always bit 0 of qualifier, HEXA decoder use the qualifier.
+                if key != 'lowBatt' : self.assertEqual(decoded['infos'][key], infos[key], key)
+            self.assertEqual(decoded['infos']['lowBatt'], str(int(infos['qualifier']) & 1))
+
+    def test_rain_sensors(self):
+        frame = [f for f in self.frames if f['frame']['header']['infoType'] == '9'][0]
+        decoded = decode_HEX_frame(encodeHEX(frame))
+        iType = getInfoType(decoded['frame'])
+        current = {'name': 'current rain', 'data_type': 'DT_mMeterHour', 'reference': 'rain'}
+        total = {'name': 'total rain', 'data_type': 'DT_mMeter', 'reference': 'total_rain'}
+        self.assertEqual(iType.get_RFP_data_to_sensor(current), 8.05)
+        self.assertEqual(iType.get_RFP_data_to_sensor(total), 1040.1)
+
+    def test_fixed_size_and_short_frames(self):
+        hexData = encodeHEX(self.frames[1])
+        self.assertEqual(decode_HEX_frame(hexData + "0000" * 4), decode_HEX_frame(hexData))
+        self.assertEqual(decode_HEX_frame(hexData[:-4]), {})
+        self.assertEqual(decode_HEX_frame(hexData[:14]), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of sensors values of a frame or a batch published in one client.sensor MQ message
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import logging
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.rfplayer import RFPManager
+
+try :
+    from domogik.common.plugin import Plugin
+except ImportError :
+    Plugin = None   # Plugin module needs domogik
+
+TEMP = {'id': 1, 'data_type': 'DT_Temp'}
+HUMIDITY = {'id': 2, 'data_type': 'DT_Humidity'}
+BATTERY = {'id': 3, 'data_type': 'DT_Switch'}
+
+class FakePub(object):
+    """ MQ publisher recording events"""
+
+    def __init__(self):
+        self.events = []
+
+    def send_event(self, category, content):
+        self.events.append((category, content))
+
+class PublishSensorsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sent = []
+        self.messages = []
+        self.manager = RFPManager.__new__(RFPManager)
+        self.manager._send_sensor = lambda device, sensorId, dataType, value: self.sent.append((sensorId, dataType, value))
+        self.manager._send_sensors = self.messages.append
+        self.manager.sensorsPublished = {'messages': 0, 'values': 0}
+
+    def test_one_message(self):
+        self.manager._publish_sensors([('th', TEMP, 19.5), ('th', HUMIDITY, 45), ('th', BATTERY, 0)])
+        self.assertEqual(self.messages, [{1: 19.5, 2: 45, 3: 0}])
+        self.assertEqual(self.manager.sensorsPublished, {'messages': 1, 'values': 3})
+
+    def test_sensor_again_in_batch(self):
+        self.manager._publish_sensors([('th', TEMP, 19.5), ('th', HUMIDITY, 45), ('th', TEMP, 19.6), ('th', HUMIDITY, 46),
+                                       ('th', BATTERY, 1)])
+        self.assertEqual(self.messages, [{1: 19.5, 2: 45}, {1: 19.6, 2: 46, 3: 1}])     # Each value kept, in order
+        self.assertEqual(self.manager.sensorsPublished, {'messages': 2, 'values': 5})
+
+    def test_nothing_to_publish(self):
+        self.manager._publish_sensors([])
+        self.assertEqual(self.messages, [])
+        self.assertEqual(self.manager.sensorsPublished, {'messages': 0, 'values': 0})
+
+    def test_without_send_sensors(self):
+        self.manager._send_sensors = None
+        self.manager._publish_sensors([('th', TEMP, 19.5), ('th', HUMIDITY, 45)])
+        self.assertEqual(self.sent, [(1, 'DT_Temp', 19.5), (2, 'DT_Humidity', 45)])
+        self.assertEqual(self.manager.sensorsPublished, {'messages': 2, 'values': 2})
+
+@unittest.skipIf(Plugin is None, "domogik is not installed")
+class SendSensorsTestCase(unittest.TestCase):
+
+    def test_send_sensors(self):
+        from domogik_packages.plugin_rfplayer.bin.rfplayer import RFPlayer
+        plugin = RFPlayer.__new__(RFPlayer)
+        plugin.log = logging.getLogger('rfplayer_test')
+        plugin._pub = FakePub()
+        manager = RFPManager.__new__(RFPManager)
+        manager._send_sensor = plugin.send_sensor
+        manager._send_sensors = plugin.send_sensors
+        manager.sensorsPublished = {'messages': 0, 'values': 0}
+        manager._publish_sensors([('th', TEMP, 19.5), ('th', HUMIDITY, 45)])
+        self.assertEqual(plugin._pub.events, [('client.sensor', {1: 19.5, 2: 45})])
+        plugin.send_sensor('th', 3, 'DT_Switch', 1)
+        self.assertEqual(plugin._pub.events[-1], ('client.sensor', {3: 1}))
+
+if __name__ == "__main__":
+    unittest.main()
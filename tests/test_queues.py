@@ -0,0 +1,110 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of bounded queues and their overload policies
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.queues import RFPQueue, DROP_OLDEST, DROP_NEWEST, COALESCE, Fence, frameKey, commandKey
+
+def frame(adr, value):
+    return {'timestamp': 0, 'msg': {'frame': {'header': {'protocol': '5', 'infoType': '4'},
+                                              'infos': {'subType': '0', 'id_PHY': '0xFA28', 'adr_channel': adr, 'value': value}}}}
+
+def command(cmd, request=None):
+    return {'data': cmd, 'response': request is not None, 'ackFor': {'reqNum': 1} if request else {}, 'request': request}
+
+class RFPQueueTestCase(unittest.TestCase):
+
+    def test_drop_oldest(self):
+        queue = RFPQueue(2, DROP_OLDEST)
+        for i in range(4) : queue.put_nowait(i)
+        self.assertEqual([queue.get_nowait(), queue.get_nowait()], [2, 3])
+        self.assertEqual(queue.getStats()['dropped'], 2)
+
+    def test_drop_newest(self):
+        queue = RFPQueue(2, DROP_NEWEST)
+        for i in range(4) : queue.put_nowait(i)
+        self.assertEqual([queue.get_nowait(), queue.get_nowait()], [0, 1])
+
+    def test_coalesce_only_when_full(self):
+        queue = RFPQueue(3, COALESCE, frameKey)
+        queue.put_nowait(frame('1', 'a'))
+        queue.put_nowait(frame('1', 'b'))
+        self.assertEqual(queue.qsize(), 2)
+        queue.put_nowait(frame('2', 'c'))
+        queue.put_nowait(frame('1', 'd'))   # Full : replace last frame of device 1
+        self.assertEqual([queue.get_nowait()['msg']['frame']['infos']['value'] for i in range(3)], ['a', 'd', 'c'])
+        self.assertEqual(queue.getStats()['coalesced'], 1)
+
+    def test_supersede(self):
+        queue = RFPQueue(0, DROP_OLDEST, commandKey, True)
+        queue.put_nowait(command('ZIA++ DIM A1 X10 %10'))
+        queue.put_nowait(command('ZIA++ ON A2 X10'))
+        queue.put_nowait(command('ZIA++ DIM A1 X10 %50'))
+        self.assertEqual([queue.get_nowait()['data'] for i in range(2)], ['ZIA++ DIM A1 X10 %50', 'ZIA++ ON A2 X10'])
+
+    def test_relative_commands_not_superseded(self):
+        queue = RFPQueue(0, DROP_OLDEST, commandKey, True)
+        queue.put_nowait(command('ZIA++ DIM A1 X10 %10'))
+        queue.put_nowait(command('ZIA++ BRIGHT A1 X10'))
+        queue.put_nowait(command('ZIA++ BRIGHT A1 X10'))
+        queue.put_nowait(command('ZIA++ DIM A1 X10 %50'))    # Applied after BRIGHT, DIM %10 is kept
+        queue.put_nowait(command('ZIA++ DIM A1 X10 %60'))
+        self.assertEqual([queue.get_nowait()['data'] for i in range(4)],
+                         ['ZIA++ DIM A1 X10 %10', 'ZIA++ BRIGHT A1 X10', 'ZIA++ BRIGHT A1 X10', 'ZIA++ DIM A1 X10 %60'])
+
+    def test_protected_records_never_dropped(self):
+        queue = RFPQueue(2, DROP_OLDEST, commandKey, True)
+        queue.put_nowait(command('ZIA++1 STATUS JSON', request=object()))
+        queue.put_nowait(None)
+        queue.put_nowait(command('ZIA++ ON A1 X10'))     # Only protected records waiting : new command is dropped
+        self.assertEqual(queue.qsize(), 2)
+        self.assertEqual(queue.get_nowait()['data'], 'ZIA++1 STATUS JSON')
+        self.assertTrue(queue.get_nowait() is None)
+        queue = RFPQueue(1, DROP_NEWEST)
+        queue.put_nowait(1)
+        queue.put_nowait({'msg': {'data': 'OK'}, 'ackFor': {'reqNum': 2}})
+        queue.put_nowait(None)
+        self.assertEqual(queue.qsize(), 3)
+
+    def test_put_first(self):
+        queue = RFPQueue(2, DROP_OLDEST, commandKey, True)
+        queue.put_nowait(command('ZIA++ ON A1 X10'))
+        queue.put_nowait(command('ZIA++ ON A2 X10'))
+        queue.put_first(command('ZIA++ FORMAT JSON'))
+        queue.put_first(command('ZIA++ STATUS JSON'))
+        queue.put_back(command('ZIA++ ON A3 X10'))
+        queue.put_nowait(command('ZIA++ ON A4 X10'))     # Full : oldest command not put first is dropped
+        self.assertEqual([queue.get_nowait()['data'] for i in range(5)],
+                         ['ZIA++ FORMAT JSON', 'ZIA++ STATUS JSON', 'ZIA++ ON A1 X10', 'ZIA++ ON A2 X10', 'ZIA++ ON A4 X10'])
+
+    def test_get_batch(self):
+        queue = RFPQueue()
+        for i in range(5) : queue.put_nowait(i)
+        self.assertEqual(queue.getBatch(3), [0, 1, 2])
+        self.assertEqual(queue.getBatch(10), [3, 4])
+
+class KeysTestCase(unittest.TestCase):
+
+    def test_frame_key(self):
+        self.assertEqual(frameKey(frame('1', 'a')), frameKey(frame('1', 'b')))
+        self.assertNotEqual(frameKey(frame('1', 'a')), frameKey(frame('2', 'a')))
+        self.assertEqual(frameKey({'msg': {'data': 'OK'}}), None)
+        self.assertEqual(frameKey(None), None)
+
+    def test_command_key(self):
+        self.assertEqual(commandKey(command('ZIA++ ON A1 X10')), ('X10', 'A1', 'switch'))
+        self.assertEqual(commandKey(command('ZIA++ ON A1 X10')), commandKey(command('ZIA++ OFF A1 X10')))
+        self.assertEqual(commandKey(command('ZIA++ ALL_OFF A X10')), ('X10', 'A', 'switch_all'))
+        self.assertNotEqual(commandKey(command('ZIA++ DIM A1 X10 %50')), commandKey(command('ZIA++ ON A1 X10')))
+        self.assertTrue(isinstance(commandKey(command('ZIA++ BRIGHT A1 X10')), Fence))
+        self.assertEqual(commandKey(command('ZIA++1 STATUS JSON', request=object())), None)
+        self.assertEqual(commandKey(command('ZIA++ PING')), None)
+        self.assertEqual(commandKey(None), None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of serial port lost and reopened, commands queued during outage replayed,
+      with a fake dongle on a pseudo terminal plugged and unplugged through a symbolic link.
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import os
+import tty
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.rfp1000 import SerialRFP1000
+
+class FakeDongle(object):
+    """ RFP1000 on master side of a pseudo terminal, answers HELLO and records commands"""
+
+    def __init__(self, link):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.link = link
+        os.symlink(os.ttyname(self.slave), link)
+        self.received = []
+        self._running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        data = b''
+        while self._running :
+            try :
+                data += os.read(self.master, 4096)
+            except OSError :
+                break
+            while b'\r' in data :
+                line, data = data.split(b'\r', 1)
+                line = line.decode('latin-1')
+                self.received.append(line)
+                if line == 'ZIA++HELLO' :
+                    os.write(self.master, b"ZIA--Welcome to Ziblue Dongle RFPLAYER (RFP1000, Firmware V1.12 Mac 0xF6C09FDD)!\n\r")
+
+    def unplug(self):
+        self._running = False
+        os.unlink(self.link)
+        os.close(self.master)
+        os.close(self.slave)
+
+class FakePlugin(object):
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self.threads = []
+
+    def get_stop(self):
+        return self._stop
+
+    def register_thread(self, thread):
+        self.threads.append(thread)
+
+class FakeManager(object):
+
+    def __init__(self):
+        self.log = logging.getLogger('rfplayer_test')
+        self._plugin = FakePlugin()
+        self.states = []
+
+    def publishRFPlayerMsg(self, rfPLayer, category='rfplayer.client.state', data={}):
+        self.states.append(rfPLayer._state)
+
+def waitFor(check, timeOut=5):
+    """ Wait until check() is True, return its last value"""
+    end = time.time() + timeOut
+    while not check() and time.time() < end : time.sleep(0.01)
+    return check()
+
+class ReconnectTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.link = os.path.join(self.tmpDir, 'rfplayer')
+        self.dongle = FakeDongle(self.link)
+        self.manager = FakeManager()
+        self.client = SerialRFP1000(self.manager, self.link, lambda client, data: None, tx_scheduler=False, dedup_windows=None)
+        self.client.RECONNECT_DELAY = 0.05
+        self.assertTrue(self.client.open())
+        self.assertTrue(waitFor(lambda: any(l.endswith('STATUS JSON') for l in self.dongle.received)))
+
+    def tearDown(self):
+        self.manager._plugin._stop.set()
+        self.client.close()
+        self.client.wakeup_services()
+        for thread in self.manager._plugin.threads : thread.join(2)
+        if os.path.lexists(self.link) : self.dongle.unplug()
+        shutil.rmtree(self.tmpDir)
+
+    def test_reconnect_replay(self):
+        self.dongle.unplug()
+        self.client.connection_lost()
+        self.assertEqual(self.client.getState()['state'], 'reconnecting')
+        self.client.send_to_RFP('ON A1 X10')
+        self.client.send_to_RFP('ON A2 X10')
+        expired = self.client.send_to_RFP('STATUS JSON', True, timeOut=0.1)
+        time.sleep(0.3)         # Several reopening attempts fail, request expires
+        self.assertFalse(self.client.isOpen)
+        self.dongle = FakeDongle(self.link)
+        self.assertTrue(waitFor(lambda: 'ZIA++ ON A2 X10' in self.dongle.received))
+        commands = [l for l in self.dongle.received if l != 'ZIA++HELLO']
+        self.assertEqual(commands[0], 'ZIA++ FORMAT JSON')     # Format and status sent before replayed commands
+        self.assertTrue(commands[1].endswith('STATUS JSON'))
+        self.assertEqual(commands[2:], ['ZIA++ ON A1 X10', 'ZIA++ ON A2 X10'])
+        self.assertTrue(expired.done)
+        self.assertEqual(expired.response, None)
+        stats = self.client.getInfos()['stats']['reconnect']
+        self.assertEqual((stats['lost'], stats['recovered'], stats['replayed'], stats['expired']), (1, 1, 2, 1))
+        self.assertTrue(stats['attempts'] > 1)
+        self.assertEqual(self.client.getState()['state'], 'alive')
+
+    def test_close_during_outage(self):
+        self.dongle.unplug()
+        self.client.connection_lost()
+        self.client.close()
+        self.assertEqual(self.client.getState()['state'], 'stopped')
+        reconnect = [t for t in self.manager._plugin.threads if t.name == 'Reconnect_RFP']
+        reconnect[0].join(2)
+        self.assertFalse(reconnect[0].is_alive())
+        self.dongle = FakeDongle(self.link)
+        time.sleep(0.2)
+        self.assertFalse(self.client.isOpen)
+
+    def test_no_reconnect(self):
+        self.client.reconnect = False
+        self.dongle.unplug()
+        self.client.connection_lost()
+        self.assertFalse(self.client.isOpen)
+        self.assertEqual(self.client.getState()['state'], 'stopped')
+        self.assertFalse('Reconnect_RFP' in [t.name for t in self.manager._plugin.threads])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of requests/responses correlation on reqNum by the listener
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import time
+import logging
+import threading
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.serial_rfplayer import RFPRequest
+from domogik_packages.plugin_rfplayer.lib.rfp1000 import SerialRFP1000
+
+class FakePlugin(object):
+
+    def __init__(self):
+        self._stop = threading.Event()
+
+    def get_stop(self):
+        return self._stop
+
+class FakeManager(object):
+
+    def __init__(self):
+        self.log = logging.getLogger('rfplayer_test')
+        self._plugin = FakePlugin()
+
+    def publishRFPlayerMsg(self, rfPLayer, category='rfplayer.client.state', data={}):
+        pass
+
+class WritePort(object):
+    """ Serial port recording data written"""
+
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    def close(self):
+        pass
+
+def response(reqNum, value):
+    """ Return a RFP1000 JSON response frame as read from serial port"""
+    return memoryview(u'ZIA--{{"echo": {{"reqNum": "{0}", "value": "{1}"}}}}'.format(reqNum, value).encode('latin-1'))
+
+class RequestsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = FakeManager()
+        self.client = SerialRFP1000(self.manager, '/dev/rfp_test', lambda client, data: None, tx_scheduler=False, dedup_windows=None)
+        self.client.rfPlayer = WritePort()
+
+    def tearDown(self):
+        self.manager._plugin._stop.set()
+
+    def send(self, command, timeOut=5):
+        request = self.client.send_to_RFP(command, True, None, timeOut)
+        self.client._process_write_queue()
+        return request
+
+    def received(self):
+        data = []
+        while not self.client.RFP_received.empty() : data.append(self.client.RFP_received.get_nowait())
+        return data
+
+    def test_out_of_order(self):
+        first, second = self.send('ECHO first'), self.send('ECHO second')
+        self.assertEqual(self.client.rfPlayer.written, [b'ZIA++1 ECHO first\r', b'ZIA++2 ECHO second\r'])
+        self.assertEqual(sorted(self.client._pendingRequests), [1, 2])
+        self.client._receive_RFP_frame(response(2, 'second'), time.time())
+        self.assertTrue(second.done)
+        self.assertFalse(first.done)
+        self.client._receive_RFP_frame(response(1, 'first'), time.time())
+        self.assertTrue(self.client.wait_RFP_response(first, 0))
+        self.assertEqual([r.response['echo']['value'] for r in (first, second)], ['first', 'second'])
+        self.assertEqual([d['ackFor']['command'] for d in self.received()], ['ECHO second', 'ECHO first'])
+        self.assertEqual(self.client._pendingRequests, {})
+
+    def test_not_waited_response(self):
+        request = self.send('ECHO first')
+        self.client._receive_RFP_frame(response(7, 'other'), time.time())
+        self.assertFalse(request.done)
+        self.assertEqual(list(self.client._pendingRequests), [1])
+        self.assertFalse('ackFor' in self.received()[0])     # Queued as an unsolicited response
+
+    def test_response_without_reqnum(self):
+        request = self.client._expect_RFP_response({'command': 'UPDATE FIRMWARE', 'reqNum': 0, 'callback': None})
+        self.send('ECHO first')
+        self.client._receive_RFP_frame(memoryview(b'ZIA--Firmware update OK'), time.time())
+        self.assertTrue(request.done)
+        self.assertEqual(request.response, 'Firmware update OK')
+        self.assertEqual(list(self.client._pendingRequests), [1])
+
+    def test_timeout(self):
+        request = self.send('ECHO silent', 0.05)
+        late = self.send('ECHO late', 5)
+        self.assertTrue(0 < self.client.nextDeadline() - time.time() <= 0.05)
+        self.assertFalse(self.client.wait_RFP_response(request, 0.01))
+        self.assertFalse(1 in self.client._pendingRequests)      # Removed by waiter on timeout
+        request = self.send('ECHO silent', 0.01)
+        time.sleep(0.02)
+        self.client._expire_RFP_requests()
+        self.assertTrue(request.done)
+        self.assertEqual(request.response, None)
+        self.assertEqual(list(self.client._pendingRequests), [late.reqNum])
+        self.client._receive_RFP_frame(response(request.reqNum, 'silent'), time.time())    # Response after expiration is not matched
+        self.assertFalse('ackFor' in self.received()[0])
+
+    def test_request_wait(self):
+        request = RFPRequest({'command': 'STATUS', 'reqNum': 1, 'callback': None}, 5)
+        threading.Timer(0.05, request.setResponse, ({'type': '33'},)).start()
+        self.assertTrue(request.wait())
+        self.assertEqual(request.response, {'type': '33'})
+        self.assertFalse(RFPRequest({'command': 'STATUS', 'reqNum': 2, 'callback': None}, 0.01).wait())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of sensors values publish filter
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.sensorfilter import SensorFilter, parseRules
+
+TEMP = {'id': 1, 'data_type': 'DT_Temp'}
+POWER = {'id': 2, 'data_type': 'DT_Power'}
+SWITCH = {'id': 3, 'data_type': 'DT_Switch'}
+
+class ParseRulesTestCase(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual(parseRules("DT_Temp:0.1, 1234:0.5,bad:x"), {'DT_Temp': 0.1, 1234: 0.5})
+        self.assertEqual(parseRules("60,DT_Power:15", 60), {'default': 3600.0, 'DT_Power': 900.0})
+        self.assertEqual(parseRules(""), {})
+        self.assertEqual(parseRules(None), {})
+
+class SensorFilterTestCase(unittest.TestCase):
+
+    def test_deadband(self):
+        sFilter = SensorFilter({'DT_Temp': 0.1}, {}, {})
+        self.assertEqual([sFilter.accept(TEMP, v, t) for t, v in enumerate((19.2, 19.25, 19.3, 19.35, 19.1))],
+                         [True, False, True, False, True])     # 19.3 - 19.2 is 0.1 with float error
+
+    def test_min_interval(self):
+        sFilter = SensorFilter({}, {'DT_Power': 30}, {})
+        self.assertEqual([sFilter.accept(POWER, v, t) for t, v in ((0, 100), (10, 200), (30, 300), (40, 300))],
+                         [True, False, True, False])
+
+    def test_held_during_min_interval(self):
+        sFilter = SensorFilter({'DT_Power': 5}, {'DT_Power': 30}, {})
+        self.assertTrue(sFilter.accept(POWER, 100, 0, 'owl'))
+        self.assertFalse(sFilter.accept(POWER, 200, 10, 'owl'))     # Changed in interval : held
+        self.assertFalse(sFilter.accept(POWER, 250, 20, 'owl'))     # Latest value replaces held one
+        self.assertEqual(sFilter.flush(25), [])
+        self.assertEqual(sFilter.getStats()['held'], 1)
+        self.assertEqual(sFilter.flush(30), [('owl', POWER, 250)])
+        self.assertEqual(sFilter.flush(40), [])
+        self.assertFalse(sFilter.accept(POWER, 252, 70))            # Compared with value released
+        self.assertEqual(sFilter.getStats()['released'], 1)
+
+    def test_held_dropped(self):
+        sFilter = SensorFilter({'DT_Power': 5}, {'DT_Power': 30}, {})
+        sFilter.accept(POWER, 100, 0)
+        self.assertFalse(sFilter.accept(POWER, 200, 10))
+        self.assertFalse(sFilter.accept(POWER, 102, 20))            # Back to published value : nothing to publish
+        self.assertEqual(sFilter.flush(30), [])
+        self.assertFalse(sFilter.accept(POWER, 200, 29))
+        self.assertTrue(sFilter.accept(POWER, 210, 31))              # Published after interval : held value dropped
+        self.assertEqual(sFilter.flush(70), [])
+        self.assertEqual(sFilter.getStats()['held'], 0)
+
+    def test_heartbeat(self):
+        sFilter = SensorFilter({1: 0.5}, {}, {'default': 60})
+        self.assertEqual([sFilter.accept(TEMP, 19.0, t) for t in (0, 30, 60, 90)], [True, False, True, False])
+        self.assertEqual(sFilter.getStats()['heartbeats'], 1)
+
+    def test_not_filtered(self):
+        sFilter = SensorFilter({'DT_Temp': 0.1}, {}, {})
+        self.assertTrue(sFilter.enabled)
+        self.assertEqual([sFilter.accept(SWITCH, 1, t) for t in range(3)], [True, True, True])
+        self.assertFalse(SensorFilter({}, {}, {'default': 60}).enabled)
+
+    def test_not_numeric_values(self):
+        sFilter = SensorFilter({'DT_Temp': 0.1}, {}, {})
+        self.assertEqual([sFilter.accept(TEMP, v, t) for t, v in enumerate(("NaN", "NaN", 19.0, 19.0))],
+                         [True, False, True, False])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of sensors extractors compiled per infotype against values of former InfoType4..9 conversion loops
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import os
+import json
+import copy
+import unittest
+
+from domogik_packages.plugin_rfplayer.lib.infotypes import InfoType, getInfoType
+
+from test_hexframes import loadJSONFrames
+
+# Conversions of former get_RFP_data_to_sensor loops : {infoType: [(sensor data_type, measure unit or None, converter)]}
+LEGACY_RULES = {"4": [("DT_Temp", "Celsius", float), ("DT_Humidity", "%", int)],
+                "5": [("DT_Temp", "Celsius", float), ("DT_Humidity", "%", int), ("DT_Pressure", "hPa", lambda v: int(v) * 100)],
+                "6": [("DT_Speed", "m/s", float), ("DT_Angle", "degree", int)],
+                "7": [("DT_Number", None, int)],
+                "8": [("DT_ActiveEnergy", "Wh", int), ("DT_Power", "W", int)],
+                "9": [("DT_mMeter", "mm", float), ("DT_mMeterHour", "mm/h", float)]}
+
+OWL_FRAME = {'header': {'frameType': '0', 'cluster': '0', 'dataFlag': '0', 'rfLevel': '-70', 'floorNoise': '-104',
+                        'rfQuality': '6', 'protocol': '5', 'protocolMeaning': 'OREGON', 'infoType': '8', 'frequency': '433920'},
+             'infos': {'subType': '0', 'id_PHY': '0x1A89', 'id_PHYMeaning': 'CM180', 'adr_channel': '2305', 'adr': '9',
+                       'channel': '1', 'qualifier': '0', 'lowBatt': '0',
+                       'measures': [{'type': 'energy', 'value': '4175', 'unit': 'Wh'},
+                                    {'type': 'power', 'value': '520', 'unit': 'W'},
+                                    {'type': 'P1', 'value': '520', 'unit': 'W'},
+                                    {'type': 'P2', 'value': '0', 'unit': 'W'},
+                                    {'type': 'P3', 'value': '0', 'unit': 'kW'}]}}
+
+def legacyValue(data, sensor):
+    """ Return sensor value like former InfoType4..9 get_RFP_data_to_sensor"""
+    try :
+        for mes in data['infos']['measures']:
+            if mes['type'] == sensor['name']:
+                for dataType, unit, conv in LEGACY_RULES[data['header']['infoType']] :
+                    if sensor['data_type'] == dataType and unit in (None, mes['unit']) :
+                        return conv(mes['value'])
+        if sensor['reference'] == "low_battery" :
+            return int(data['infos']['lowBatt'])
+        elif sensor['reference'] == "rf_quality" :
+            return int(data['header']['rfQuality']) * 10
+    except :
+        pass
+    return None
+
+def loadSensors():
+    """ Return domogik sensors of info.json, named like in device sensors"""
+    info = json.load(open(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "info.json")))
+    sensors = [{'reference': ref, 'name': s['name'], 'data_type': s['data_type']} for ref, s in info['sensors'].items()]
+    # Measures named like RFP frames types
+    sensors += [{'reference': name, 'name': name, 'data_type': dataType} for rules in LEGACY_RULES.values()
+                for name in ('temperature', 'hygrometry', 'pressure', 'wind speed', 'direction', 'uv', 'energy', 'power',
+                             'P1', 'P2', 'P3', 'total rain', 'current rain')
+                for dataType, unit, conv in rules]
+    return sensors
+
+class CompileSensorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = [f['frame'] for f in loadJSONFrames()] + [OWL_FRAME]
+        self.sensors = loadSensors()
+
+    def check(self, frame):
+        iType = getInfoType(frame)
+        measures = iType.get_measures()
+        for sensor in self.sensors :
+            self.assertEqual(iType.compile_sensor(sensor)(iType, measures), legacyValue(frame, sensor),
+                             u"infoType {0}, sensor {1}".format(frame['header']['infoType'], sensor))
+
+    def test_same_values_than_legacy(self):
+        self.assertEqual(sorted(set(f['header']['infoType'] for f in self.frames)), ['4', '5', '6', '7', '8', '9'])
+        for frame in self.frames : self.check(frame)
+
+    def test_measures_unit_and_missing(self):
+        frame = copy.deepcopy(OWL_FRAME)
+        frame['infos']['measures'][1]['unit'] = 'kW'
+        del frame['infos']['measures'][0]
+        self.check(frame)
+        iType = getInfoType(frame)
+        self.assertEqual(iType.compile_sensor({'reference': 'P3', 'name': 'P3', 'data_type': 'DT_Power'})(iType, iType.get_measures()), None)
+
+    def test_infotype_without_converters(self):
+        self.assertEqual(InfoType.MEASURE_CONVERTERS, {})
+        frame = {'header': {'protocol': '1', 'protocolMeaning': 'X10', 'infoType': '0', 'rfQuality': '5'},
+                 'infos': {'subType': '1', 'id': '1'}}
+        iType = getInfoType(frame)
+        sensor = {'reference': 'switch', 'name': 'Switch', 'data_type': 'DT_Switch'}
+        self.assertEqual(iType.compile_sensor(sensor)(iType, iType.get_measures()), "1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+""" Unit tests of commands scheduling by RF band
+
+    python -m unittest discover -s tests -p "test_*.py"
+"""
+
+import time
+import unittest
+from Queue import Empty
+
+from domogik_packages.plugin_rfplayer.lib.txscheduler import TxScheduler, BAND_433, BAND_868, commandProtocol
+
+def command(cmd):
+    return {'data': cmd, 'response': False, 'ackFor': {}, 'request': None, 'queued': time.time()}
+
+def scheduler(**params):
+    txQueue = TxScheduler(airtimes={'X10': 0.2, 'VISONIC': 0.2}, **params)
+    txQueue.setLBT(BAND_433, False)
+    txQueue.setLBT(BAND_868, False)
+    return txQueue
+
+class TxSchedulerTestCase(unittest.TestCase):
+
+    def test_command_protocol(self):
+        self.assertEqual(commandProtocol(command('ZIA++ ON A1 X10')), 'X10')
+        self.assertEqual(commandProtocol(command('ZIA++ ALL_OFF 32 CHACON')), 'CHACON')
+        self.assertEqual(commandProtocol(command('ZIA++ STATUS JSON')), None)
+        self.assertEqual(commandProtocol(None), None)
+
+    def test_band_pacing(self):
+        txQueue = scheduler()
+        txQueue.put_nowait(command('ZIA++ ON A1 X10'))
+        txQueue.put_nowait(command('ZIA++ ON A2 X10'))
+        self.assertEqual(txQueue.get_nowait()['data'], 'ZIA++ ON A1 X10')
+        self.assertRaises(Empty, txQueue.get_nowait)       # 433 band busy during airtime
+        self.assertTrue(0 < txQueue.nextReady() - time.time() <= 0.2)
+        start = time.time()
+        self.assertEqual(txQueue.get(timeout=1)['data'], 'ZIA++ ON A2 X10')
+        self.assertTrue(time.time() - start >= 0.15)
+
+    def test_bands_independent(self):
+        txQueue = scheduler()
+        txQueue.put_nowait(command('ZIA++ ON A1 X10'))
+        txQueue.put_nowait(command('ZIA++ ON A2 X10'))
+        txQueue.put_nowait(command('ZIA++ ON 1 VISONIC'))
+        self.assertEqual([txQueue.get_nowait()['data'] for i in range(2)], ['ZIA++ ON A1 X10', 'ZIA++ ON 1 VISONIC'])
+        self.assertEqual(txQueue.getStats()['bands'][BAND_868]['dispatched'], 1)
+
+    def test_control_commands_first(self):
+        txQueue = scheduler()
+        txQueue.put_nowait(command('ZIA++ ON A1 X10'))
+        txQueue.put_nowait(command('ZIA++ PING'))
+        txQueue.put_first(command('ZIA++ FORMAT JSON'))
+        self.assertEqual([txQueue.get_nowait()['data'] for i in range(3)],
+                         ['ZIA++ FORMAT JSON', 'ZIA++ PING', 'ZIA++ ON A1 X10'])
+
+    def test_holdoff_supersede(self):
+        txQueue = scheduler(holdoff=0.1)
+        txQueue.put_nowait(command('ZIA++ DIM A1 X10 %10'))
+        txQueue.put_nowait(command('ZIA++ DIM A1 X10 %50'))
+        self.assertRaises(Empty, txQueue.get_nowait)       # Held for a newer command
+        self.assertEqual(txQueue.get(timeout=1)['data'], 'ZIA++ DIM A1 X10 %50')
+        self.assertRaises(Empty, txQueue.get_nowait)
+        self.assertEqual(txQueue.getStats()['suppressed'], 1)
+
+if __name__ == "__main__":
+    unittest.main()